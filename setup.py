@@ -8,6 +8,10 @@ setup(
     version='0.4.0',
     packages=find_packages(exclude=['tests*', 'examples']),
     install_requires=required,
+    extras_require={'async': ['aiohttp']},
+    entry_points={'console_scripts': ['ismn-mirror=sm_tools.mirror:main',
+                                      'ismn-benchmark=sm_tools.benchmarks:main',
+                                      'ismn-proxy=sm_tools.proxy:main']},
     license='MIT',
     description='Python package to download and process soil moisture data',
     long_description=open('README.md').read(),
@@ -0,0 +1,422 @@
+import asyncio
+import numpy as np
+from sm_tools.cache import CatalogDiskCache, LRUCache
+from sm_tools.catalog import ISMNCatalog, CatalogLookupMixin
+from sm_tools.common import SensorHandle, get_sensors_cache_key, make_sensor_handle, parse_json_response, \
+    parse_observations, validate_dates
+from sm_tools.parsers import ISMNDataParser
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncISMNDataParser(CatalogLookupMixin):
+    """
+    Asyncio version of ISMNDataParser for concurrent requests to ISMN - https://ismn.earth/en/dataviewer/
+    Requires aiohttp package - pip install sm_tools[async]
+
+    Networks and stations lookups are the same as in ISMNDataParser and work after catalog was loaded
+    with 'await parser.load_catalog()'. Requests to server are awaitable and number of simultaneous
+    requests is limited by max_concurrency.
+
+    Usage example:
+        async with AsyncISMNDataParser(max_concurrency=20) as parser:
+            await parser.load_catalog()
+            observations = await parser.get_sensor_observations_by_name(station_sensor_pairs)
+    """
+
+    DEFAULT_HEADERS = ISMNDataParser.DEFAULT_HEADERS
+    NETWORKS_URL = ISMNDataParser.NETWORKS_URL
+    SENSOR_URL = ISMNDataParser.SENSOR_URL
+    DATA_URL = ISMNDataParser.DATA_URL
+
+    def __init__(self, headers=None, max_concurrency=10, pool_size=None, request_timeout=20,
+                 cache_dir=None, cache_ttl=CatalogDiskCache.DEFAULT_TTL, sensors_cache_size=128, catalog=None):
+        """
+        :param headers: dict - (optional) headers for requests, DEFAULT_HEADERS used if None (default = None)
+        :param max_concurrency: int - (optional) maximum number of simultaneous requests to server (default = 10)
+        :param pool_size: int - (optional) maximum number of open connections, max_concurrency if None
+        (default = None)
+        :param request_timeout: int or float - (optional) total timeout for one request in seconds (default = 20)
+        :param cache_dir: string - (optional) directory to keep downloaded networks catalog in,
+        catalog is not cached on disk if None (default = None)
+        :param cache_ttl: int or float - (optional) time in seconds while cached catalog is used
+        without revalidation on server (default = 24 hours)
+        :param sensors_cache_size: int - (optional) number of station sensors metadata responses kept in memory,
+        0 disables caching (default = 128)
+        :param catalog: ISMNCatalog, bytes-like or string - (optional) loaded catalog, catalog snapshot
+        or snapshot file path to use instead of downloading catalog (default = None)
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncISMNDataParser requires aiohttp package! "
+                              "Install it with 'pip install aiohttp' and try again.")
+
+        if int(max_concurrency) < 1:
+            raise ValueError("Concurrency limit must be positive integer!")
+
+        self.headers = headers if headers is not None else self.DEFAULT_HEADERS
+        self.request_timeout = request_timeout
+        self.max_concurrency = int(max_concurrency)
+        self.pool_size = int(pool_size) if pool_size is not None else self.max_concurrency
+        self.__catalog_cache = CatalogDiskCache(cache_dir, cache_ttl) if cache_dir is not None else None
+        self.__sensors_cache = LRUCache(sensors_cache_size)
+        # request key -> future of running request, concurrent identical requests await the same future
+        self.__in_flight = dict()
+        self.__catalog = ISMNCatalog.attach(catalog) if catalog is not None else None
+        # session and semaphore must be created inside running event loop, so they are created on first request
+        self.__session = None
+        self.__semaphore = None
+        self.__catalog_lock = None
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Method to close all opened connections
+        """
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    def _get_session(self):
+        """
+        Method to get client session with connections pool, session is created on first call
+        :return: aiohttp.ClientSession - client session
+        """
+        if self.__session is None or self.__session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size)
+            self.__session = aiohttp.ClientSession(connector=connector,
+                                                   timeout=aiohttp.ClientTimeout(total=self.request_timeout))
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.__session
+
+    async def _get(self, url, headers=None, error_message="Can not connect to server!", allow_not_modified=False):
+        """
+        Method to make GET request with concurrency limit
+        :param url: string - request url
+        :param headers: dict - (optional) request headers, parser headers used if None (default = None)
+        :param error_message: string - (optional) error message if server responded with error
+        :param allow_not_modified: bool - (optional) accept 304 status, only for requests with cache validators
+        (default = False)
+        :return: tuple - (status code, response headers, response content)
+        """
+        session = self._get_session()
+        async with self.__semaphore:
+            try:
+                async with session.get(url, headers=headers or self.headers) as response:
+                    content = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                raise ConnectionError(error_message) from error
+
+        # 304 has empty body, so it is error for requests which did not send validators
+        if response.status != 200 and not (allow_not_modified and response.status == 304):
+            raise ConnectionError(error_message)
+
+        return response.status, response.headers, content
+
+    @property
+    def is_catalog_loaded(self):
+        """
+        Method to check if networks catalog was already downloaded
+        :return: bool - True if catalog is loaded
+        """
+        return self.__catalog is not None
+
+    @property
+    def catalog(self):
+        """
+        Method to get networks catalog
+        :return: ISMNCatalog - networks and stations catalog
+        """
+        if self.__catalog is None:
+            raise RuntimeError("Networks catalog is not loaded! Use 'await parser.load_catalog()' first.")
+        return self.__catalog
+
+    async def load_catalog(self):
+        """
+        Method to download networks catalog and build stations lookup indexes
+        Does nothing if catalog is already loaded
+        """
+        if self.__catalog_lock is None:
+            self.__catalog_lock = asyncio.Lock()
+
+        async with self.__catalog_lock:
+            if self.__catalog is None:
+                self.__catalog = ISMNCatalog(await self._get_networks_data())
+
+    async def _get_networks_data(self):
+        """
+        Method to get all networks objects
+        :return: list of dicts - networks with all inner data (stations, etc)
+        """
+        headers = dict(self.headers)
+        cached = self.__catalog_cache.load(self.NETWORKS_URL) if self.__catalog_cache is not None else None
+        if cached is not None:
+            if cached["is_fresh"]:
+                return ISMNCatalog.parse_response(cached["content"])
+
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        status, response_headers, content = await self._get(self.NETWORKS_URL, headers=headers,
+                                                            allow_not_modified=True)
+        if status == 304:
+            if cached is None:
+                raise ConnectionError("Can not connect to server!")
+            self.__catalog_cache.touch(self.NETWORKS_URL)
+            return ISMNCatalog.parse_response(cached["content"])
+
+        networks_objects_list = ISMNCatalog.parse_response(content)
+        if self.__catalog_cache is not None:
+            self.__catalog_cache.store(self.NETWORKS_URL, content,
+                                       etag=response_headers.get("ETag"),
+                                       last_modified=response_headers.get("Last-Modified"))
+
+        return networks_objects_list
+
+    @property
+    def sensors_cache_info(self):
+        """
+        Method to get sensors metadata cache statistics
+        :return: dict - {"hits": int, "misses": int, "evictions": int, "size": int, "max_size": int}
+        """
+        return self.__sensors_cache.info()
+
+    async def _coalesce(self, key, function):
+        """
+        Method to run request or await the same running request
+        :param key: hashable - request key
+        :param function: coroutine function without arguments which makes request
+        :return: function result
+        """
+        future = self.__in_flight.get(key)
+        if future is None:
+            future = self.__in_flight[key] = asyncio.ensure_future(function())
+            future.add_done_callback(lambda _: self.__in_flight.pop(key, None))
+        # cancelled caller must not cancel request awaited by others
+        return await asyncio.shield(future)
+
+    def clear_cache(self):
+        """
+        Method to remove all cached sensors metadata
+        """
+        self.__sensors_cache.clear()
+
+    async def get_station_sensors_metadata_list_by_id(self, station_id,
+                                                      start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to get sensors objects list for current station by station ID
+        Responses are cached in memory, so returned dict is shared and must not be changed
+        :param station_id: int or string - station ID
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: dict - sensors list and station metadata for this period
+        """
+        validate_dates(start_date, end_date)
+
+        cache_key = get_sensors_cache_key(station_id, start_date, end_date)
+        metadata = self.__sensors_cache.get(cache_key)
+        if metadata is not None:
+            return metadata
+
+        request_url = self.SENSOR_URL + f"?station_id={station_id}&start={start_date}&end={end_date}"
+
+        async def download():
+            _, _, content = await self._get(request_url,
+                                            error_message="Can not connect to server! Check input data!")
+            downloaded_metadata = parse_json_response(content)
+            self.__sensors_cache.put(cache_key, downloaded_metadata)
+            return downloaded_metadata
+
+        # tasks requesting the same metadata at once await one request
+        return await self._coalesce(request_url, download)
+
+    async def get_station_sensors_metadata_list_by_name(self, station_name,
+                                                        start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to get sensors objects list for current station by station name
+        :param station_name: string - station name
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: dict - sensors list and station metadata for this period
+        """
+        station_id = self.get_station_id_by_name(station_name)
+        return await self.get_station_sensors_metadata_list_by_id(station_id, start_date, end_date)
+
+    async def get_sensors_objects_list_for_station_by_id(self, station_id,
+                                                         start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to get sensors objects list for current station by station ID
+        :param station_id: int or string - station ID
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: list of dicts - sensors objects
+        """
+        metadata = await self.get_station_sensors_metadata_list_by_id(station_id, start_date, end_date)
+        return metadata["variables"]
+
+    async def get_sensors_objects_list_for_station_by_name(self, station_name,
+                                                           start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to get sensors objects list for current station by station name
+        :param station_name: string - station name
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: list of dicts - sensors objects
+        """
+        station_id = self.get_station_id_by_name(station_name)
+        return await self.get_sensors_objects_list_for_station_by_id(station_id, start_date, end_date)
+
+    async def get_sensors_names_list_for_station_by_id(self, station_id,
+                                                       start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to get sensors objects names list for current station by station ID
+        :param station_id: int - station ID
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: list of strings - sensors names
+        """
+        sensors_list = await self.get_sensors_objects_list_for_station_by_id(station_id, start_date, end_date)
+        return [sensor["variableName"] for sensor in sensors_list]
+
+    async def get_sensors_names_list_for_station_by_name(self, station_name,
+                                                         start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to get sensors objects names list for current station by station name
+        :param station_name: string - station name
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: list of strings - sensors names
+        """
+        sensors_list = await self.get_sensors_objects_list_for_station_by_name(station_name, start_date, end_date)
+        return [sensor["variableName"] for sensor in sensors_list]
+
+    async def get_sensor_objects_list_by_id(self, station_name, sensor_id,
+                                            start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to get sensor objects list with same ID for station
+        :param station_name: string - station name where sensor placed
+        :param sensor_id: int - sensor ID for station
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: list of dicts - sensor objects
+        """
+        sensors = await self.get_sensors_objects_list_for_station_by_name(station_name, start_date, end_date)
+        return [sensor for sensor in sensors if sensor["sensorId"] == str(sensor_id)]
+
+    async def get_sensor_object_by_name(self, station_name, sensor_name,
+                                        start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to get sensor data by it`s name
+        :param station_name: string - station name where sensor placed
+        :param sensor_name: string - sensor name for station
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: dict - sensor object
+        """
+        sensors = await self.get_sensors_objects_list_for_station_by_name(station_name, start_date, end_date)
+        for sensor in sensors:
+            if sensor["variableName"] == sensor_name:
+                return sensor
+
+        raise ValueError("Sensor with name " + sensor_name + " not found!")
+
+    async def get_sensor_handle_by_id(self, station_id, sensor_name,
+                                      start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to resolve sensor identifiers for station by station ID
+        :param station_id: int or string - station ID
+        :param sensor_name: string - sensor name for station
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: SensorHandle - resolved sensor identifiers
+        """
+        sensors = await self.get_sensors_objects_list_for_station_by_id(station_id, start_date, end_date)
+        return make_sensor_handle(station_id, sensors, sensor_name)
+
+    async def get_sensor_handle(self, station_name, sensor_name,
+                                start_date="2017/01/01", end_date="2017/12/31", network_name=None):
+        """
+        Method to resolve sensor identifiers for station by station name
+        :param station_name: string - station name
+        :param sensor_name: string - sensor name for station
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param network_name: string - (optional) network name to choose station from (default = None)
+        :return: SensorHandle - resolved sensor identifiers
+        """
+        station_id = self.get_station_id_by_name(station_name, network_name)
+        return await self.get_sensor_handle_by_id(station_id, sensor_name, start_date, end_date)
+
+    async def get_observations(self, handle, start_date="2017/01/01", end_date="2017/12/31", normalize=True,
+                               as_numpy=False, dtype=np.float64):
+        """
+        Method to get observation data for already resolved sensor
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - (optional) return numpy arrays instead of lists (default = False)
+        :param dtype: numpy dtype - (optional) observations array type if as_numpy is True (default = np.float64)
+        :return: dict - {"dates": list of observation dates, "observation": list of observations}
+        """
+        if not isinstance(handle, SensorHandle):
+            raise ValueError("Handle must be SensorHandle object!")
+
+        validate_dates(start_date, end_date)
+
+        request_url = self.DATA_URL + f"?station_id={handle.station_id}&start={start_date}&end={end_date}&" \
+            f"depth_id={handle.depth_id}&sensor_id={handle.sensor_id}&variable_id={handle.variable_id}"
+        _, _, content = await self._get(request_url,
+                                        error_message="Can not get data from server! Check parameters!")
+
+        return parse_observations(parse_json_response(content), normalize, as_numpy, dtype)
+
+    async def get_sensor_observation_by_name(self, station_name, sensor_name,
+                                             start_date="2017/01/01", end_date="2017/12/31", normalize=True,
+                                             as_numpy=False, dtype=np.float64):
+        """
+        Method to get observation data for sensor in station by sensor name
+        :param station_name: string - station name
+        :param sensor_name: string - sensor name
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - (optional) return numpy arrays instead of lists (default = False)
+        :param dtype: numpy dtype - (optional) observations array type if as_numpy is True (default = np.float64)
+        :return: dict - {"dates": list of observation dates, "observation": list of observations}
+        """
+        validate_dates(start_date, end_date)
+
+        handle = await self.get_sensor_handle(station_name, sensor_name, start_date, end_date)
+        return await self.get_observations(handle, start_date, end_date, normalize=normalize,
+                                           as_numpy=as_numpy, dtype=dtype)
+
+    async def get_sensor_observations_by_name(self, station_sensor_pairs,
+                                              start_date="2017/01/01", end_date="2017/12/31", normalize=True,
+                                              as_numpy=False, dtype=np.float64, return_exceptions=False):
+        """
+        Method to get observation data for many sensors concurrently
+        :param station_sensor_pairs: iterable - (station name, sensor name) pairs
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - (optional) return numpy arrays instead of lists (default = False)
+        :param dtype: numpy dtype - (optional) observations array type if as_numpy is True (default = np.float64)
+        :param return_exceptions: bool - (optional) if True errors are returned in place of failed results,
+        otherwise first error is raised (default = False)
+        :return: list of dicts - observations in the same order as pairs
+        """
+        tasks = [self.get_sensor_observation_by_name(station_name, sensor_name, start_date, end_date, normalize,
+                                                     as_numpy, dtype)
+                 for station_name, sensor_name in station_sensor_pairs]
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
@@ -0,0 +1,276 @@
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import numpy as np
+from sm_tools.catalog import ISMNCatalog
+from sm_tools.mock_server import MockISMNServer, load_payloads
+
+
+# version of results format
+RESULTS_VERSION = 1
+
+# observations series lengths in days for fetch benchmarks
+SERIES_DAYS = (7, 30, 365, 3650)
+
+
+def measure(name, function, repeat=5, operations=1, **params):
+    """
+    Method to measure function run time
+    :param name: string - benchmark name
+    :param function: function - measured function without arguments
+    :param repeat: int - (optional) number of runs (default = 5)
+    :param operations: int - (optional) number of operations in one run (default = 1)
+    :param params: benchmark parameters saved to result
+    :return: dict - {"name": string, "params": dict, "repeat": int, "operations": int, "min": float,
+    "median": float, "mean": float, "max": float, "ops_per_second": float} - times of one run in seconds
+    """
+    times = []
+    for _ in range(int(repeat)):
+        started_at = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started_at)
+
+    times = np.array(times)
+    median = float(np.median(times))
+    return {"name": name, "params": params, "repeat": int(repeat), "operations": int(operations),
+            "min": float(times.min()), "median": median, "mean": float(times.mean()), "max": float(times.max()),
+            "ops_per_second": operations / median if median > 0 else None}
+
+
+def get_result_key(result):
+    """
+    Method to get unique benchmark key used to compare runs
+    :param result: dict - benchmark result
+    :return: string - name with sorted parameters, e.g. "fetch_observations[days=365,mode=numpy]"
+    """
+    params = ",".join(f"{name}={value}" for name, value in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]" if params else result["name"]
+
+
+def benchmark_catalog(server, repeat):
+    """
+    Method to measure catalog download and parse, snapshot decode and lookups
+    :param server: MockISMNServer - running mock server
+    :param repeat: int - number of runs
+    :return: list of dicts - benchmark results
+    """
+    results = [measure("catalog_load", lambda: server.create_parser(lazy=False), repeat,
+                       stations=server.networks * server.stations)]
+
+    parser = server.create_parser()
+    catalog = parser.catalog
+    snapshot = catalog.to_snapshot()
+    results.append(measure("catalog_parse", lambda: ISMNCatalog.from_response(server.catalog_payload), repeat))
+    results.append(measure("catalog_snapshot_load", lambda: ISMNCatalog.from_snapshot(snapshot), repeat))
+
+    stations_ids = [int(station.station_id) for station in catalog.stations]
+    stations_names = [station.name for station in catalog.stations]
+    random_state = np.random.RandomState(0)
+    points = list(zip(random_state.uniform(-60, 70, 1000), random_state.uniform(-180, 180, 1000)))
+
+    def lookup_by_id():
+        for station_id in stations_ids:
+            parser.get_station_object_by_id(station_id)
+
+    def lookup_by_name():
+        for station_name in stations_names:
+            parser.get_station_id_by_name(station_name)
+
+    def find_nearest():
+        for lat, lon in points:
+            parser.find_nearest_stations(lat, lon, k=5)
+
+    def query():
+        for _ in range(100):
+            parser.query_stations(variable="soil moisture", depth=0.05, active_between=("2016/01/01", "2016/12/31"))
+
+    # indexes are built before measurements
+    find_nearest()
+    query()
+    results.append(measure("lookup_station_by_id", lookup_by_id, repeat, len(stations_ids)))
+    results.append(measure("lookup_station_by_name", lookup_by_name, repeat, len(stations_names)))
+    results.append(measure("find_nearest_stations", find_nearest, repeat, len(points)))
+    results.append(measure("query_stations", query, repeat, 100))
+    return results
+
+
+def benchmark_metadata(server, repeat):
+    """
+    Method to measure sensor handles resolution with empty and filled sensors metadata cache
+    :param server: MockISMNServer - running mock server
+    :param repeat: int - number of runs
+    :return: list of dicts - benchmark results
+    """
+    parser = server.create_parser()
+    stations_ids = [int(station.station_id) for station in parser.catalog.stations][:100]
+    sensor_name = server.sensors_names[0]
+
+    def resolve():
+        for station_id in stations_ids:
+            parser.get_sensor_handle_by_id(station_id, sensor_name)
+
+    def resolve_cold():
+        parser.clear_cache()
+        resolve()
+
+    results = [measure("resolve_sensor_handle", resolve_cold, repeat, len(stations_ids), cache="cold")]
+    resolve()
+    results.append(measure("resolve_sensor_handle", resolve, repeat, len(stations_ids), cache="warm"))
+    return results
+
+
+def benchmark_observations(server, repeat, series_days=SERIES_DAYS):
+    """
+    Method to measure observations download and parse for different series lengths and result types
+    :param server: MockISMNServer - running mock server
+    :param repeat: int - number of runs
+    :param series_days: iterable of ints - (optional) series lengths in days (default = SERIES_DAYS)
+    :return: list of dicts - benchmark results
+    """
+    parser = server.create_parser()
+    handle = parser.get_sensor_handle_by_id(server.first_station_id, server.sensors_names[0])
+    start_date = datetime.date(2000, 1, 1)
+    modes = {"lists": {}, "numpy": {"as_numpy": True}, "numpy_float32": {"as_numpy": True, "dtype": np.float32},
+             "stream": {"as_numpy": True, "stream": True}}
+
+    results = []
+    for days in series_days:
+        end_date = (start_date + datetime.timedelta(days=int(days) - 1)).strftime("%Y/%m/%d")
+        for mode, kwargs in modes.items():
+            def fetch():
+                parser.get_observations(handle, start_date.strftime("%Y/%m/%d"), end_date, **kwargs)
+
+            results.append(measure("fetch_observations", fetch, repeat, days=int(days), mode=mode,
+                                   observations=int(days) * 86400 // server.observations_step))
+    return results
+
+
+def benchmark_bulk_fetch(server, repeat, requests_count=64, workers=(1, 4, 16)):
+    """
+    Method to measure concurrent fetching of many sensors observations, every request resolves sensor
+    metadata for its period and downloads observations
+    :param server: MockISMNServer - running mock server
+    :param repeat: int - number of runs
+    :param requests_count: int - (optional) number of fetched sensors (default = 64)
+    :param workers: iterable of ints - (optional) numbers of threads (default = (1, 4, 16))
+    :return: list of dicts - benchmark results
+    """
+    parser = server.create_parser()
+    stations_names = [station.name for station in parser.catalog.stations]
+    sensor_name = server.sensors_names[0]
+    # every request has its own month, so requests are not coalesced
+    requests_list = []
+    for index in range(int(requests_count)):
+        month = datetime.date(2000 + index // 12, index % 12 + 1, 1)
+        requests_list.append((stations_names[index % len(stations_names)], sensor_name,
+                              month.strftime("%Y/%m/%d"), month.replace(day=28).strftime("%Y/%m/%d")))
+
+    results = []
+    for workers_count in workers:
+        def fetch():
+            for result in parser.fetch_many(requests_list, max_workers=workers_count, as_numpy=True):
+                if result.error is not None:
+                    raise result.error
+
+        results.append(measure("bulk_fetch", fetch, repeat, len(requests_list), workers=int(workers_count),
+                               latency=server.latency))
+    return results
+
+
+def run_benchmarks(networks=20, stations=50, latency=0.0, repeat=5, payloads=None, series_days=SERIES_DAYS,
+                   bulk_latency=0.02):
+    """
+    Method to run all benchmarks against local mock server
+    :param networks: int - (optional) number of synthetic networks (default = 20)
+    :param stations: int - (optional) number of stations in every network (default = 50)
+    :param latency: int or float - (optional) response delay in seconds for all but bulk benchmarks (default = 0.0)
+    :param repeat: int - (optional) number of runs of every benchmark (default = 5)
+    :param payloads: dict - (optional) recorded responses served instead of synthetic ones (default = None)
+    :param series_days: iterable of ints - (optional) observations series lengths in days (default = SERIES_DAYS)
+    :param bulk_latency: int or float - (optional) response delay in seconds for bulk fetch, so concurrency
+    is measured against slow server (default = 0.02)
+    :return: dict - {"version": int, "environment": dict, "settings": dict, "results": list of dicts}
+    """
+    settings = {"networks": networks, "stations": stations, "latency": latency, "repeat": repeat,
+                "series_days": list(series_days), "bulk_latency": bulk_latency, "recorded": bool(payloads)}
+    results = []
+    with MockISMNServer(networks=networks, stations=stations, latency=latency, payloads=payloads) as server:
+        results += benchmark_catalog(server, repeat)
+        results += benchmark_metadata(server, repeat)
+        results += benchmark_observations(server, repeat, series_days)
+
+    with MockISMNServer(networks=networks, stations=stations, latency=bulk_latency, payloads=payloads) as server:
+        results += benchmark_bulk_fetch(server, repeat)
+
+    return {"version": RESULTS_VERSION,
+            "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                            "platform": platform.platform(), "date": datetime.datetime.now().isoformat()},
+            "settings": settings,
+            "results": results}
+
+
+def compare_results(baseline, results):
+    """
+    Method to compare two benchmark runs by median time
+    :param baseline: dict - previous run_benchmarks() result
+    :param results: dict - new run_benchmarks() result
+    :return: list of tuples - (benchmark key, baseline median, new median, new / baseline ratio)
+    for benchmarks found in both runs, ratio below 1 means new run is faster
+    """
+    baseline_results = {get_result_key(result): result for result in baseline["results"]}
+    comparison = []
+    for result in results["results"]:
+        key = get_result_key(result)
+        if key in baseline_results:
+            baseline_median = baseline_results[key]["median"]
+            comparison.append((key, baseline_median, result["median"],
+                               result["median"] / baseline_median if baseline_median > 0 else None))
+    return comparison
+
+
+def main(argv=None):
+    """
+    Entry point of 'ismn-benchmark' command
+    :param argv: list of strings - (optional) command line arguments, sys.argv if None (default = None)
+    :return: int - exit code
+    """
+    argument_parser = argparse.ArgumentParser(prog="ismn-benchmark",
+                                              description="Benchmark parser against local mock ISMN server.")
+    argument_parser.add_argument("-o", "--output", help="json file to save results to")
+    argument_parser.add_argument("--compare", help="json file of previous run to compare results with")
+    argument_parser.add_argument("--networks", type=int, default=20, help="number of networks (default 20)")
+    argument_parser.add_argument("--stations", type=int, default=50,
+                                 help="number of stations in every network (default 50)")
+    argument_parser.add_argument("--latency", type=float, default=0.0, help="response delay in seconds (default 0)")
+    argument_parser.add_argument("--repeat", type=int, default=5, help="number of runs of every benchmark (default 5)")
+    argument_parser.add_argument("--payloads", help="directory with recorded responses to serve")
+    argument_parser.add_argument("--quick", action="store_true", help="run short series only")
+    arguments = argument_parser.parse_args(argv)
+
+    results = run_benchmarks(networks=arguments.networks, stations=arguments.stations, latency=arguments.latency,
+                             repeat=arguments.repeat,
+                             payloads=load_payloads(arguments.payloads) if arguments.payloads else None,
+                             series_days=SERIES_DAYS[:2] if arguments.quick else SERIES_DAYS)
+
+    for result in results["results"]:
+        print(f"{get_result_key(result):70} median {result['median'] * 1000:10.3f} ms", flush=True)
+
+    if arguments.compare:
+        with open(arguments.compare, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+        print("\nComparison with", arguments.compare)
+        for key, baseline_median, median, ratio in compare_results(baseline, results):
+            ratio = f"x{ratio:.2f}" if ratio is not None else ""
+            print(f"{key:70} {baseline_median * 1000:10.3f} -> {median * 1000:10.3f} ms  {ratio}")
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
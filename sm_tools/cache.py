@@ -0,0 +1,368 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class CatalogDiskCache:
+    """
+    Class for storing downloaded networks catalog on disk, so new parser instances can read it from file
+    instead of downloading it again
+
+    Every cached url is stored in one file - first line is json with response validators (ETag, Last-Modified)
+    and the rest is raw server response. File modification time is used as time of last successful check.
+    """
+
+    # default time in seconds while cached catalog is used without any request to server
+    DEFAULT_TTL = 24 * 60 * 60
+
+    def __init__(self, cache_dir, ttl=DEFAULT_TTL):
+        """
+        :param cache_dir: string - directory to store cached catalog files in
+        :param ttl: int or float - time in seconds while cached catalog is fresh, 0 means that catalog is
+        revalidated on every load (default = 24 hours)
+        """
+        if ttl is None or ttl < 0:
+            raise ValueError("Cache TTL must be non-negative number of seconds!")
+
+        self.cache_dir = str(cache_dir)
+        self.ttl = ttl
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _get_file_path(self, url):
+        """
+        Method to get cache file path for url
+        :param url: string - cached url
+        :return: string - path to cache file
+        """
+        url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"catalog_{url_hash}.cache")
+
+    def load(self, url):
+        """
+        Method to read cached response for url
+        :param url: string - cached url
+        :return: dict - {"content": bytes, "etag": string or None, "last_modified": string or None,
+        "is_fresh": bool} or None if there is no valid cache entry
+        """
+        file_path = self._get_file_path(url)
+        try:
+            with open(file_path, "rb") as cache_file:
+                data = cache_file.read()
+            modification_time = os.path.getmtime(file_path)
+        except OSError:
+            return None
+
+        # broken entry is the same as missing one - it will be replaced with next download
+        header, separator, content = data.partition(b"\n")
+        try:
+            validators = json.loads(header.decode("utf-8"))
+        except (UnicodeDecodeError, json.decoder.JSONDecodeError):
+            return None
+
+        if not separator or validators.get("url") != url:
+            return None
+
+        return {"content": content,
+                "etag": validators.get("etag"),
+                "last_modified": validators.get("last_modified"),
+                "is_fresh": time.time() - modification_time < self.ttl}
+
+    def store(self, url, content, etag=None, last_modified=None):
+        """
+        Method to save response for url, old entry is replaced atomically
+        so other processes never read partially written file
+        :param url: string - cached url
+        :param content: bytes - raw server response
+        :param etag: string - (optional) ETag response header (default = None)
+        :param last_modified: string - (optional) Last-Modified response header (default = None)
+        """
+        header = json.dumps({"url": url, "etag": etag, "last_modified": last_modified}).encode("utf-8")
+        file_path = self._get_file_path(url)
+
+        # writing to temporary file in the same directory and moving it to cache file place
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as temp_file:
+                temp_file.write(header + b"\n" + content)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def touch(self, url):
+        """
+        Method to mark cached response as fresh again, used when server confirmed it was not modified
+        :param url: string - cached url
+        """
+        try:
+            os.utime(self._get_file_path(url))
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+        Method to remove all cached catalog files
+        """
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.startswith("catalog_") and file_name.endswith(".cache"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, file_name))
+                except OSError:
+                    pass
+
+
+class LRUCache:
+    """
+    Thread safe in-memory cache with limited size, least recently used items are removed first
+    """
+
+    def __init__(self, max_size=128):
+        """
+        :param max_size: int - maximum number of stored items, 0 disables caching (default = 128)
+        """
+        if max_size is None or int(max_size) < 0:
+            raise ValueError("Cache size must be positive integer or 0!")
+
+        self.max_size = int(max_size)
+        self.__items = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __contains__(self, key):
+        return key in self.__items
+
+    def get(self, key, default=None):
+        """
+        Method to get item from cache and mark it as recently used
+        :param key: hashable - item key
+        :param default: (optional) value to return if there is no such key (default = None)
+        :return: cached value or default
+        """
+        with self.__lock:
+            try:
+                value = self.__items[key]
+            except KeyError:
+                self.__misses += 1
+                return default
+
+            self.__items.move_to_end(key)
+            self.__hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Method to add item to cache, least recently used items are removed if cache is full
+        :param key: hashable - item key
+        :param value: value to store
+        """
+        if self.max_size == 0:
+            return
+
+        with self.__lock:
+            self.__items[key] = value
+            self.__items.move_to_end(key)
+            while len(self.__items) > self.max_size:
+                self.__items.popitem(last=False)
+                self.__evictions += 1
+
+    def pop(self, key, default=None):
+        """
+        Method to remove item from cache
+        :param key: hashable - item key
+        :param default: (optional) value to return if there is no such key (default = None)
+        :return: removed value or default
+        """
+        with self.__lock:
+            return self.__items.pop(key, default)
+
+    def remove_if(self, predicate):
+        """
+        Method to remove all items which keys match condition
+        :param predicate: function - predicate(key) returns True for items to remove
+        :return: int - number of removed items
+        """
+        with self.__lock:
+            keys = [key for key in self.__items if predicate(key)]
+            for key in keys:
+                del self.__items[key]
+            return len(keys)
+
+    def clear(self):
+        """
+        Method to remove all items from cache and reset statistics
+        """
+        with self.__lock:
+            self.__items.clear()
+            self.__hits = self.__misses = self.__evictions = 0
+
+    def info(self):
+        """
+        Method to get cache usage statistics
+        :return: dict - {"hits": int, "misses": int, "evictions": int, "size": int, "max_size": int}
+        """
+        with self.__lock:
+            return {"hits": self.__hits, "misses": self.__misses, "evictions": self.__evictions,
+                    "size": len(self.__items), "max_size": self.max_size}
+
+
+class ResponseDiskStore:
+    """
+    Class for storing server responses on disk with limited total size, shared by threads and processes
+
+    Every url is stored in one file - first line is json with url, response headers and store time,
+    the rest is raw response. Files are replaced atomically and file modification time is time of last use,
+    so when store is bigger than max_size, least recently used files are removed until it is 90% full.
+    """
+
+    # part of max_size store is cleaned to, so eviction is not run on every write
+    EVICTION_TARGET = 0.9
+
+    def __init__(self, store_dir, max_size=1024 ** 3):
+        """
+        :param store_dir: string - directory to store responses in
+        :param max_size: int - (optional) maximum total size of stored files in bytes (default = 1 GB)
+        """
+        if max_size is None or int(max_size) <= 0:
+            raise ValueError("Store size must be positive number of bytes!")
+
+        self.store_dir = str(store_dir)
+        self.max_size = int(max_size)
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        self.__lock = threading.Lock()
+        self.__evictions = 0
+        # size is estimated from own writes and counted again from files when it gets over limit
+        self.__size = self._scan()[1]
+
+    def _get_file_path(self, url):
+        """
+        Method to get store file path for url
+        :param url: string - stored url
+        :return: string - path to store file
+        """
+        url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.store_dir, f"response_{url_hash}.cache")
+
+    def _scan(self):
+        """
+        Method to list stored files
+        :return: tuple - (list of (modification time, size, path) tuples, total size in bytes)
+        """
+        files = []
+        for file_name in os.listdir(self.store_dir):
+            if file_name.startswith("response_") and file_name.endswith(".cache"):
+                path = os.path.join(self.store_dir, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files, sum(size for _, size, _ in files)
+
+    def load(self, url):
+        """
+        Method to read stored response for url and mark it as recently used
+        :param url: string - stored url
+        :return: dict - {"content": bytes, "headers": dict, "age": float - seconds since response was stored}
+        or None if there is no valid entry
+        """
+        file_path = self._get_file_path(url)
+        try:
+            with open(file_path, "rb") as store_file:
+                data = store_file.read()
+            os.utime(file_path)
+        except OSError:
+            return None
+
+        # broken entry is the same as missing one - it will be replaced with next download
+        header, separator, content = data.partition(b"\n")
+        try:
+            metadata = json.loads(header.decode("utf-8"))
+        except (UnicodeDecodeError, json.decoder.JSONDecodeError):
+            return None
+
+        if not separator or not isinstance(metadata, dict) or metadata.get("url") != url:
+            return None
+
+        return {"content": content, "headers": metadata.get("headers") or dict(),
+                "age": max(0.0, time.time() - metadata.get("stored_at", 0))}
+
+    def store(self, url, content, headers=None):
+        """
+        Method to save response for url, old entry is replaced atomically
+        so other processes never read partially written file
+        :param url: string - stored url
+        :param content: bytes - raw server response
+        :param headers: dict - (optional) response headers to keep, e.g. ETag (default = None)
+        """
+        header = json.dumps({"url": url, "headers": headers or dict(), "stored_at": time.time()}).encode("utf-8")
+        file_path = self._get_file_path(url)
+        try:
+            old_size = os.path.getsize(file_path)
+        except OSError:
+            old_size = 0
+
+        # writing to temporary file in the same directory and moving it to store file place
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as temp_file:
+                temp_file.write(header + b"\n" + content)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self.__lock:
+            self.__size += len(header) + 1 + len(content) - old_size
+            if self.__size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """
+        Method to remove least recently used files until store is EVICTION_TARGET full, called under lock
+        """
+        # other processes write to the same directory, so real size is counted from files
+        files, size = self._scan()
+        target_size = self.max_size * self.EVICTION_TARGET
+        for _, file_size, path in sorted(files):
+            if size <= target_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= file_size
+            self.__evictions += 1
+        self.__size = size
+
+    def info(self):
+        """
+        Method to get store usage statistics
+        :return: dict - {"files": int, "size": int, "max_size": int, "evictions": int} - sizes in bytes
+        """
+        files, size = self._scan()
+        with self.__lock:
+            return {"files": len(files), "size": size, "max_size": self.max_size, "evictions": self.__evictions}
+
+    def clear(self):
+        """
+        Method to remove all stored responses
+        """
+        with self.__lock:
+            for _, _, path in self._scan()[0]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.__size = 0
@@ -0,0 +1,807 @@
+import abc
+import json
+import os
+import warnings
+from collections import namedtuple
+from sm_tools.query import StationQueryIndex
+from sm_tools.records import Network, Station
+from sm_tools.snapshot import decode_networks, encode_networks, load_snapshot_file, save_snapshot
+from sm_tools.spatial import StationSpatialIndex
+
+
+def _is_same_value(value, other_value):
+    """
+    Method to compare catalog values, NaN coordinates are the same
+    :param value: any - catalog value
+    :param other_value: any - catalog value
+    :return: bool - True if values are the same
+    """
+    return value == other_value or value != value and other_value != other_value
+
+
+class CatalogDiff(namedtuple("CatalogDiff", ["added_stations", "removed_stations", "changed_stations",
+                                             "added_networks", "removed_networks", "changed_networks"])):
+    """
+    Difference between two catalog versions
+    Stations are identified by IDs and networks by names, changed_stations and changed_networks
+    are dicts ID or name -> tuple of changed station or network object fields.
+    Station moved to other network has "networkID" in changed fields.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def empty(cls):
+        """
+        Method to get diff without changes
+        :return: CatalogDiff - empty diff
+        """
+        return cls([], [], {}, [], [], {})
+
+    @property
+    def is_empty(self):
+        """
+        Method to check if catalog was not changed
+        :return: bool - True if there is no changes
+        """
+        return not any(self)
+
+    def get_changed_stations(self, *fields):
+        """
+        Method to get IDs of stations where any of fields was changed, e.g. "maximum" or "sensorText"
+        :param fields: strings - station object fields, all changed stations if no fields passed
+        :return: list of ints - stations IDs
+        """
+        return [station_id for station_id, changed_fields in self.changed_stations.items()
+                if not fields or set(fields) & set(changed_fields)]
+
+
+class ISMNCatalog:
+    """
+    Class for searching networks and stations in ISMN networks catalog
+
+    Catalog is kept as compact Network and Station records instead of parsed json dicts.
+    All lookup indexes are built once on catalog creation, so searches by name or ID
+    do not scan whole catalog on every call. Methods which return network or station objects
+    build dicts in server format from records on every call.
+    """
+
+    # station object fields used by attributes index
+    QUERY_FIELDS = ("variableText", "depthText", "sensorText", "minimum", "maximum", "networkID")
+
+    def __init__(self, networks_objects_list):
+        """
+        :param networks_objects_list: list of dicts - networks objects with inner stations objects
+        """
+        self._set_networks([Network(network_object) for network_object in networks_objects_list])
+
+    def _set_networks(self, networks):
+        """
+        Method to set catalog networks records and build lookup indexes over them
+        :param networks: list of Network - networks records
+        """
+        self.__networks = networks
+        # getting all stations records from all networks
+        self.__stations = [station for network in self.__networks for station in network.stations]
+        # building lookup indexes over networks and stations
+        self._build_indexes()
+        # spatial and attributes indexes are built on first search which needs them
+        self.__spatial_index = None
+        self.__query_index = None
+
+    @classmethod
+    def from_response(cls, content):
+        """
+        Method to create catalog from raw networks catalog server response
+        :param content: bytes - raw server response
+        :return: ISMNCatalog - catalog object
+        """
+        return cls(cls.parse_response(content))
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Method to create catalog from binary snapshot without downloading and parsing catalog json
+        :param snapshot: bytes, memoryview or mmap - snapshot created with to_snapshot(),
+        e.g. buffer of multiprocessing.shared_memory.SharedMemory
+        :return: ISMNCatalog - catalog object
+        """
+        catalog = cls.__new__(cls)
+        catalog._set_networks(decode_networks(snapshot))
+        return catalog
+
+    @classmethod
+    def attach(cls, source):
+        """
+        Method to get catalog from already loaded catalog, snapshot or snapshot file
+        :param source: ISMNCatalog, bytes-like or string - catalog, snapshot or snapshot file path
+        :return: ISMNCatalog - catalog object
+        """
+        if isinstance(source, cls):
+            return source
+        if isinstance(source, (str, os.PathLike)):
+            return cls.load(source)
+        return cls.from_snapshot(source)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Method to create catalog from snapshot file, file is read through memory map
+        :param path: string - snapshot file path
+        :return: ISMNCatalog - catalog object
+        """
+        catalog = cls.__new__(cls)
+        catalog._set_networks(load_snapshot_file(path))
+        return catalog
+
+    def to_snapshot(self):
+        """
+        Method to get compact binary snapshot of catalog, it can be shared with other processes
+        through file, shared memory or pickle
+        :return: bytes - catalog snapshot
+        """
+        return encode_networks(self.__networks)
+
+    def save(self, path):
+        """
+        Method to write catalog snapshot to file
+        :param path: string - snapshot file path
+        """
+        save_snapshot(self.to_snapshot(), path)
+
+    def __reduce__(self):
+        # catalog is pickled as compact snapshot instead of records
+        return self.__class__.from_snapshot, (self.to_snapshot(),)
+
+    @staticmethod
+    def parse_response(content):
+        """
+        Method to parse raw networks catalog server response
+        :param content: bytes - raw server response
+        :return: list of dicts - networks objects with inner stations objects
+        """
+        try:
+            return json.loads(content.decode("utf-8"))["Networks"]
+        except (json.decoder.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+            raise ValueError("Error while server response processing! "
+                             "Check input parameters or https://www.geo.tuwien.ac.at/ server status.") from None
+
+    def _build_indexes(self):
+        """
+        Method to build lookup dicts over networks and stations
+        """
+        # network name -> network record
+        self.__networks_by_name = {network.name: network for network in self.__networks}
+        # station name -> list of station records, because same station name can be used in several networks
+        self.__stations_by_name = dict()
+        # station ID -> station record
+        self.__stations_by_id = dict()
+
+        for station in self.__stations:
+            self._index_station(station)
+
+    def _index_station(self, station):
+        """
+        Method to add station record to lookup dicts
+        :param station: Station - station record
+        """
+        self.__stations_by_name.setdefault(station.name, []).append(station)
+        self.__stations_by_id[int(station.station_id)] = station
+
+    def _unindex_station(self, station, station_name):
+        """
+        Method to remove station record from lookup by name dict
+        :param station: Station - station record
+        :param station_name: string - name station was indexed with
+        """
+        stations = self.__stations_by_name.get(station_name, [])
+        stations[:] = [indexed_station for indexed_station in stations if indexed_station is not station]
+        if not stations:
+            self.__stations_by_name.pop(station_name, None)
+
+    def update(self, networks_objects_list):
+        """
+        Method to replace catalog data with new catalog version
+        Records of existing networks and stations are kept and changed in place, lookup dicts are changed
+        only for added, removed and renamed stations, spatial and attributes indexes are built again
+        on next search only if fields they use were changed.
+        :param networks_objects_list: list of dicts - new networks objects with inner stations objects
+        :return: CatalogDiff - difference between old and new catalog
+        """
+        new_networks = [Network(network_object) for network_object in networks_objects_list]
+        old_stations_ids = set(self.__stations_by_id)
+        added_networks = [network.name for network in new_networks if network.name not in self.__networks_by_name]
+        new_networks_names = {network.name for network in new_networks}
+        removed_networks = [name for name in self.__networks_by_name if name not in new_networks_names]
+        changed_networks = dict()
+        added_stations, changed_stations = [], dict()
+        # names of added and renamed stations, their lookup lists are sorted in catalog order again
+        moved_names = set()
+
+        networks = []
+        for new_network in new_networks:
+            network = self.__networks_by_name.get(new_network.name)
+            if network is None:
+                network = new_network
+            else:
+                fields = set(network.fields) | set(new_network.fields)
+                changed_fields = tuple(sorted(field for field in fields
+                                              if network.fields.get(field) != new_network.fields.get(field)))
+                if changed_fields:
+                    changed_networks[network.name] = changed_fields
+                    network.fields = new_network.fields
+            networks.append(network)
+
+            stations = []
+            for new_station in new_network.stations:
+                station_id = int(new_station.station_id)
+                station = self.__stations_by_id.get(station_id)
+                if station is None:
+                    new_station.network = network
+                    self._index_station(new_station)
+                    moved_names.add(new_station.name)
+                    added_stations.append(station_id)
+                    stations.append(new_station)
+                    continue
+
+                changed_fields = [field for field, attribute in Station.FIELDS
+                                  if not _is_same_value(getattr(station, attribute), getattr(new_station, attribute))]
+                changed_fields += sorted(field for field in set(station.extra or {}) | set(new_station.extra or {})
+                                         if (station.extra or {}).get(field) != (new_station.extra or {}).get(field))
+                if station.network.name != network.name:
+                    changed_fields.append("networkID")
+                if changed_fields:
+                    changed_stations[station_id] = tuple(changed_fields)
+                    old_name = station.name
+                    for _, attribute in Station.FIELDS:
+                        setattr(station, attribute, getattr(new_station, attribute))
+                    station.extra = new_station.extra
+                    if station.name != old_name:
+                        self._unindex_station(station, old_name)
+                        self.__stations_by_name.setdefault(station.name, []).append(station)
+                        moved_names.add(station.name)
+                station.network = network
+                stations.append(station)
+            network.stations = stations
+
+        new_stations_ids = {int(station.station_id) for network in networks for station in network.stations}
+        removed_stations = sorted(old_stations_ids - new_stations_ids)
+        for station_id in removed_stations:
+            station = self.__stations_by_id.pop(station_id)
+            self._unindex_station(station, station.name)
+
+        self.__networks = networks
+        self.__stations = [station for network in networks for station in network.stations]
+        self.__networks_by_name = {network.name: network for network in networks}
+        self._sort_stations_by_name(moved_names)
+
+        diff = CatalogDiff(sorted(added_stations), removed_stations, changed_stations,
+                           added_networks, removed_networks, changed_networks)
+        self._invalidate_indexes(diff)
+        return diff
+
+    def _sort_stations_by_name(self, stations_names):
+        """
+        Method to keep stations with the same name in catalog order, first of them is found by name
+        :param stations_names: set of strings - names of stations which lookup lists can be out of order
+        """
+        stations_names = [name for name in stations_names if len(self.__stations_by_name.get(name, [])) > 1]
+        if not stations_names:
+            return
+
+        positions = {id(station): position for position, station in enumerate(self.__stations)}
+        for name in stations_names:
+            self.__stations_by_name[name].sort(key=lambda station: positions[id(station)])
+
+    def _invalidate_indexes(self, diff):
+        """
+        Method to drop spatial and attributes indexes if catalog changes affect them
+        :param diff: CatalogDiff - catalog changes
+        """
+        stations_changed = bool(diff.added_stations or diff.removed_stations)
+        if stations_changed or diff.get_changed_stations("lat", "lng"):
+            self.__spatial_index = None
+        if stations_changed or diff.added_networks or diff.removed_networks or \
+                diff.get_changed_stations(*self.QUERY_FIELDS) or \
+                any("network_country" in fields for fields in diff.changed_networks.values()):
+            self.__query_index = None
+
+    @property
+    def networks(self):
+        """
+        Method to get compact networks records
+        :return: list of Network - networks records
+        """
+        return self.__networks
+
+    @property
+    def stations(self):
+        """
+        Method to get compact stations records from all networks
+        :return: list of Station - stations records
+        """
+        return self.__stations
+
+    @property
+    def spatial_index(self):
+        """
+        Method to get spatial index over stations coordinates
+        :return: StationSpatialIndex - index over station records built on first call
+        """
+        if self.__spatial_index is None:
+            self.__spatial_index = StationSpatialIndex(self.__stations)
+        return self.__spatial_index
+
+    @property
+    def query_index(self):
+        """
+        Method to get index over parsed stations variables, depths, sensors and observations periods
+        :return: StationQueryIndex - index over station records built on first call
+        """
+        if self.__query_index is None:
+            self.__query_index = StationQueryIndex(self.__networks)
+        return self.__query_index
+
+    @property
+    def network_names_list(self):
+        """
+        Method to get list of networks names
+        :return: list of strings - networks names
+        """
+        return [network.name for network in self.__networks]
+
+    @property
+    def networks_objects(self):
+        """
+        Method to get all networks objects with all inner data
+        :return: list of dicts - networks objects
+        """
+        return [network.to_dict() for network in self.__networks]
+
+    @property
+    def stations_objects(self):
+        """
+        Method to get all stations objects from all networks
+        :return: list of dicts - station objects
+        """
+        return [station.to_dict() for station in self.__stations]
+
+    @property
+    def stations_names_list(self):
+        """
+        Method to get all station names
+        :return: list of strings - stations names
+        """
+        return [station.name for station in self.__stations]
+
+    def _get_network(self, network_name):
+        """
+        Method to get network record using name
+        :param network_name: string - network name
+        :return: Network - network record with this name
+        """
+        name = str(network_name)
+        try:
+            return self.__networks_by_name[name]
+        except KeyError:
+            raise ValueError(f"Not found network with name \'{name}\'") from None
+
+    def _get_station_by_name(self, station_name, network_name=None):
+        """
+        Method to get station record by name
+        :param station_name: string - station name
+        :param network_name: string - (optional) network name to choose station from (default = None)
+        :return: Station - station record with this name
+        """
+        name = str(station_name)
+        stations = self.__stations_by_name.get(name)
+        if not stations:
+            raise ValueError(f"Not found station with name \'{name}\'")
+
+        # if network specified - looking for station only inside this network
+        if network_name is not None:
+            network = self._get_network(network_name)
+            for station in stations:
+                if station.network is network:
+                    return station
+
+            raise ValueError(f"Not found station with name \'{name}\' in network \'{network_name}\'")
+
+        # first station in catalog order is returned, as it was before lookup dicts
+        if len(stations) > 1:
+            networks_names = [station.network.name for station in stations]
+            warnings.warn(f"Station name \'{name}\' is used in several networks {networks_names}, "
+                          f"station from \'{networks_names[0]}\' is used. Specify network name or use station ID.",
+                          stacklevel=3)
+
+        return stations[0]
+
+    def _get_station_by_id(self, station_id):
+        """
+        Method to get station record by station ID
+        :param station_id: int or string - station ID
+        :return: Station - station record with this ID
+        """
+        try:
+            return self.__stations_by_id[int(station_id)]
+        except (KeyError, ValueError, TypeError):
+            raise ValueError(f"Not found station with ID \'{station_id}\'") from None
+
+    def get_network_object_by_name(self, network_name):
+        """
+        Method to get network object using name
+        :param network_name: string - network name
+        :return: dict - network object with this name
+        """
+        return self._get_network(network_name).to_dict()
+
+    def get_station_object_by_name(self, station_name, network_name=None):
+        """
+        Method to get station object by name
+        Same station name can be used in several networks - network name chooses one of them,
+        otherwise first station in catalog order is returned with warning
+        :param station_name: string - station name
+        :param network_name: string - (optional) network name to choose station from (default = None)
+        :return: dict - station object with this name
+        """
+        return self._get_station_by_name(station_name, network_name).to_dict()
+
+    def get_station_object_by_id(self, station_id):
+        """
+        Method to get station object by station ID
+        :param station_id: int or string - station ID
+        :return: dict - station object with this ID
+        """
+        return self._get_station_by_id(station_id).to_dict()
+
+    def get_network_for_station(self, station_id):
+        """
+        Method to get network object where station is placed
+        :param station_id: int or string - station ID
+        :return: dict - network object for this station
+        """
+        return self._get_station_by_id(station_id).network.to_dict()
+
+    def get_stations_objects_list_for_network(self, network_name):
+        """
+        Method to get list of station objects for this network
+        :param network_name: string - network name
+        :return: list of dicts - station objects
+        """
+        return [station.to_dict() for station in self._get_network(network_name).stations]
+
+    def get_stations_names_list_for_network(self, network_name):
+        """
+        Method to get list of station names for this network
+        :param network_name: string - network name
+        :return: list of strings - station names
+        """
+        return [station.name for station in self._get_network(network_name).stations]
+
+    def get_station_id_by_name(self, station_name, network_name=None):
+        """
+        Method to get station ID for this station name
+        :param station_name: string - station name
+        :param network_name: string - (optional) network name to choose station from (default = None)
+        :return: int - station ID
+        """
+        return int(self._get_station_by_name(station_name, network_name).station_id)
+
+    def find_stations_near(self, lat, lon, radius_km):
+        """
+        Method to get stations inside circle around point
+        :param lat: int or float - latitude in degrees
+        :param lon: int or float - longitude in degrees
+        :param radius_km: int or float - circle radius in km
+        :return: list of tuples - (station object, distance in km) sorted by distance
+        """
+        return [(station.to_dict(), distance)
+                for station, distance in self.spatial_index.find_stations_near(lat, lon, radius_km)]
+
+    def find_nearest_stations(self, lat, lon, k=1, max_distance_km=None):
+        """
+        Method to get k nearest stations to point
+        :param lat: int or float - latitude in degrees
+        :param lon: int or float - longitude in degrees
+        :param k: int - (optional) number of stations (default = 1)
+        :param max_distance_km: int or float - (optional) maximum distance to station, not limited if None
+        (default = None)
+        :return: list of tuples - (station object, distance in km) sorted by distance
+        """
+        return [(station.to_dict(), distance)
+                for station, distance in self.spatial_index.find_nearest_stations(lat, lon, k, max_distance_km)]
+
+    def find_stations_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        Method to get stations inside bounding box, if min_lon is bigger than max_lon box crosses antimeridian
+        :param min_lat: int or float - southern latitude in degrees
+        :param min_lon: int or float - western longitude in degrees
+        :param max_lat: int or float - northern latitude in degrees
+        :param max_lon: int or float - eastern longitude in degrees
+        :return: list of dicts - station objects
+        """
+        return [station.to_dict()
+                for station in self.spatial_index.find_stations_in_bbox(min_lat, min_lon, max_lat, max_lon)]
+
+    def find_nearest_stations_batch(self, lats, lons, k=1, max_distance_km=None):
+        """
+        Method to get k nearest stations for many points, e.g. for satellite pixels centers
+        :param lats: array-like - latitudes in degrees
+        :param lons: array-like - longitudes in degrees
+        :param k: int - (optional) number of stations for every point (default = 1)
+        :param max_distance_km: int or float - (optional) maximum distance to station, not limited if None
+        (default = None)
+        :return: tuple - (list of lists of station objects or None, numpy.ndarray of distances in km)
+        with (points number, k) shapes, missing stations are None with NaN distance
+        """
+        indexes, distances = self.spatial_index.find_nearest_stations_batch(lats, lons, k, max_distance_km)
+        stations = self.spatial_index.stations_objects
+        # every station object is built once even if it is nearest for many points
+        stations_objects = {station_index: stations[station_index].to_dict() for station_index in set(indexes.flat)
+                            if station_index >= 0}
+        return [[stations_objects.get(station_index) for station_index in row] for row in indexes], distances
+
+    def find_stations_near_batch(self, lats, lons, radius_km):
+        """
+        Method to get stations inside circles around many points
+        :param lats: array-like - latitudes in degrees
+        :param lons: array-like - longitudes in degrees
+        :param radius_km: int or float - circles radius in km
+        :return: list of lists - (station object, distance in km) tuples sorted by distance for every point
+        """
+        return [[(station.to_dict(), distance) for station, distance in stations]
+                for stations in self.spatial_index.find_stations_near_batch(lats, lons, radius_km)]
+
+    def query_stations(self, variable=None, depth=None, active_between=None, network=None, country=None,
+                       sensor=None):
+        """
+        Method to get stations matching all passed conditions
+        :param variable: string or list of strings - (optional) measured variable (default = None)
+        :param depth: int, float or tuple - (optional) depth in m or (depth from, depth to) range (default = None)
+        :param active_between: tuple - (optional) (start date, end date) period with observations (default = None)
+        :param network: string or list of strings - (optional) network name (default = None)
+        :param country: string or list of strings - (optional) country name (default = None)
+        :param sensor: string or list of strings - (optional) sensor model or manufacturer (default = None)
+        :return: list of dicts - station objects
+        """
+        return [station.to_dict() for station in
+                self.query_index.query_stations(variable, depth, active_between, network, country, sensor)]
+
+    def get_station_fields(self, station_id):
+        """
+        Method to get parsed catalog fields of station
+        :param station_id: int or string - station ID
+        :return: StationFields - parsed station fields
+        """
+        return self.query_index.get_station_fields(station_id)
+
+
+class CatalogLookupMixin(abc.ABC):
+    """
+    Mixin with networks and stations lookup methods for parsers
+    Parser class must provide 'catalog' property which returns ISMNCatalog object
+    """
+
+    @property
+    @abc.abstractmethod
+    def catalog(self):
+        """
+        Method to get networks catalog
+        :return: ISMNCatalog - networks and stations catalog
+        """
+
+    @property
+    def network_names_list(self):
+        """
+        Method to get list of networks names from ISMN
+        :return: list of strings - networks names or None
+        """
+        return self.catalog.network_names_list
+
+    @property
+    def networks_objects(self):
+        """
+        Method to get all networks objects wit all inner data
+
+        Network object example:
+        {
+            Stations: [list of station objects],
+            networkID: "AACES"
+            network_abstract: null
+            network_acknowledge: null
+            network_constraints: null
+            network_continent: "Australia"
+            network_country: "Australia"
+            network_depths: "0.00 - 0.05 m <br>0.00 - 0.06 m <br>0.25 - 0.25 m <br>"
+            network_op_end: "2010-09-26"
+            network_op_start: "2010-01-18"
+            network_reference: "Peischl, S., Walker, J. P..."
+            network_sensors: "ThetaProbe ML2X,<br>"
+            network_status: "inactive"
+            network_type: "project"
+            network_url: "http://www.moisturemap.monash.edu.au/"
+            network_url_data: null
+            network_variables: "soil moisture<br>soil temperature<br>precipitation<br>"
+        }
+
+        :return: list of dicts - networks objects or None
+        """
+        return self.catalog.networks_objects
+
+    @property
+    def stations_objects(self):
+        """
+        Method to get all available stations objects
+
+        Station object example:
+        {
+            comment: null
+            depthText: "0.00 - 0.06 m <br>0.25 - 0.25 m <br>"
+            extMetadata: null
+            lat: "-34.780428"
+            lng: "147.140801"
+            maximum: "2010/02/10 01:00:00"
+            minimum: "2010/02/08 00:00:00"
+            sensorText: "Delta-T Devices, ThetaProbe ML2X,<br>"
+            stationID: "2134"
+            station_abbr: "25"
+            station_name: "Station25"
+            variableText: "soil moisture<br>soil temperature<br>precipitation<br>"
+        }
+
+        :return: list of dicts - station objects or None
+        """
+        return self.catalog.stations_objects
+
+    @property
+    def stations_names_list(self):
+        """
+        Method to get all available station names
+        :return: list of strings - stations names or None
+        """
+        return self.catalog.stations_names_list
+
+    def get_network_object_by_name(self, network_name):
+        """
+        Method to get network object using name
+        :param network_name: string - network name
+        :return: dict - network object with this name or None
+        """
+        return self.catalog.get_network_object_by_name(network_name)
+
+    def get_station_object_by_name(self, station_name, network_name=None):
+        """
+        Method to get station object by name
+        Same station name can be used in several networks - network name chooses one of them,
+        otherwise first station in catalog order is returned with warning
+        :param station_name: string - station name
+        :param network_name: string - (optional) network name to choose station from (default = None)
+        :return: dict - station object with this name or None
+        """
+        return self.catalog.get_station_object_by_name(station_name, network_name)
+
+    def get_station_object_by_id(self, station_id):
+        """
+        Method to get station object by station ID
+        :param station_id: int or string - station ID
+        :return: dict - station object with this ID
+        """
+        return self.catalog.get_station_object_by_id(station_id)
+
+    def get_network_for_station(self, station_id):
+        """
+        Method to get network object where station is placed
+        :param station_id: int or string - station ID
+        :return: dict - network object for this station
+        """
+        return self.catalog.get_network_for_station(station_id)
+
+    def get_stations_objects_list_for_network(self, network_name):
+        """
+        Method to get list of station objects for this network
+        :param network_name: string - network name
+        :return: list of dicts - station objects or None
+        """
+        return self.catalog.get_stations_objects_list_for_network(network_name)
+
+    def get_stations_names_list_for_network(self, network_name):
+        """
+        Method to get list of station names for this network
+        :param network_name: string - network name
+        :return: list of strings - station names or None
+        """
+        return self.catalog.get_stations_names_list_for_network(network_name)
+
+    def get_station_id_by_name(self, station_name, network_name=None):
+        """
+        Method to get station ID for this station name
+        :param station_name: string - station name
+        :param network_name: string - (optional) network name to choose station from (default = None)
+        :return: int - station ID
+        """
+        return self.catalog.get_station_id_by_name(station_name, network_name)
+
+    def find_stations_near(self, lat, lon, radius_km):
+        """
+        Method to get stations inside circle around point
+        :param lat: int or float - latitude in degrees
+        :param lon: int or float - longitude in degrees
+        :param radius_km: int or float - circle radius in km
+        :return: list of tuples - (station object, distance in km) sorted by distance
+        """
+        return self.catalog.find_stations_near(lat, lon, radius_km)
+
+    def find_nearest_stations(self, lat, lon, k=1, max_distance_km=None):
+        """
+        Method to get k nearest stations to point
+        :param lat: int or float - latitude in degrees
+        :param lon: int or float - longitude in degrees
+        :param k: int - (optional) number of stations (default = 1)
+        :param max_distance_km: int or float - (optional) maximum distance to station, not limited if None
+        (default = None)
+        :return: list of tuples - (station object, distance in km) sorted by distance
+        """
+        return self.catalog.find_nearest_stations(lat, lon, k, max_distance_km)
+
+    def find_stations_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        Method to get stations inside bounding box, if min_lon is bigger than max_lon box crosses antimeridian
+        :param min_lat: int or float - southern latitude in degrees
+        :param min_lon: int or float - western longitude in degrees
+        :param max_lat: int or float - northern latitude in degrees
+        :param max_lon: int or float - eastern longitude in degrees
+        :return: list of dicts - station objects
+        """
+        return self.catalog.find_stations_in_bbox(min_lat, min_lon, max_lat, max_lon)
+
+    def find_nearest_stations_batch(self, lats, lons, k=1, max_distance_km=None):
+        """
+        Method to get k nearest stations for many points, e.g. for satellite pixels centers
+        :param lats: array-like - latitudes in degrees
+        :param lons: array-like - longitudes in degrees
+        :param k: int - (optional) number of stations for every point (default = 1)
+        :param max_distance_km: int or float - (optional) maximum distance to station, not limited if None
+        (default = None)
+        :return: tuple - (list of lists of station objects or None, numpy.ndarray of distances in km)
+        with (points number, k) shapes, missing stations are None with NaN distance
+        """
+        return self.catalog.find_nearest_stations_batch(lats, lons, k, max_distance_km)
+
+    def find_stations_near_batch(self, lats, lons, radius_km):
+        """
+        Method to get stations inside circles around many points
+        :param lats: array-like - latitudes in degrees
+        :param lons: array-like - longitudes in degrees
+        :param radius_km: int or float - circles radius in km
+        :return: list of lists - (station object, distance in km) tuples sorted by distance for every point
+        """
+        return self.catalog.find_stations_near_batch(lats, lons, radius_km)
+
+    def query_stations(self, variable=None, depth=None, active_between=None, network=None, country=None,
+                       sensor=None):
+        """
+        Method to get stations matching all passed conditions
+        Names are case insensitive and "_" is the same as space, list of names matches any of them.
+
+        Usage example:
+            parser.query_stations(variable="soil moisture", depth=0.05, active_between=("2016/01/01", "2016/12/31"))
+
+        :param variable: string or list of strings - (optional) measured variable, e.g. "soil moisture"
+        (default = None)
+        :param depth: int, float or tuple - (optional) depth in m or (depth from, depth to) range (default = None)
+        :param active_between: tuple - (optional) (start date, end date) period with observations,
+        dates in YYYY/MM/DD format (default = None)
+        :param network: string or list of strings - (optional) network name (default = None)
+        :param country: string or list of strings - (optional) country name (default = None)
+        :param sensor: string or list of strings - (optional) sensor model or manufacturer (default = None)
+        :return: list of dicts - station objects
+        """
+        return self.catalog.query_stations(variable, depth, active_between, network, country, sensor)
+
+    def get_station_fields(self, station_id):
+        """
+        Method to get parsed catalog fields of station - variables, depths, sensors and observations period
+        :param station_id: int or string - station ID
+        :return: StationFields - parsed station fields
+        """
+        return self.catalog.get_station_fields(station_id)
@@ -0,0 +1,120 @@
+import datetime
+import json
+import re
+from collections import namedtuple
+import numpy as np
+from sm_tools.streaming import dates_to_numpy, values_to_numpy
+
+
+class SensorHandle(namedtuple("SensorHandle", ["station_id", "sensor_id", "variable_id", "depth_id",
+                                               "sensor_name", "sensor_type", "sensor_depth"])):
+    """
+    Resolved sensor identifiers needed to request observations from ISMN
+
+    Handle does not depend on parser instance, so it can be pickled or saved as dict with _asdict()
+    and restored with SensorHandle(**data) to fetch observations later without any metadata requests
+    """
+    __slots__ = ()
+
+
+def parse_json_response(content):
+    """
+    Method to parse json server response
+    :param content: bytes - raw server response
+    :return: parsed json data
+    """
+    try:
+        return json.loads(content.decode("utf-8"))
+    except (json.decoder.JSONDecodeError, UnicodeDecodeError):
+        raise ValueError("Error while server response processing! "
+                         "Check input parameters or https://www.geo.tuwien.ac.at/ server status.") from None
+
+
+def parse_observations(observation_data, normalize=True, as_numpy=False, dtype=np.float64):
+    """
+    Method to convert parsed observations response to result dict
+    :param observation_data: list - [list of dates, list of values] from server
+    :param normalize: bool - use absolute values if True, otherwise - values * 100
+    :param as_numpy: bool - (optional) return numpy arrays instead of lists (default = False)
+    :param dtype: numpy dtype - (optional) observations array type if as_numpy is True (default = np.float64)
+    :return: dict - {"dates": list of observation dates, "observation": list of observations}
+    """
+    if as_numpy:
+        return {"dates": dates_to_numpy(observation_data[0]),
+                "observations": values_to_numpy(observation_data[1], normalize, dtype)}
+
+    observations = [float(obs) for obs in observation_data[1]]
+    observations = [round(obs / 100, 5) for obs in observations] if normalize else observations
+    return {"dates": observation_data[0], "observations": observations}
+
+
+def get_sensors_cache_key(station_id, start_date, end_date):
+    """
+    Method to get sensors metadata cache key
+    :param station_id: int or string - station ID
+    :param start_date: string - date format YYYY/MM/DD
+    :param end_date: string - date format YYYY/MM/DD
+    :return: tuple - (station ID, start date, end date)
+    """
+    try:
+        return int(station_id), start_date, end_date
+    except (ValueError, TypeError):
+        return str(station_id), start_date, end_date
+
+
+def get_sensor_type_and_depth_by_name(sensor_name):
+    """
+    Method to extract sensor type and sensor depth from sensor name
+    :param sensor_name: string - sensor name
+    :return: dict - {"sensor_type": sensor_type, "sensor_depth": sensor_depth}
+    """
+    if not sensor_name:
+        raise ValueError("You need to specify correct sensor name!")
+
+    sensor_type = sensor_name.split("(")[0]
+    sensor_depth = re.search(r"(-?\d\.\d+[a-z]-?)+", sensor_name).group(0)
+    return {"sensor_type": sensor_type, "sensor_depth": sensor_depth}
+
+
+def make_sensor_handle(station_id, sensors, sensor_name):
+    """
+    Method to create sensor handle from station sensors list
+    :param station_id: int or string - station ID
+    :param sensors: list of dicts - station sensors objects
+    :param sensor_name: string - sensor name for station
+    :return: SensorHandle - resolved sensor identifiers
+    """
+    for sensor in sensors:
+        if sensor["variableName"] == sensor_name:
+            break
+    else:
+        raise ValueError(f"Sensor with name {sensor_name} not found!")
+
+    # type and depth are only informational, so unusual sensor names should not break handle creation
+    try:
+        type_and_depth = get_sensor_type_and_depth_by_name(sensor_name)
+    except (ValueError, AttributeError):
+        type_and_depth = {"sensor_type": None, "sensor_depth": None}
+
+    return SensorHandle(station_id=int(station_id), sensor_id=int(sensor["sensorId"]),
+                        variable_id=int(sensor["variableId"]), depth_id=int(sensor["depthId"]),
+                        sensor_name=sensor_name, **type_and_depth)
+
+
+def validate_dates(start_date, end_date):
+    """
+    Method to check requested period
+    :param start_date: string - date format YYYY/MM/DD
+    :param end_date: string - date format YYYY/MM/DD
+    :return: tuple - (start date, end date) as datetime objects
+    """
+    try:
+        start_date_object = datetime.datetime.strptime(start_date, '%Y/%m/%d')
+        end_date_object = datetime.datetime.strptime(end_date, '%Y/%m/%d')
+    except Exception:
+        raise ValueError("Start and end dates must be in YYYY/MM/DD format!")
+
+    if start_date_object > end_date_object:
+        raise ValueError("Start date must be earlier then end date!")
+
+    return start_date_object, end_date_object
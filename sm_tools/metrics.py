@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque, namedtuple
+import numpy as np
+
+
+# one request to server or one cache lookup which replaces it
+# endpoint - "networks", "sensors" or "observations", url - request url or None for cache lookup,
+# station_id - requested station or None, status - response status or None, latency - seconds without decode time,
+# size - response body bytes, decode_time - seconds spent on decoding response,
+# cache - "hit" or "miss" for cache lookups and None for requests, error - error class name or None
+RequestEvent = namedtuple("RequestEvent", ["endpoint", "url", "station_id", "status", "latency", "size",
+                                           "decode_time", "cache", "error"])
+
+
+class RequestMeasurement:
+    """
+    Context manager which measures one request and passes RequestEvent to callback on exit
+
+    Usage example:
+        with RequestMeasurement(callback, "sensors", url, station_id) as measurement:
+            response = measurement.set_response(session.get(url))
+            metadata = measurement.decode(json.loads, response.content)
+    """
+
+    __slots__ = ("callback", "endpoint", "url", "station_id", "status", "size", "decode_time", "started_at")
+
+    def __init__(self, callback, endpoint, url, station_id=None):
+        """
+        :param callback: function - callback(event) called with RequestEvent when request is finished
+        :param endpoint: string - "networks", "sensors" or "observations"
+        :param url: string - request url
+        :param station_id: int or string - (optional) requested station (default = None)
+        """
+        self.callback = callback
+        self.endpoint = endpoint
+        self.url = url
+        self.station_id = station_id
+        self.status = None
+        self.size = 0
+        self.decode_time = 0.0
+        self.started_at = None
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        latency = time.perf_counter() - self.started_at - self.decode_time
+        self.callback(RequestEvent(self.endpoint, self.url, self.station_id, self.status, latency, self.size,
+                                   self.decode_time, None, error_type.__name__ if error_type is not None else None))
+        return False
+
+    def set_response(self, response, stream=False):
+        """
+        Method to save response status and body size
+        :param response: requests.Response - server response
+        :param stream: bool - (optional) if True body is not read and its size must be added with add_size()
+        (default = False)
+        :return: requests.Response - the same response
+        """
+        self.status = response.status_code
+        if not stream:
+            self.size = len(response.content)
+        return response
+
+    def add_size(self, size):
+        """
+        Method to add size of streamed response part
+        :param size: int - part size in bytes
+        """
+        self.size += size
+
+    def decode(self, function, *args):
+        """
+        Method to call decode function and add its time to decode time
+        :param function: function - decode function
+        :param args: function arguments
+        :return: function result
+        """
+        started_at = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.decode_time += time.perf_counter() - started_at
+
+
+class MetricsAggregator:
+    """
+    Thread safe in-memory aggregator of parser requests events
+
+    Aggregator is a hook - it is passed to ISMNDataParser(hooks=[aggregator]) or parser.add_hook(aggregator),
+    and summary() returns counters and latency, size and decode time percentiles for every endpoint.
+    Only last max_samples requests of every endpoint are kept for percentiles, counters include all requests.
+
+    Usage example:
+        metrics = MetricsAggregator()
+        parser = ISMNDataParser(hooks=[metrics])
+        ...
+        print(metrics.summary()["observations"]["latency"]["p99"])
+        print(metrics.get_slowest_stations(5))
+    """
+
+    # summary percentiles
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, max_samples=10000):
+        """
+        :param max_samples: int - (optional) number of last requests of every endpoint kept for percentiles
+        (default = 10000)
+        """
+        if max_samples is None or int(max_samples) < 1:
+            raise ValueError("Number of samples must be positive integer!")
+
+        self.max_samples = int(max_samples)
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def __call__(self, event):
+        """
+        Method to add event to statistics
+        :param event: RequestEvent - request or cache lookup event
+        """
+        with self.__lock:
+            endpoint = self.__endpoints.get(event.endpoint)
+            if endpoint is None:
+                endpoint = self.__endpoints[event.endpoint] = {
+                    "requests": 0, "errors": 0, "statuses": dict(), "cache_hits": 0, "cache_misses": 0, "size": 0,
+                    "samples": deque(maxlen=self.max_samples)}
+
+            # cache lookups are counted separately from requests
+            if event.url is None:
+                if event.cache == "hit":
+                    endpoint["cache_hits"] += 1
+                elif event.cache == "miss":
+                    endpoint["cache_misses"] += 1
+                return
+
+            endpoint["requests"] += 1
+            endpoint["size"] += event.size
+            if event.error is not None:
+                endpoint["errors"] += 1
+            if event.status is not None:
+                endpoint["statuses"][event.status] = endpoint["statuses"].get(event.status, 0) + 1
+            endpoint["samples"].append((event.latency, event.size, event.decode_time))
+
+            if event.station_id is not None:
+                station = self.__stations.setdefault((event.endpoint, event.station_id), [0, 0.0, 0.0])
+                station[0] += 1
+                station[1] += event.latency + event.decode_time
+                station[2] = max(station[2], event.latency + event.decode_time)
+
+    def _get_percentiles(self, values):
+        """
+        Method to get percentiles, mean and maximum of values
+        :param values: numpy.ndarray - values
+        :return: dict - {"p50": float, ..., "mean": float, "max": float} or None if there is no values
+        """
+        if not len(values):
+            return None
+
+        summary = {f"p{percentile}": float(value)
+                   for percentile, value in zip(self.PERCENTILES, np.percentile(values, self.PERCENTILES))}
+        summary["mean"] = float(values.mean())
+        summary["max"] = float(values.max())
+        return summary
+
+    def summary(self):
+        """
+        Method to get statistics of every endpoint
+        :return: dict - endpoint -> {"requests": int, "errors": int, "statuses": dict, "cache_hits": int,
+        "cache_misses": int, "cache_hit_rate": float or None, "size": int - total bytes,
+        "latency": dict, "size_per_request": dict, "decode_time": dict} - percentiles dicts are None
+        if there were no requests
+        """
+        with self.__lock:
+            endpoints = {name: dict(endpoint, statuses=dict(endpoint["statuses"]), samples=list(endpoint["samples"]))
+                         for name, endpoint in self.__endpoints.items()}
+
+        summary = dict()
+        for name, endpoint in endpoints.items():
+            samples = np.array(endpoint.pop("samples"), dtype=np.float64).reshape(-1, 3)
+            lookups = endpoint["cache_hits"] + endpoint["cache_misses"]
+            endpoint["cache_hit_rate"] = endpoint["cache_hits"] / lookups if lookups else None
+            endpoint["latency"] = self._get_percentiles(samples[:, 0])
+            endpoint["size_per_request"] = self._get_percentiles(samples[:, 1])
+            endpoint["decode_time"] = self._get_percentiles(samples[:, 2])
+            summary[name] = endpoint
+        return summary
+
+    def get_slowest_stations(self, count=10, endpoint="observations"):
+        """
+        Method to get stations with the biggest mean request time including decode time
+        :param count: int - (optional) number of stations (default = 10)
+        :param endpoint: string - (optional) "sensors" or "observations" (default = "observations")
+        :return: list of tuples - (station ID, requests number, mean time, maximum time) sorted by mean time
+        """
+        with self.__lock:
+            stations = [(station_id, requests, total_time / requests, max_time)
+                        for (station_endpoint, station_id), (requests, total_time, max_time) in self.__stations.items()
+                        if station_endpoint == endpoint]
+        return sorted(stations, key=lambda station: station[2], reverse=True)[:count]
+
+    def reset(self):
+        """
+        Method to remove all statistics
+        """
+        with self.__lock:
+            self.__endpoints = dict()
+            # (endpoint, station ID) -> [requests, total time, maximum time]
+            self.__stations = dict()
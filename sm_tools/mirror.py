@@ -0,0 +1,403 @@
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import numpy as np
+import requests
+from sm_tools.parsers import ISMNDataParser
+from sm_tools.rate_limit import TokenBucket
+
+
+# one sensor observations period to download, key is unique task name in manifest
+MirrorTask = namedtuple("MirrorTask", ["key", "network_name", "handle", "start_date", "end_date"])
+
+
+class MirrorManifest:
+    """
+    Class for checkpoint file of mirror run - status of every finished task is saved,
+    so interrupted run is continued without downloading finished tasks again
+    """
+
+    def __init__(self, path):
+        """
+        :param path: string - path to manifest json file
+        """
+        self.path = str(path)
+        self.tasks = dict()
+        self.load()
+
+    def load(self):
+        """
+        Method to read manifest from disk, missing or broken manifest is the same as empty one
+        """
+        try:
+            with open(self.path, "r") as manifest_file:
+                self.tasks = json.load(manifest_file)["tasks"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.tasks = dict()
+
+    def save(self):
+        """
+        Method to write manifest to disk, old manifest is replaced atomically
+        """
+        manifest_dir = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(manifest_dir, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=manifest_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w") as temp_file:
+                json.dump({"tasks": self.tasks}, temp_file, indent=1)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def is_done(self, task_key, output_dir):
+        """
+        Method to check if task was finished and its file still exists
+        :param task_key: string - task key
+        :param output_dir: string - mirror output directory
+        :return: bool - True if task does not need to be downloaded again
+        """
+        task = self.tasks.get(task_key)
+        return task is not None and task.get("status") == "done" and \
+            os.path.exists(os.path.join(output_dir, task["path"]))
+
+    def mark_done(self, task_key, path, observations):
+        """
+        Method to save finished task
+        :param task_key: string - task key
+        :param path: string - observations file path relative to output directory
+        :param observations: int - number of downloaded observations
+        """
+        self.tasks[task_key] = {"status": "done", "path": path, "observations": observations}
+
+    def mark_failed(self, task_key, error):
+        """
+        Method to save failed task, it will be downloaded again on next run
+        :param task_key: string - task key
+        :param error: Exception - task error
+        """
+        self.tasks[task_key] = {"status": "failed", "error": f"{type(error).__name__}: {error}"}
+
+
+def get_task_path(task):
+    """
+    Method to get observations file path for task
+    :param task: MirrorTask - mirror task
+    :return: string - file path relative to output directory
+    """
+    handle = task.handle
+    period = f"{task.start_date.replace('/', '')}-{task.end_date.replace('/', '')}"
+    file_name = f"{handle.sensor_id}_{handle.variable_id}_{handle.depth_id}_{period}.npz"
+    return os.path.join(task.network_name, str(handle.station_id), file_name)
+
+
+def download_task(parser, task, output_dir, chunk_by="year", rate_limiter=None):
+    """
+    Method to download observations for one task and save them to .npz file
+    :param parser: ISMNDataParser - parser to download observations with
+    :param task: MirrorTask - mirror task
+    :param output_dir: string - mirror output directory
+    :param chunk_by: string or int - (optional) "year", "month" or number of days in one request (default = "year")
+    :param rate_limiter: TokenBucket - (optional) limiter of started tasks (default = None)
+    :return: tuple - (file path relative to output directory, number of observations, file size in bytes)
+    """
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+
+    data = parser.get_observations_by_chunks(task.handle, task.start_date, task.end_date, chunk_by=chunk_by,
+                                             max_workers=1, as_numpy=True, stream=True)
+
+    path = get_task_path(task)
+    file_path = os.path.join(output_dir, path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    # file is written under temporary name, so interrupted task never leaves partial file
+    file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as temp_file:
+            np.savez(temp_file, dates=data["dates"], observations=data["observations"])
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return path, len(data["dates"]), os.path.getsize(file_path)
+
+
+# parser and rate limiter of worker process
+_process_state = dict()
+
+
+def _init_process_worker(parser_state, rate_limit):
+    """
+    Method to restore mirror parser in worker process
+    :param parser_state: bytes - pickled ISMNDataParser with its headers, transport, urls and caches settings
+    :param rate_limit: int or float - maximum number of tasks started per second by this process or None
+    """
+    # parser is unpickled lazily, so every worker has own connections and does not download catalog
+    _process_state["parser"] = pickle.loads(parser_state)
+    _process_state["rate_limiter"] = TokenBucket(rate_limit) if rate_limit is not None else None
+
+
+def _process_worker(task, output_dir, chunk_by):
+    """
+    Method to download one task in worker process
+    :param task: MirrorTask - mirror task
+    :param output_dir: string - mirror output directory
+    :param chunk_by: string or int - "year", "month" or number of days in one request
+    :return: tuple - (file path relative to output directory, number of observations, file size in bytes)
+    """
+    return download_task(_process_state["parser"], task, output_dir, chunk_by, _process_state["rate_limiter"])
+
+
+class NetworkMirror:
+    """
+    Class for downloading all observations of networks or stations to disk
+
+    Every sensor is one task, tasks are downloaded with thread or process pool and every
+    finished task is saved to manifest, so failed or interrupted run can be started again
+    and only not finished tasks are downloaded.
+
+    Usage example:
+        mirror = NetworkMirror("ismn_mirror", workers=8)
+        tasks, errors = mirror.get_tasks(networks=["REMEDHUS"], start_date="2016/01/01", end_date="2016/12/31")
+        statistics = mirror.run(tasks)
+    """
+
+    # minimal time in seconds between manifest writes
+    MANIFEST_SAVE_INTERVAL = 1.0
+
+    def __init__(self, output_dir, workers=4, use_processes=False, rate_limit=None, chunk_by="year",
+                 manifest_path=None, parser=None, report=None):
+        """
+        :param output_dir: string - directory to save observations files and manifest in
+        :param workers: int - (optional) number of threads or processes (default = 4)
+        :param use_processes: bool - (optional) use process pool instead of thread pool (default = False)
+        :param rate_limit: int or float - (optional) maximum number of tasks started per second,
+        not limited if None (default = None)
+        :param chunk_by: string or int - (optional) "year", "month" or number of days in one request (default = "year")
+        :param manifest_path: string - (optional) manifest file path, 'manifest.json' inside output directory
+        if None (default = None)
+        :param parser: ISMNDataParser - (optional) parser to use, new parser with catalog cache inside
+        output directory if None, with use_processes=True its pickled copy is used in every worker process,
+        so its hooks are not called for observations requests (default = None)
+        :param report: function - (optional) function called with progress messages, e.g. print (default = None)
+        """
+        if int(workers) < 1:
+            raise ValueError("Number of workers must be positive integer!")
+
+        self.output_dir = str(output_dir)
+        self.workers = int(workers)
+        self.use_processes = use_processes
+        self.rate_limit = rate_limit
+        self.chunk_by = chunk_by
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.manifest = MirrorManifest(manifest_path if manifest_path is not None
+                                       else os.path.join(self.output_dir, "manifest.json"))
+        # catalog cache is shared by runs, so resumed run does not download catalog again
+        self.parser = parser if parser is not None \
+            else ISMNDataParser(lazy=True, cache_dir=os.path.join(self.output_dir, ".catalog_cache"))
+        self.report = report if report is not None else (lambda message: None)
+
+    def _get_station_tasks(self, network_name, station, start_date, end_date):
+        """
+        Method to get tasks for all sensors of station
+        :param network_name: string - network name
+        :param station: dict - station object
+        :param start_date: string - date format YYYY/MM/DD or None to use station 'minimum' date
+        :param end_date: string - date format YYYY/MM/DD or None to use station 'maximum' date
+        :return: list of MirrorTask - station tasks
+        """
+        station_id = int(station["stationID"])
+        start_date = start_date if start_date is not None else str(station["minimum"])[:10]
+        end_date = end_date if end_date is not None else str(station["maximum"])[:10]
+
+        tasks = []
+        for sensor_name in self.parser.get_sensors_names_list_for_station_by_id(station_id, start_date, end_date):
+            handle = self.parser.get_sensor_handle_by_id(station_id, sensor_name, start_date, end_date)
+            task_key = f"{network_name}/{station_id}/{sensor_name}/{start_date}-{end_date}"
+            tasks.append(MirrorTask(task_key, network_name, handle, start_date, end_date))
+        return tasks
+
+    def get_tasks(self, networks=None, stations=None, start_date=None, end_date=None):
+        """
+        Method to get tasks for all sensors of networks and stations
+        Sensors metadata of stations is requested concurrently.
+        :param networks: list of strings - (optional) networks names (default = None)
+        :param stations: list of ints - (optional) stations IDs (default = None)
+        :param start_date: string - (optional) date format YYYY/MM/DD, station 'minimum' date if None (default = None)
+        :param end_date: string - (optional) date format YYYY/MM/DD, station 'maximum' date if None (default = None)
+        :return: tuple - (list of MirrorTask, dict station ID -> error for stations which metadata was not received)
+        """
+        stations_list = []
+        for network_name in networks or []:
+            for station in self.parser.get_stations_objects_list_for_network(network_name):
+                stations_list.append((network_name, station))
+        for station_id in stations or []:
+            network_name = self.parser.get_network_for_station(station_id)["networkID"]
+            stations_list.append((network_name, self.parser.get_station_object_by_id(station_id)))
+
+        # same station can be passed with network and with ID
+        stations_list = list({int(station["stationID"]): (network_name, station)
+                              for network_name, station in stations_list}.values())
+
+        tasks, errors = [], dict()
+        self.parser.resize_connection_pool(self.workers)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._get_station_tasks, network_name, station, start_date, end_date):
+                       int(station["stationID"]) for network_name, station in stations_list}
+            for future in as_completed(futures):
+                try:
+                    tasks.extend(future.result())
+                except Exception as error:
+                    errors[futures[future]] = error
+                    self.report(f"Can not get sensors for station {futures[future]}: {error}")
+
+        return sorted(tasks, key=lambda task: task.key), errors
+
+    def _save_manifest(self, force=False):
+        """
+        Method to write manifest if enough time passed since last write
+        :param force: bool - (optional) write manifest anyway (default = False)
+        """
+        now = time.monotonic()
+        if force or now - self.__last_manifest_save >= self.MANIFEST_SAVE_INTERVAL:
+            self.manifest.save()
+            self.__last_manifest_save = now
+
+    def _create_executor(self):
+        """
+        Method to create pool for tasks
+        :return: tuple - (executor, function which downloads one task in this executor)
+        """
+        if self.use_processes:
+            process_rate_limit = self.rate_limit / self.workers if self.rate_limit is not None else None
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_process_worker,
+                                           initargs=(pickle.dumps(self.parser), process_rate_limit))
+            return executor, lambda task: executor.submit(_process_worker, task, self.output_dir, self.chunk_by)
+
+        rate_limiter = TokenBucket(self.rate_limit) if self.rate_limit is not None else None
+        self.parser.resize_connection_pool(self.workers)
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        return executor, lambda task: executor.submit(download_task, self.parser, task, self.output_dir,
+                                                      self.chunk_by, rate_limiter)
+
+    def run(self, tasks):
+        """
+        Method to download all not finished tasks
+        Task errors do not stop the run - failed tasks are saved to manifest and downloaded again on next run.
+        :param tasks: list of MirrorTask - tasks to download
+        :return: dict - run statistics - tasks numbers, observations, bytes, seconds and throughput
+        """
+        pending_tasks = [task for task in tasks if not self.manifest.is_done(task.key, self.output_dir)]
+        statistics = {"tasks": len(tasks), "skipped": len(tasks) - len(pending_tasks), "done": 0, "failed": 0,
+                      "observations": 0, "bytes": 0}
+        self.report(f"{len(pending_tasks)} of {len(tasks)} tasks to download, "
+                    f"{statistics['skipped']} already finished")
+
+        start_time = time.monotonic()
+        self.__last_manifest_save = start_time
+        executor, submit = self._create_executor()
+        futures = {submit(task): task for task in pending_tasks}
+        try:
+            for number, future in enumerate(as_completed(futures), 1):
+                task = futures[future]
+                try:
+                    path, observations, size = future.result()
+                except Exception as error:
+                    statistics["failed"] += 1
+                    self.manifest.mark_failed(task.key, error)
+                    self.report(f"[{number}/{len(pending_tasks)}] {task.key} - failed: {error}")
+                else:
+                    statistics["done"] += 1
+                    statistics["observations"] += observations
+                    statistics["bytes"] += size
+                    self.manifest.mark_done(task.key, path, observations)
+                    self.report(f"[{number}/{len(pending_tasks)}] {task.key} - {observations} observations")
+                self._save_manifest()
+        finally:
+            # on interruption not started tasks are cancelled and finished ones are kept in manifest
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            self._save_manifest(force=True)
+
+        seconds = time.monotonic() - start_time
+        statistics["seconds"] = round(seconds, 3)
+        statistics["tasks_per_second"] = round(statistics["done"] / seconds, 3) if seconds else 0.0
+        statistics["observations_per_second"] = round(statistics["observations"] / seconds, 1) if seconds else 0.0
+        statistics["megabytes_per_second"] = round(statistics["bytes"] / 2 ** 20 / seconds, 3) if seconds else 0.0
+        self.report(f"Finished in {statistics['seconds']} s: {statistics['done']} done, "
+                    f"{statistics['failed']} failed, {statistics['skipped']} skipped, "
+                    f"{statistics['tasks_per_second']} tasks/s, "
+                    f"{statistics['observations_per_second']} observations/s, "
+                    f"{statistics['megabytes_per_second']} MB/s")
+        return statistics
+
+
+def _parse_chunk_by(value):
+    """
+    Method to parse chunk size command line argument
+    :param value: string - "year", "month" or number of days
+    :return: string or int - chunk size
+    """
+    return int(value) if value.isdigit() else value
+
+
+def main(argv=None):
+    """
+    Entry point of 'ismn-mirror' command
+    :param argv: list of strings - (optional) command line arguments, sys.argv if None (default = None)
+    :return: int - exit code, 1 if some tasks failed
+    """
+    argument_parser = argparse.ArgumentParser(prog="ismn-mirror",
+                                              description="Download ISMN observations of networks or stations "
+                                                          "to disk. Interrupted run is continued on next start.")
+    argument_parser.add_argument("output", help="directory to save observations and manifest in")
+    argument_parser.add_argument("-n", "--network", action="append", default=[], help="network name to download")
+    argument_parser.add_argument("-s", "--station", action="append", default=[], type=int,
+                                 help="station ID to download")
+    argument_parser.add_argument("--start", help="start date YYYY/MM/DD, station first observation if not set")
+    argument_parser.add_argument("--end", help="end date YYYY/MM/DD, station last observation if not set")
+    argument_parser.add_argument("-w", "--workers", type=int, default=4, help="number of workers (default 4)")
+    argument_parser.add_argument("--processes", action="store_true", help="use processes instead of threads")
+    argument_parser.add_argument("--rate-limit", type=float, help="maximum number of tasks started per second")
+    argument_parser.add_argument("--chunk-by", type=_parse_chunk_by, default="year",
+                                 help="'year', 'month' or number of days in one request (default 'year')")
+    argument_parser.add_argument("--manifest", help="manifest path, OUTPUT/manifest.json if not set")
+    argument_parser.add_argument("-q", "--quiet", action="store_true", help="print only final statistics")
+    arguments = argument_parser.parse_args(argv)
+
+    if not arguments.network and not arguments.station:
+        argument_parser.error("at least one --network or --station is required")
+
+    def report(message):
+        print(message, flush=True)
+
+    mirror = NetworkMirror(arguments.output, workers=arguments.workers, use_processes=arguments.processes,
+                           rate_limit=arguments.rate_limit, chunk_by=arguments.chunk_by,
+                           manifest_path=arguments.manifest, report=None if arguments.quiet else report)
+    try:
+        tasks, errors = mirror.get_tasks(arguments.network, arguments.station, arguments.start, arguments.end)
+        statistics = mirror.run(tasks)
+    except KeyboardInterrupt:
+        print("Interrupted, finished tasks are saved to manifest", file=sys.stderr)
+        return 130
+    except (ValueError, ConnectionError, requests.RequestException) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    if arguments.quiet:
+        print(json.dumps(statistics))
+    return 1 if statistics["failed"] or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
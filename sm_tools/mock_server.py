@@ -0,0 +1,393 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+
+
+# sensors of every synthetic station - name, sensor ID, variable ID, depth ID
+MOCK_SENSORS = (("soil_moisture(m3m-3 * 100)_0.05m ThetaProbe ML2X", 8, 1, 3),
+                ("soil_moisture(m3m-3 * 100)_0.25m ThetaProbe ML2X", 8, 1, 5),
+                ("soil_temperature(C)_0.05m LI-COR", 9, 2, 3))
+
+# recorded payloads file names in payloads directory
+PAYLOAD_FILES = {"networks": "networks.json", "sensors": "sensors.json", "observations": "observations.json"}
+
+
+def save_payloads(payloads_dir, payloads):
+    """
+    Method to save recorded responses to directory
+    :param payloads_dir: string - directory path
+    :param payloads: dict - endpoint ("networks", "sensors" or "observations") -> raw response bytes
+    """
+    os.makedirs(payloads_dir, exist_ok=True)
+    for endpoint, payload in payloads.items():
+        with open(os.path.join(payloads_dir, PAYLOAD_FILES[endpoint]), "wb") as payload_file:
+            payload_file.write(payload)
+
+
+def load_payloads(payloads_dir):
+    """
+    Method to load recorded responses from directory, missing files are skipped
+    :param payloads_dir: string - directory path
+    :return: dict - endpoint -> raw response bytes
+    """
+    payloads = dict()
+    for endpoint, file_name in PAYLOAD_FILES.items():
+        path = os.path.join(payloads_dir, file_name)
+        if os.path.exists(path):
+            with open(path, "rb") as payload_file:
+                payloads[endpoint] = payload_file.read()
+    return payloads
+
+
+def record_payloads(payloads_dir, station_id, start_date="2017/01/01", end_date="2017/12/31", parser=None):
+    """
+    Method to download real responses of all endpoints for one station and save them to directory
+    Observations are recorded for the first station sensor.
+    :param payloads_dir: string - directory path
+    :param station_id: int - station ID
+    :param start_date: string - (optional) date format YYYY/MM/DD (default = "2017/01/01")
+    :param end_date: string - (optional) date format YYYY/MM/DD (default = "2017/12/31")
+    :param parser: ISMNDataParser - (optional) parser to use, new lazy parser created if None (default = None)
+    :return: dict - endpoint -> raw response bytes
+    """
+    from sm_tools.parsers import ISMNDataParser
+    parser = parser if parser is not None else ISMNDataParser(lazy=True)
+
+    def download(url):
+        response = parser._get(url)
+        if response.status_code != 200:
+            raise ConnectionError("Can not connect to server!")
+        return response.content
+
+    sensors = download(parser.SENSOR_URL + f"?station_id={station_id}&start={start_date}&end={end_date}")
+    sensor = json.loads(sensors.decode("utf-8"))["variables"][0]
+    payloads = {"networks": download(parser.NETWORKS_URL),
+                "sensors": sensors,
+                "observations": download(parser.DATA_URL + f"?station_id={station_id}&start={start_date}&"
+                                                           f"end={end_date}&depth_id={sensor['depthId']}&"
+                                                           f"sensor_id={sensor['sensorId']}&"
+                                                           f"variable_id={sensor['variableId']}")}
+    save_payloads(payloads_dir, payloads)
+    return payloads
+
+
+class _MockRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handler of mock server requests, responses are built by server.mock
+    """
+
+    # keep-alive connections like real server, headers and body are sent without waiting for acknowledgement
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        status, body, headers = mock.handle_request(url.path, query, dict(self.headers))
+
+        if body and mock.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+
+        self.send_response(status)
+        headers["Content-Length"] = str(len(body))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockISMNServer:
+    """
+    Local stand-in of ISMN server for offline tests and benchmarks
+
+    Server serves synthetic catalog of networks x stations stations, the same sensors for every station
+    and observations with observations_step seconds between them for any requested period. Recorded responses
+    (see record_payloads() and load_payloads()) are served instead of synthetic ones if they are passed.
+    Every response is delayed by latency seconds, catalog supports ETag revalidation.
+
+    Usage example:
+        with MockISMNServer(networks=10, stations=50, latency=0.01) as server:
+            parser = server.create_parser()
+            handle = parser.get_sensor_handle_by_id(server.first_station_id, server.sensors_names[0])
+            data = parser.get_observations(handle, "2017/01/01", "2017/12/31")
+            print(server.requests_count)
+    """
+
+    # paths of endpoints, the same as on ISMN server
+    NETWORKS_PATH = "/en/dataviewer/get_networks_station_info/"
+    SENSOR_PATH = "/en/dataviewer/dataviewer_get_variable_list/"
+    DATA_PATH = "/en/dataviewer/dataviewer_load_variable/"
+
+    # first synthetic station ID
+    FIRST_STATION_ID = 1001
+
+    # number of generated observations responses kept in memory
+    OBSERVATIONS_CACHE_SIZE = 64
+
+    def __init__(self, networks=3, stations=5, observations_step=3600, latency=0.0, compress=False,
+                 payloads=None, host="127.0.0.1", port=0):
+        """
+        :param networks: int - (optional) number of synthetic networks (default = 3)
+        :param stations: int - (optional) number of stations in every synthetic network (default = 5)
+        :param observations_step: int - (optional) seconds between synthetic observations (default = 3600)
+        :param latency: int or float - (optional) delay of every response in seconds (default = 0.0)
+        :param compress: bool - (optional) send gzip compressed responses to clients which accept them
+        (default = False)
+        :param payloads: dict - (optional) endpoint ("networks", "sensors" or "observations") -> recorded response
+        bytes served for every request of endpoint (default = None)
+        :param host: string - (optional) server host (default = "127.0.0.1")
+        :param port: int - (optional) server port, random free port if 0 (default = 0)
+        """
+        if int(networks) < 1 or int(stations) < 1:
+            raise ValueError("Number of networks and stations must be positive integer!")
+
+        if int(observations_step) < 1:
+            raise ValueError("Observations step must be positive number of seconds!")
+
+        self.networks = int(networks)
+        self.stations = int(stations)
+        self.observations_step = int(observations_step)
+        self.latency = float(latency)
+        self.compress = compress
+        self.payloads = dict(payloads) if payloads is not None else dict()
+
+        self.catalog_payload = self.payloads.get("networks") or self._build_catalog_payload()
+        self.catalog_etag = '"' + hashlib.sha1(self.catalog_payload).hexdigest()[:16] + '"'
+
+        self.__counts_lock = threading.Lock()
+        self.__requests_count = {"networks": 0, "sensors": 0, "observations": 0, "not_modified": 0}
+        self.__observations_cache = dict()
+        self.__observations_cache_lock = threading.Lock()
+
+        self.__server = ThreadingHTTPServer((host, port), _MockRequestHandler)
+        self.__server.daemon_threads = True
+        self.__server.mock = self
+        self.__thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def base_url(self):
+        """
+        Method to get server url
+        :return: string - e.g. "http://127.0.0.1:8000"
+        """
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def urls(self):
+        """
+        Method to get endpoints urls in ISMNDataParser attributes names
+        :return: dict - {"NETWORKS_URL": string, "SENSOR_URL": string, "DATA_URL": string}
+        """
+        return {"NETWORKS_URL": self.base_url + self.NETWORKS_PATH,
+                "SENSOR_URL": self.base_url + self.SENSOR_PATH,
+                "DATA_URL": self.base_url + self.DATA_PATH}
+
+    @property
+    def first_station_id(self):
+        """
+        Method to get ID of the first synthetic station
+        :return: int - station ID
+        """
+        return self.FIRST_STATION_ID
+
+    @property
+    def sensors_names(self):
+        """
+        Method to get names of synthetic sensors
+        :return: list of strings - sensors names
+        """
+        return [name for name, _, _, _ in MOCK_SENSORS]
+
+    @property
+    def requests_count(self):
+        """
+        Method to get number of served requests
+        :return: dict - {"networks": int, "sensors": int, "observations": int, "not_modified": int}
+        """
+        with self.__counts_lock:
+            return dict(self.__requests_count)
+
+    def reset_requests_count(self):
+        """
+        Method to reset served requests counters
+        """
+        with self.__counts_lock:
+            for endpoint in self.__requests_count:
+                self.__requests_count[endpoint] = 0
+
+    def start(self):
+        """
+        Method to start serving requests in background thread
+        :return: MockISMNServer - the same server
+        """
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self):
+        """
+        Method to stop server and close its socket
+        """
+        if self.__thread is not None:
+            self.__server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__server.server_close()
+
+    def configure_parser(self, parser):
+        """
+        Method to point parser requests to mock server
+        :param parser: ISMNDataParser or AsyncISMNDataParser - parser, lazy parser must be used,
+        because not lazy one downloads catalog from ISMN server on creation
+        :return: the same parser
+        """
+        for name, url in self.urls.items():
+            setattr(parser, name, url)
+        return parser
+
+    def create_parser(self, lazy=False, **kwargs):
+        """
+        Method to create ISMNDataParser which uses mock server
+        :param lazy: bool - (optional) if False catalog is loaded from mock server on creation (default = False)
+        :param kwargs: other ISMNDataParser constructor arguments
+        :return: ISMNDataParser - parser
+        """
+        from sm_tools.parsers import ISMNDataParser
+        parser = self.configure_parser(ISMNDataParser(lazy=True, **kwargs))
+        if not lazy:
+            parser.load_catalog()
+        return parser
+
+    def _count(self, endpoint):
+        """
+        Method to count served request
+        :param endpoint: string - endpoint name
+        """
+        with self.__counts_lock:
+            self.__requests_count[endpoint] += 1
+
+    def handle_request(self, path, query, headers):
+        """
+        Method to build response for request
+        :param path: string - request path
+        :param query: dict - query parameters
+        :param headers: dict - request headers
+        :return: tuple - (status, body bytes, headers dict)
+        """
+        if self.latency:
+            time.sleep(self.latency)
+
+        json_headers = {"Content-Type": "application/json"}
+        try:
+            if path == self.NETWORKS_PATH:
+                if headers.get("If-None-Match") == self.catalog_etag:
+                    self._count("not_modified")
+                    return 304, b"", {"ETag": self.catalog_etag}
+                self._count("networks")
+                return 200, self.catalog_payload, dict(json_headers, ETag=self.catalog_etag)
+
+            if path == self.SENSOR_PATH:
+                self._count("sensors")
+                return 200, self.payloads.get("sensors") or self._build_sensors_payload(query), json_headers
+
+            if path == self.DATA_PATH:
+                self._count("observations")
+                return 200, self.payloads.get("observations") or self._get_observations_payload(query), json_headers
+        except (KeyError, ValueError):
+            return 400, b"", dict()
+        return 404, b"", dict()
+
+    def _build_catalog_payload(self):
+        """
+        Method to build synthetic catalog response
+        :return: bytes - catalog json
+        """
+        random_state = np.random.RandomState(0)
+        networks = []
+        station_id = self.FIRST_STATION_ID
+        for network_index in range(self.networks):
+            stations = []
+            for station_index in range(self.stations):
+                stations.append({"comment": None, "depthText": "0.00 - 0.05 m <br>0.25 - 0.25 m <br>",
+                                 "extMetadata": None,
+                                 "lat": str(round(random_state.uniform(-60, 70), 6)),
+                                 "lng": str(round(random_state.uniform(-180, 180), 6)),
+                                 "maximum": "2017/12/31 23:00:00", "minimum": "2010/01/01 00:00:00",
+                                 "sensorText": "Delta-T Devices, ThetaProbe ML2X,<br>LI-COR,<br>",
+                                 "stationID": str(station_id), "station_abbr": str(station_index),
+                                 "station_name": f"Station{network_index}_{station_index}",
+                                 "variableText": "soil moisture<br>soil temperature<br>"})
+                station_id += 1
+
+            networks.append({"Stations": stations, "networkID": f"NETWORK{network_index}",
+                             "network_country": ("Spain", "France", "USA", "Australia")[network_index % 4],
+                             "network_continent": "Europe", "network_status": "running",
+                             "network_op_start": "2010-01-01", "network_op_end": "", "network_type": "project"})
+        return json.dumps({"Networks": networks}).encode("utf-8")
+
+    def _build_sensors_payload(self, query):
+        """
+        Method to build synthetic sensors metadata response
+        :param query: dict - request query with station_id, start and end
+        :return: bytes - sensors metadata json
+        """
+        # broken station ID is bad request like on ISMN server
+        int(query["station_id"])
+        variables = [{"variableName": name, "sensorId": str(sensor_id), "variableId": str(variable_id),
+                      "depthId": str(depth_id)} for name, sensor_id, variable_id, depth_id in MOCK_SENSORS]
+        return json.dumps({"variables": variables, "minimum": query["start"], "maximum": query["end"]}).encode("utf-8")
+
+    def _get_observations_payload(self, query):
+        """
+        Method to get synthetic observations response, last generated responses are reused
+        :param query: dict - request query with station_id, start, end and sensor ids
+        :return: bytes - observations json
+        """
+        key = (query["station_id"], query["start"], query["end"], query.get("sensor_id"), query.get("depth_id"))
+        with self.__observations_cache_lock:
+            payload = self.__observations_cache.get(key)
+        if payload is None:
+            payload = self._build_observations_payload(query)
+            with self.__observations_cache_lock:
+                # the oldest response is removed first
+                if len(self.__observations_cache) >= self.OBSERVATIONS_CACHE_SIZE:
+                    self.__observations_cache.pop(next(iter(self.__observations_cache)))
+                self.__observations_cache[key] = payload
+        return payload
+
+    def _build_observations_payload(self, query):
+        """
+        Method to build synthetic observations response - daily cycle with noise
+        :param query: dict - request query with station_id, start and end
+        :return: bytes - observations json [dates, values]
+        """
+        start = np.datetime64(query["start"].replace("/", "-"), "s")
+        # end date includes whole day
+        end = np.datetime64(query["end"].replace("/", "-"), "s") + np.timedelta64(1, "D")
+        dates = np.arange(start, end, np.timedelta64(self.observations_step, "s"))
+
+        random_state = np.random.RandomState(int(query["station_id"]) % 2 ** 32)
+        hours = (dates - start).astype(np.int64) / 3600.0
+        values = 25 + 5 * np.sin(hours * 2 * np.pi / 24) + random_state.normal(0, 0.5, len(dates))
+
+        dates_strings = np.char.replace(np.char.replace(np.datetime_as_string(dates, unit="s"), "-", "/"), "T", " ")
+        return json.dumps([dates_strings.tolist(), [f"{value:.2f}" for value in values]]).encode("utf-8")
@@ -0,0 +1,138 @@
+import datetime
+import re
+from collections import namedtuple
+import numpy as np
+from sm_tools.query import normalize_name
+
+
+# stations x time observations matrix - values array with (stations, times) shape and NaN gaps,
+# datetime64 time axis, stations as they were requested and station -> exception for not filled rows
+Panel = namedtuple("Panel", ["values", "dates", "stations", "errors"])
+
+# seconds in frequency units
+FREQUENCY_UNITS = {"s": 1, "min": 60, "h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}
+
+# frequency string - number and unit, e.g. "30min", "1h" or "D"
+FREQUENCY_PATTERN = re.compile(r"\s*(\d+)?\s*(s|min|h|d|w)\s*", re.IGNORECASE)
+
+# depth in sensor name - "0.05m" or "0.00m-0.05m"
+SENSOR_DEPTH_PATTERN = re.compile(r"_(-?\d+(?:\.\d+)?)m(?:-(-?\d+(?:\.\d+)?)m)?")
+
+
+def parse_frequency(freq):
+    """
+    Method to parse panel time step
+    :param freq: string, int, float, datetime.timedelta or numpy.timedelta64 - step as "30min", "1h", "1D", "1W"
+    or number of seconds
+    :return: numpy.timedelta64 - positive step with seconds precision
+    """
+    if isinstance(freq, str):
+        match = FREQUENCY_PATTERN.fullmatch(freq)
+        if match is None:
+            raise ValueError(f"Wrong frequency '{freq}'! Use number of seconds or string like '30min', '1h' or '1D'.")
+        seconds = int(match.group(1) or 1) * FREQUENCY_UNITS[match.group(2).lower()]
+    elif isinstance(freq, (datetime.timedelta, np.timedelta64)):
+        seconds = int(np.timedelta64(freq, "s").astype(np.int64))
+    else:
+        seconds = int(freq)
+
+    if seconds <= 0:
+        raise ValueError("Frequency must be positive!")
+    return np.timedelta64(seconds, "s")
+
+
+def get_time_axis(start_date, end_date, step):
+    """
+    Method to get panel time axis from start of first day to end of last day
+    :param start_date: string - date format YYYY/MM/DD
+    :param end_date: string - date format YYYY/MM/DD
+    :param step: numpy.timedelta64 - time step
+    :return: numpy.ndarray - datetime64[s] bins starts
+    """
+    start = np.datetime64(start_date.replace("/", "-"), "s")
+    end = np.datetime64(end_date.replace("/", "-"), "s") + np.timedelta64(1, "D")
+    return np.arange(start, end, step)
+
+
+def find_sensor_name(sensors, variable, depth=None):
+    """
+    Method to find sensor which measures variable at depth
+    :param sensors: list of dicts - station sensors objects
+    :param variable: string - measured variable, e.g. "soil moisture" or "soil_moisture"
+    :param depth: int, float or tuple - (optional) depth in m which must be inside sensor depth interval
+    or (depth from, depth to) range which must overlap with it, any depth if None (default = None)
+    :return: string - name of first matching sensor
+    """
+    variable = normalize_name(variable)
+    if depth is not None:
+        try:
+            depth_from, depth_to = (float(depth), float(depth)) if np.isscalar(depth) else sorted(map(float, depth))
+        except (TypeError, ValueError):
+            raise ValueError("Depth must be number or (depth from, depth to) tuple in m!") from None
+
+    for sensor in sensors:
+        sensor_name = sensor["variableName"]
+        if normalize_name(sensor_name.split("(")[0]) != variable:
+            continue
+        if depth is None:
+            return sensor_name
+
+        match = SENSOR_DEPTH_PATTERN.search(sensor_name)
+        if match is None:
+            continue
+        sensor_from, sensor_to = sorted((float(match.group(1)), float(match.group(2) or match.group(1))))
+        # small tolerance for depths like 0.05 stored as text
+        if sensor_from <= depth_to + 1e-9 and sensor_to >= depth_from - 1e-9:
+            return sensor_name
+
+    raise ValueError(f"Sensor measuring {variable} at depth {depth} not found!")
+
+
+def get_time_indexes(dates, observations, start, step, times_count):
+    """
+    Method to get time axis bins of observations, observations outside of axis and missing values are dropped
+    :param dates: numpy.ndarray - datetime64 observations dates
+    :param observations: numpy.ndarray - observations values
+    :param start: numpy.datetime64 - time axis start
+    :param step: numpy.timedelta64 - time step
+    :param times_count: int - number of time axis bins
+    :return: tuple - (numpy.ndarray of int64 bins indexes, numpy.ndarray of values)
+    """
+    indexes = (dates.astype("datetime64[s]") - start) // step
+    mask = (indexes >= 0) & (indexes < times_count) & np.isfinite(observations)
+    return indexes[mask].astype(np.int64), observations[mask]
+
+
+def align_series(series, times_count, dtype=np.float32):
+    """
+    Method to put many series into one stations x time matrix, values falling into one bin are averaged
+    All series are merged in one pass over concatenated arrays, so memory used besides result is proportional
+    to number of observations, not to matrix size.
+    :param series: list of tuples - (bins indexes, values) for every station row, e.g. get_time_indexes() results
+    :param times_count: int - number of time axis bins
+    :param dtype: numpy dtype - (optional) result type (default = np.float32)
+    :return: numpy.ndarray - (stations, times) matrix with NaN in empty bins
+    """
+    values = np.full((len(series), times_count), np.nan, dtype=dtype)
+    if not series:
+        return values
+
+    # flat matrix index of every observation - row offset plus time bin
+    flat_indexes = np.concatenate([indexes + row * times_count for row, (indexes, _) in enumerate(series)])
+    observations = np.concatenate([row_values for _, row_values in series])
+    if not len(flat_indexes):
+        return values
+
+    # series with sorted dates are already in matrix order, so sorting is usually skipped
+    if np.any(flat_indexes[1:] < flat_indexes[:-1]):
+        order = np.argsort(flat_indexes, kind="stable")
+        flat_indexes, observations = flat_indexes[order], observations[order]
+
+    starts = np.flatnonzero(np.concatenate(([True], flat_indexes[1:] != flat_indexes[:-1])))
+    if len(starts) == len(flat_indexes):
+        values.reshape(-1)[flat_indexes] = observations
+    else:
+        sums = np.add.reduceat(observations.astype(np.float64), starts)
+        counts = np.diff(np.append(starts, len(flat_indexes)))
+        values.reshape(-1)[flat_indexes[starts]] = sums / counts
+    return values
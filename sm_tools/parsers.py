@@ -1,10 +1,33 @@
 import requests
-import json
+import numpy as np
 import datetime
-import re
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sm_tools.cache import CatalogDiskCache, LRUCache
+from sm_tools.catalog import ISMNCatalog, CatalogDiff, CatalogLookupMixin
+from sm_tools.common import SensorHandle, get_sensor_type_and_depth_by_name, get_sensors_cache_key, \
+    make_sensor_handle, parse_json_response, parse_observations, validate_dates
+from sm_tools.metrics import RequestEvent, RequestMeasurement
+from sm_tools.panel import Panel, align_series, find_sensor_name, get_time_axis, get_time_indexes, parse_frequency
+from sm_tools.prefetch import SensorsMetadataPrefetcher
+from sm_tools.rate_limit import TokenBucket
+from sm_tools.single_flight import SingleFlight
+from sm_tools.streaming import ObservationsStreamDecoder, dates_to_numpy, dates_to_strings
+from sm_tools.tile_store import ObservationTileStore
+from sm_tools.transport import HTTPTransport
 
 
-class ISMNDataParser:
+# result of one item in ISMNDataParser.fetch_many - data is None if error happened and error is None otherwise
+FetchResult = namedtuple("FetchResult", ["request", "data", "error"])
+
+# result of one sensor sync - number of new observations and date of last stored observation after sync
+SyncResult = namedtuple("SyncResult", ["handle", "new_observations", "last_date", "error"])
+
+
+class ISMNDataParser(CatalogLookupMixin):
     """
     Class for parsing data from ISMN - https://ismn.earth/en/dataviewer/
     """
@@ -22,203 +45,534 @@ class ISMNDataParser:
     # base url for observations data requests
     DATA_URL = "https://ismn.earth/en/dataviewer/dataviewer_load_variable/"
 
-    def __init__(self, headers=None):
-        # creating new session on object creation
-        self.__session = requests.session()
+    # size of response parts read from server in streaming mode
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    # station object fields whose changes invalidate cached sensors metadata of station
+    SENSORS_METADATA_FIELDS = ("sensorText", "variableText", "depthText", "minimum", "maximum", "networkID")
+
+    # default number of threads and retries of one failed chunk for observations requested by chunks
+    CHUNK_WORKERS = 4
+    CHUNK_RETRIES = 2
+
+    # response parsing and sensors helpers are shared with AsyncISMNDataParser
+    _parse_json_response = staticmethod(parse_json_response)
+    _parse_observations = staticmethod(parse_observations)
+    _get_sensors_cache_key = staticmethod(get_sensors_cache_key)
+    _make_sensor_handle = staticmethod(make_sensor_handle)
+    _validate_dates = staticmethod(validate_dates)
+    get_sensor_type_and_depth_by_name = staticmethod(get_sensor_type_and_depth_by_name)
+
+    def __init__(self, headers=None, lazy=False, cache_dir=None, cache_ttl=CatalogDiskCache.DEFAULT_TTL,
+                 sensors_cache_size=128, pool_size=10, observations_store_dir=None, observations_store_tile="month",
+                 catalog=None, coalesce_requests=True, transport=None, hooks=None, proxy_url=None,
+                 prefetch_sensors=False, prefetch_workers=4):
+        """
+        :param headers: dict - (optional) headers for requests, DEFAULT_HEADERS used if None (default = None)
+        :param lazy: bool - (optional) if True networks catalog is downloaded only on first access to it
+        or on load_catalog() call, otherwise - on object creation (default = False)
+        :param cache_dir: string - (optional) directory to keep downloaded networks catalog in,
+        catalog is not cached on disk if None (default = None)
+        :param cache_ttl: int or float - (optional) time in seconds while cached catalog is used
+        without revalidation on server (default = 24 hours)
+        :param sensors_cache_size: int - (optional) number of station sensors metadata responses kept in memory,
+        0 disables caching (default = 128)
+        :param pool_size: int - (optional) minimum number of kept alive connections to server (default = 10)
+        :param observations_store_dir: string - (optional) directory to keep downloaded observations in,
+        only missing periods are downloaded for observations found there, not used if None (default = None)
+        :param observations_store_tile: string - (optional) "month" or "year" - period of one stored observations
+        file (default = "month")
+        :param catalog: ISMNCatalog, bytes-like or string - (optional) loaded catalog, catalog snapshot
+        (e.g. shared memory buffer) or snapshot file path to use instead of downloading catalog (default = None)
+        :param coalesce_requests: bool - (optional) if True concurrent identical sensors metadata and observations
+        requests from different threads share one request to server and one decoded result (default = True)
+        :param transport: Transport - (optional) HTTP transport for all requests, e.g. HTTPTransport with
+        own timeouts and retry policy, HTTPTransport with default retries used if None (default = None)
+        :param hooks: list of functions - (optional) hooks called with RequestEvent after every request to server
+        and every cache lookup, e.g. MetricsAggregator, hooks are not pickled (default = None)
+        :param proxy_url: string - (optional) url of caching proxy (see ISMNCachingProxy) to send all requests to
+        instead of ISMN server, e.g. "http://127.0.0.1:8765" (default = None)
+        :param prefetch_sensors: bool - (optional) if True sensors metadata of network stations is downloaded
+        in background when network stations are enumerated, see enable_prefetch() (default = False)
+        :param prefetch_workers: int - (optional) number of background metadata requests made at the same time
+        if prefetch_sensors is True (default = 4)
+        """
+        # requests are sent to the same endpoints paths on proxy
+        self.__proxy_url = proxy_url
+        if proxy_url is not None:
+            self.NETWORKS_URL = self.get_proxy_url(proxy_url, self.NETWORKS_URL)
+            self.SENSOR_URL = self.get_proxy_url(proxy_url, self.SENSOR_URL)
+            self.DATA_URL = self.get_proxy_url(proxy_url, self.DATA_URL)
+        # instrumentation hooks must be set before catalog is loaded
+        self.__hooks = list(hooks) if hooks is not None else []
+        # transport created by parser is closed with parser, passed transport can be shared with other parsers
+        self.__owns_transport = transport is None
+        self.__transport = transport if transport is not None else HTTPTransport()
+        # connection pool must be as big as number of threads using it
+        self.resize_connection_pool(pool_size)
+        # per thread data - rate limiter of fetch_many batch this thread works on
+        self.__thread_data = threading.local()
         # setting headers for request - passed to constructor or default headers
         self.headers = headers if headers is not None else self.DEFAULT_HEADERS
-        # set requests timeout
-        self.request_timeout = 20
-        # fetching all networks data on object initialization
-        self.__networks_objects_list = self._get_networks_data()
-        # getting all stations data from all networks
-        self.__stations_objects_list = self._get_stations_data()
+        # on-disk catalog cache is used only if cache directory was passed
+        self.__catalog_cache = CatalogDiskCache(cache_dir, cache_ttl) if cache_dir is not None else None
+        # sensors metadata responses cache - (station ID, start date, end date) -> metadata
+        self.__sensors_cache = LRUCache(sensors_cache_size)
+        # concurrent identical requests are made only once if coalescing is enabled
+        self.__single_flight = SingleFlight() if coalesce_requests else None
+        # local observations store is used only if store directory was passed
+        self.__observation_store = ObservationTileStore(observations_store_dir, observations_store_tile) \
+            if observations_store_dir is not None else None
+        # sensors metadata of enumerated stations is downloaded in background only if prefetch is enabled
+        self.__prefetcher = None
+        if prefetch_sensors:
+            self.enable_prefetch(prefetch_workers)
+        # catalog is empty until it will be loaded if it was not passed to constructor
+        self.__catalog = ISMNCatalog.attach(catalog) if catalog is not None else None
+        # lock to not download catalog several times when it is accessed from different threads
+        self.__catalog_lock = threading.Lock()
+        # fetching all networks data on object initialization if lazy mode is not used
+        if not lazy:
+            self.load_catalog()
 
     def __del__(self):
-        self.__session.close()
+        if self.__prefetcher is not None:
+            self.__prefetcher.close()
+        if self.__owns_transport:
+            self.__transport.close()
+
+    def __getstate__(self):
+        # locks and in-memory caches are not pickled - they are created again after unpickling,
+        # transport is pickled with its settings and catalog as compact snapshot
+        return {"urls": {name: self.__dict__[name] for name in ("NETWORKS_URL", "SENSOR_URL", "DATA_URL")
+                         if name in self.__dict__},
+                "headers": self.headers,
+                "transport": self.__transport,
+                "cache_dir": self.__catalog_cache.cache_dir if self.__catalog_cache is not None else None,
+                "cache_ttl": self.__catalog_cache.ttl if self.__catalog_cache is not None
+                else CatalogDiskCache.DEFAULT_TTL,
+                "sensors_cache_size": self.__sensors_cache.max_size,
+                "observations_store_dir": self.__observation_store.store_dir
+                if self.__observation_store is not None else None,
+                "observations_store_tile": self.__observation_store.tile
+                if self.__observation_store is not None else "month",
+                "catalog": self.__catalog,
+                "coalesce_requests": self.__single_flight is not None,
+                "proxy_url": self.__proxy_url,
+                "prefetch_sensors": self.__prefetcher is not None,
+                "prefetch_workers": self.__prefetcher.max_workers if self.__prefetcher is not None else 4}
 
-    def _get_networks_data(self):
+    def __setstate__(self, state):
+        state = dict(state)
+        # endpoints urls changed on instance, e.g. by MockISMNServer, are restored after initialization
+        urls = state.pop("urls", dict())
+        self.__init__(lazy=True, **state)
+        for name, url in urls.items():
+            setattr(self, name, url)
+
+    def attach_catalog(self, catalog):
         """
-        Method to get all networks objects
-        :return: list of dicts - networks with all inner data (stations, etc) or None
+        Method to use already loaded catalog instead of downloading it, e.g. in worker processes
+        :param catalog: ISMNCatalog, bytes-like or string - catalog, catalog snapshot or snapshot file path
         """
-        # making request to ISMN server to get all networks data with timeout
-        request = self.__session.get(self.NETWORKS_URL, headers=self.headers, timeout=self.request_timeout)
-        # if request wasn't successful - raise error
-        if request.status_code != 200:
-            raise ConnectionError("Can not connect to server!")
+        catalog = ISMNCatalog.attach(catalog)
+        with self.__catalog_lock:
+            self.__catalog = catalog
 
-        # return parsed network data
+    @staticmethod
+    def get_proxy_url(proxy_url, url):
+        """
+        Method to get url of the same endpoint on proxy
+        :param proxy_url: string - proxy url, e.g. "http://127.0.0.1:8765"
+        :param url: string - ISMN server url
+        :return: string - url with proxy scheme, host and port, e.g.
+        "http://127.0.0.1:8765/en/dataviewer/get_networks_station_info/"
+        """
+        proxy = urlsplit(proxy_url)
+        if not proxy.scheme or not proxy.netloc:
+            raise ValueError("Proxy url must have scheme and host, e.g. http://127.0.0.1:8765!")
+        return urlunsplit(urlsplit(url)._replace(scheme=proxy.scheme, netloc=proxy.netloc))
+
+    @property
+    def transport(self):
+        """
+        Method to get HTTP transport used for requests
+        :return: Transport - parser transport
+        """
+        return self.__transport
+
+    @property
+    def transport_info(self):
+        """
+        Method to get requests and retries statistics of parser transport
+        :return: dict - transport statistics, see HTTPTransport.info()
+        """
+        return self.__transport.info()
+
+    @property
+    def request_timeout(self):
+        """
+        Method to get timeout of waiting for response data
+        :return: int or float - read timeout in seconds
+        """
+        return self.__transport.read_timeout
+
+    @request_timeout.setter
+    def request_timeout(self, timeout):
+        """
+        Method to set timeout of waiting for response data
+        :param timeout: int or float - read timeout in seconds
+        """
+        self.__transport.read_timeout = timeout
+
+    def add_hook(self, hook):
+        """
+        Method to add instrumentation hook
+        Hooks are called in requesting thread, so they must be fast and thread safe, hooks errors are ignored.
+        :param hook: function - hook(event) called with RequestEvent after every request and cache lookup
+        """
+        self.__hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Method to remove instrumentation hook
+        :param hook: function - hook added before
+        """
         try:
-            return json.loads(request.content.decode("utf-8"))["Networks"]
-        except json.decoder.JSONDecodeError:
-            raise ValueError("Error while server response processing! "
-                             "Check input parameters or https://www.geo.tuwien.ac.at/ server status.") from None
+            self.__hooks.remove(hook)
+        except ValueError:
+            raise ValueError("Hook was not added to parser!") from None
+
+    def _emit(self, event):
+        """
+        Method to pass event to all hooks
+        :param event: RequestEvent - request or cache lookup event
+        """
+        for hook in list(self.__hooks):
+            # monitoring must not break requests
+            try:
+                hook(event)
+            except Exception:
+                pass
+
+    def _measure(self, endpoint, url, station_id=None):
+        """
+        Method to measure request to server, event is passed to hooks when measurement is finished
+        :param endpoint: string - "networks", "sensors" or "observations"
+        :param url: string - request url
+        :param station_id: int or string - (optional) requested station (default = None)
+        :return: RequestMeasurement - context manager of request measurement
+        """
+        return RequestMeasurement(self._emit, endpoint, url, station_id)
+
+    def _emit_cache_lookup(self, endpoint, station_id, is_hit, started_at):
+        """
+        Method to pass cache lookup event to all hooks
+        :param endpoint: string - "networks", "sensors" or "observations"
+        :param station_id: int or string - requested station or None
+        :param is_hit: bool - True if data was found in cache
+        :param started_at: float - time.perf_counter() value when lookup was started
+        """
+        if self.__hooks:
+            self._emit(RequestEvent(endpoint, None, station_id, None, time.perf_counter() - started_at, 0, 0.0,
+                                    "hit" if is_hit else "miss", None))
 
-    def _get_stations_data(self):
+    def resize_connection_pool(self, pool_size):
         """
-        Method to get all station objects form all networks
+        Method to make transport connection pool at least pool_size connections big
+        Must be called before parser is used by more threads than pool size, pool is never made smaller.
+        :param pool_size: int - minimum number of connections in pool
+        """
+        self.__transport.resize_pool(pool_size)
 
-        :return: list of dicts - all station objects or None
+    def _get(self, url, headers=None, stream=False):
+        """
+        Method to make GET request to server with parser transport
+        :param url: string - request url
+        :param headers: dict - (optional) request headers, parser headers used if None (default = None)
+        :param stream: bool - (optional) if True response body is not read until it is iterated (default = False)
+        :return: requests.Response - server response
         """
-        return [station for network in self.__networks_objects_list for station in network["Stations"]]
+        headers = headers if headers is not None else self.headers
+        # token is taken for every attempt of transport, not only for first one
+        rate_limiter = getattr(self.__thread_data, "rate_limiter", None)
+        if rate_limiter is not None:
+            return self.__transport.get(url, headers=headers, stream=stream, on_attempt=rate_limiter.acquire)
+
+        return self.__transport.get(url, headers=headers, stream=stream)
 
     @property
-    def network_names_list(self):
+    def is_catalog_loaded(self):
         """
-        Method to get list of networks names from ISMN
-        :return: list of strings - networks names or None
+        Method to check if networks catalog was already downloaded
+        :return: bool - True if catalog is loaded
         """
-        return [network_object["networkID"] for network_object in self.__networks_objects_list]
+        return self.__catalog is not None
 
     @property
-    def networks_objects(self):
-        """
-        Method to get all networks objects wit all inner data
-
-        Network object example:
-        {
-            Stations: [list of station objects],
-            networkID: "AACES"
-            network_abstract: null
-            network_acknowledge: null
-            network_constraints: null
-            network_continent: "Australia"
-            network_country: "Australia"
-            network_depths: "0.00 - 0.05 m <br>0.00 - 0.06 m <br>0.25 - 0.25 m <br>"
-            network_op_end: "2010-09-26"
-            network_op_start: "2010-01-18"
-            network_reference: "Peischl, S., Walker, J. P..."
-            network_sensors: "ThetaProbe ML2X,<br>"
-            network_status: "inactive"
-            network_type: "project"
-            network_url: "http://www.moisturemap.monash.edu.au/"
-            network_url_data: null
-            network_variables: "soil moisture<br>soil temperature<br>precipitation<br>"
-        }
-
-        :return: list of dicts - networks objects or None
-        """
-        return self.__networks_objects_list
+    def catalog(self):
+        """
+        Method to get networks catalog, catalog is downloaded on first access in lazy mode
+        :return: ISMNCatalog - networks and stations catalog
+        """
+        self.load_catalog()
+        return self.__catalog
+
+    def load_catalog(self):
+        """
+        Method to download networks catalog and build stations lookup indexes
+        Does nothing if catalog is already loaded, so it can be used to warm up lazy parser
+        """
+        if self.is_catalog_loaded:
+            return
+
+        with self.__catalog_lock:
+            # catalog can be loaded by other thread while we were waiting for lock
+            if self.is_catalog_loaded:
+                return
+
+            self.__catalog = ISMNCatalog(self._get_networks_data())
+
+    def refresh_catalog(self):
+        """
+        Method to download new catalog version and update loaded catalog with it
+        Cached catalog is checked on server even if it is fresh. Records and lookup indexes are updated
+        in place, sensors metadata cached for changed or removed stations is dropped.
+
+        Usage example:
+            diff = parser.refresh_catalog()
+            for station_id in diff.get_changed_stations("maximum"):
+                update_station(station_id)
+
+        :return: CatalogDiff - added, removed and changed stations and networks,
+        all stations are added if catalog was not loaded before
+        """
+        if self.is_catalog_loaded:
+            networks_objects_list = self._get_networks_data(revalidate=True)
+            # catalog was not changed on server
+            if networks_objects_list is None:
+                return CatalogDiff.empty()
+        else:
+            networks_objects_list = self._get_networks_data()
+
+        with self.__catalog_lock:
+            if self.__catalog is None:
+                self.__catalog = ISMNCatalog([])
+            diff = self.__catalog.update(networks_objects_list)
+
+        # metadata responses depend on station sensors and observations period
+        stations_ids = set(diff.removed_stations) | set(diff.get_changed_stations(*self.SENSORS_METADATA_FIELDS))
+        if stations_ids:
+            self.__sensors_cache.remove_if(lambda key: key[0] in stations_ids)
+        return diff
 
     @property
-    def stations_objects(self):
+    def observation_store(self):
         """
-        Method to get all available stations objects
+        Method to get local observations store
+        :return: ObservationTileStore - observations store or None if it is not used
+        """
+        return self.__observation_store
 
-        Station object example:
-        {
-            comment: null
-            depthText: "0.00 - 0.06 m <br>0.25 - 0.25 m <br>"
-            extMetadata: null
-            lat: "-34.780428"
-            lng: "147.140801"
-            maximum: "2010/02/10 01:00:00"
-            minimum: "2010/02/08 00:00:00"
-            sensorText: "Delta-T Devices, ThetaProbe ML2X,<br>"
-            stationID: "2134"
-            station_abbr: "25"
-            station_name: "Station25"
-            variableText: "soil moisture<br>soil temperature<br>precipitation<br>"
-        }
+    @property
+    def sensors_cache_info(self):
+        """
+        Method to get sensors metadata cache statistics
+        :return: dict - {"hits": int, "misses": int, "evictions": int, "size": int, "max_size": int}
+        """
+        return self.__sensors_cache.info()
 
-        :return: list of dicts - station objects or None
+    @property
+    def coalescing_info(self):
+        """
+        Method to get statistics of concurrent identical requests coalescing
+        :return: dict - {"executions": int, "coalesced": int, "in_flight": int} - number of requests made to server,
+        number of requests which waited for the same running request and number of running requests,
+        None if coalescing is disabled
         """
+        return self.__single_flight.info() if self.__single_flight is not None else None
 
-        return self.__stations_objects_list
+    def _coalesce(self, key, function):
+        """
+        Method to run request or wait for the same request running in other thread
+        :param key: hashable - request key
+        :param function: function - function without arguments which makes request
+        :return: tuple - (function result, True if result is shared with other threads)
+        """
+        if self.__single_flight is None:
+            return function(), False
+        return self.__single_flight.do(key, function)
 
     @property
-    def stations_names_list(self):
+    def prefetcher(self):
         """
-        Method to get all available station names
-        :return: list of strings - stations names or None
+        Method to get sensors metadata prefetcher
+        :return: SensorsMetadataPrefetcher - prefetcher or None if prefetch is disabled
         """
-        return [station["station_name"] for station in self.__stations_objects_list]
+        return self.__prefetcher
 
-    def get_network_object_by_name(self, network_name):
+    def enable_prefetch(self, max_workers=4, start_date="2017/01/01", end_date="2017/12/31"):
         """
-        Method to get network object using name
-        :param network_name: string - network name
-        :return: dict - network object with this name or None
+        Method to download sensors metadata of network stations in background when network stations
+        are enumerated with get_stations_names_list_for_network() or get_stations_objects_list_for_network()
+        :param max_workers: int - (optional) number of metadata requests made at the same time (default = 4)
+        :param start_date: string - (optional) date format YYYY/MM/DD - period start of prefetched metadata,
+        must be the same as in later calls (default = "2017/01/01")
+        :param end_date: string - (optional) date format YYYY/MM/DD - period end of prefetched metadata
+        (default = "2017/12/31")
+        :return: SensorsMetadataPrefetcher - prefetcher to cancel requests and get hit rate
         """
-        name = str(network_name)
-        for network in self.__networks_objects_list:
-            if name == network["networkID"]:
-                return network
+        if not self.__sensors_cache.max_size:
+            raise ValueError("Sensors metadata can not be prefetched when sensors cache is disabled!")
+        self._validate_dates(start_date, end_date)
 
-        raise ValueError(f"Not found network with name \'{name}\'")
+        self.disable_prefetch()
+        self.__prefetcher = SensorsMetadataPrefetcher(self, max_workers, start_date, end_date)
+        return self.__prefetcher
 
-    def get_station_object_by_name(self, station_name):
+    def disable_prefetch(self):
         """
-        Method to get station object by name
-        :param station_name: string - station name
-        :return: dict - station object with this name or None
+        Method to cancel queued background metadata requests and stop prefetching
+        """
+        prefetcher, self.__prefetcher = self.__prefetcher, None
+        if prefetcher is not None:
+            prefetcher.close()
+
+    def _is_sensors_metadata_cached(self, station_id, start_date, end_date):
+        """
+        Method to check if sensors metadata is in cache without changing cache statistics
+        :param station_id: int or string - station ID
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: bool - True if metadata is cached
         """
-        name = str(station_name)
-        for station in self.__stations_objects_list:
-            if name == station["station_name"]:
-                return station
+        return self._get_sensors_cache_key(station_id, start_date, end_date) in self.__sensors_cache
 
-        raise ValueError(f"Not found station with name \'{name}\'")
+    def _prefetch_network(self, network_name):
+        """
+        Method to schedule sensors metadata download for network stations if prefetch is enabled
+        :param network_name: string - network name
+        """
+        if self.__prefetcher is not None:
+            stations = self.catalog._get_network(network_name).stations
+            self.__prefetcher.prefetch(station.station_id for station in stations)
 
     def get_stations_objects_list_for_network(self, network_name):
         """
         Method to get list of station objects for this network
+        Sensors metadata of these stations is prefetched if prefetch is enabled.
         :param network_name: string - network name
-        :return: list of dicts - station objects or None
+        :return: list of dicts - station objects
         """
-        return self.get_network_object_by_name(network_name)["Stations"]
+        stations = super(ISMNDataParser, self).get_stations_objects_list_for_network(network_name)
+        self._prefetch_network(network_name)
+        return stations
 
     def get_stations_names_list_for_network(self, network_name):
         """
         Method to get list of station names for this network
+        Sensors metadata of these stations is prefetched if prefetch is enabled.
         :param network_name: string - network name
-        :return: list of strings - station names or None
+        :return: list of strings - station names
         """
-        network = self.get_stations_objects_list_for_network(network_name)
-        return [station["station_name"] for station in network]
+        stations_names = super(ISMNDataParser, self).get_stations_names_list_for_network(network_name)
+        self._prefetch_network(network_name)
+        return stations_names
 
-    def get_station_id_by_name(self, station_name):
+    def clear_cache(self):
         """
-        Method to get station ID for this station name
-        :param station_name: string - station name
-        :return: int - station ID
+        Method to remove all cached sensors metadata
         """
-        station = self.get_station_object_by_name(station_name)
-        return int(station["stationID"])
+        self.__sensors_cache.clear()
+
+    def _get_networks_data(self, revalidate=False):
+        """
+        Method to get all networks objects
+        :param revalidate: bool - (optional) if True cached catalog is checked on server even if it is fresh
+        and None is returned if it was not changed (default = False)
+        :return: list of dicts - networks with all inner data (stations, etc) or None
+        """
+        started_at = time.perf_counter()
+        headers = dict(self.headers)
+        cached = self.__catalog_cache.load(self.NETWORKS_URL) if self.__catalog_cache is not None else None
+        if cached is not None:
+            # fresh cached catalog is used without any request to server
+            if cached["is_fresh"] and not revalidate:
+                self._emit_cache_lookup("networks", None, True, started_at)
+                return ISMNCatalog.parse_response(cached["content"])
+
+            # otherwise asking server to send catalog only if it was changed
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        with self._measure("networks", self.NETWORKS_URL) as measurement:
+            # making request to ISMN server to get all networks data with timeout
+            request = measurement.set_response(self._get(self.NETWORKS_URL, headers=headers))
+            # catalog was not changed on server - using cached copy
+            if request.status_code == 304 and cached is not None:
+                self.__catalog_cache.touch(self.NETWORKS_URL)
+                self._emit_cache_lookup("networks", None, True, started_at)
+                return ISMNCatalog.parse_response(cached["content"]) if not revalidate else None
+
+            # if request wasn't successful - raise error
+            if request.status_code != 200:
+                raise ConnectionError("Can not connect to server!")
+
+            networks_objects_list = measurement.decode(ISMNCatalog.parse_response, request.content)
+
+        # catalog is saved only after it was parsed, so broken responses never get to cache
+        if self.__catalog_cache is not None:
+            self._emit_cache_lookup("networks", None, False, started_at)
+            self.__catalog_cache.store(self.NETWORKS_URL, request.content,
+                                       etag=request.headers.get("ETag"),
+                                       last_modified=request.headers.get("Last-Modified"))
+
+        return networks_objects_list
 
     def get_station_sensors_metadata_list_by_id(self, station_id,
                                                 start_date="2017/01/01", end_date="2017/12/31"):
         """
         Method to get sensors objects list for current station by station ID
+        Responses are cached in memory, so returned dict is shared and must not be changed
         :param station_id: int or string - station ID
         :param start_date: string - date format YYYY/MM/DD
         :param end_date: string - date format YYYY/MM/DD
         :return: dict - sensors list and station metadata for this period
         """
-        try:
-            start_date_object = datetime.datetime.strptime(start_date, '%Y/%m/%d')
-            end_date_object = datetime.datetime.strptime(end_date, '%Y/%m/%d')
-        except Exception:
-            raise ValueError("Start and end dates must be in YYYY/MM/DD format!")
-
-        if start_date_object > end_date_object:
-            raise ValueError("Start date must be earlier then end date!")
-
-        # generating request url based on parameters
-        request_url = self.SENSOR_URL + f"?station_id={station_id}&start={start_date}&end={end_date}"
-        # making request to server
-        request = self.__session.get(request_url, headers=self.headers, timeout=self.request_timeout)
-        # if there was no response - raise error
-        if request.status_code != 200:
-            raise ConnectionError("Can not connect to server! Check input data!")
-
-        # return parsed network data
-        try:
-            return json.loads(request.content.decode("utf-8"))
-        except json.decoder.JSONDecodeError:
-            raise ValueError("Error while server response processing! "
-                             "Check input parameters or https://www.geo.tuwien.ac.at/ server status.") from None
+        self._validate_dates(start_date, end_date)
+
+        # using cached metadata if this station and period were already requested
+        started_at = time.perf_counter()
+        cache_key = self._get_sensors_cache_key(station_id, start_date, end_date)
+        metadata = self.__sensors_cache.get(cache_key)
+        if self.__prefetcher is not None:
+            self.__prefetcher.record_lookup(cache_key[0], start_date, end_date, metadata is not None)
+        if metadata is not None:
+            self._emit_cache_lookup("sensors", cache_key[0], True, started_at)
+            return metadata
+
+        def download():
+            # generating request url based on parameters
+            request_url = self.SENSOR_URL + f"?station_id={station_id}&start={start_date}&end={end_date}"
+            with self._measure("sensors", request_url, cache_key[0]) as measurement:
+                # making request to server
+                request = measurement.set_response(self._get(request_url))
+                # if there was no response - raise error
+                if request.status_code != 200:
+                    raise ConnectionError("Can not connect to server! Check input data!")
+
+                # parse sensors metadata and save it to cache
+                downloaded_metadata = measurement.decode(self._parse_json_response, request.content)
+            self.__sensors_cache.put(cache_key, downloaded_metadata)
+            return downloaded_metadata
+
+        # threads requesting the same metadata at once wait for one request, metadata is shared anyway
+        metadata, _ = self._coalesce(("sensors",) + cache_key, download)
+        if self.__sensors_cache.max_size:
+            self._emit_cache_lookup("sensors", cache_key[0], False, started_at)
+        return metadata
 
     def get_station_sensors_metadata_list_by_name(self, station_name,
                                                   start_date="2017/01/01", end_date="2017/12/31"):
@@ -280,46 +634,210 @@ class ISMNDataParser:
         sensors_list = self.get_sensors_objects_list_for_station_by_name(station_name, start_date, end_date)
         return [sensor["variableName"] for sensor in sensors_list]
 
-    def get_sensor_objects_list_by_id(self, station_name, sensor_id):
+    def get_sensor_objects_list_by_id(self, station_name, sensor_id,
+                                      start_date="2017/01/01", end_date="2017/12/31"):
         """
         Method to get sensor objects list with same ID for station
         :param station_name: string - station name where sensor placed
         :param sensor_id: int - sensor ID for station
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
         :return: dict - sensor object
         """
-        sensors = self.get_sensors_objects_list_for_station_by_name(station_name)
+        sensors = self.get_sensors_objects_list_for_station_by_name(station_name, start_date, end_date)
         return [sensor for sensor in sensors if sensor["sensorId"] == str(sensor_id)]
 
-    def get_sensor_object_by_name(self, station_name, sensor_name):
+    def get_sensor_object_by_name(self, station_name, sensor_name,
+                                  start_date="2017/01/01", end_date="2017/12/31"):
         """
         Method to get sensor data by it`s name
         :param station_name: string - station name where sensor placed
         :param sensor_name: string - sensor name for station
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
         :return: dict - sensor object
         """
-        sensors = self.get_sensors_objects_list_for_station_by_name(station_name)
+        sensors = self.get_sensors_objects_list_for_station_by_name(station_name, start_date, end_date)
         for sensor in sensors:
             if sensor["variableName"] == sensor_name:
                 return sensor
 
         raise ValueError("Sensor with name " + sensor_name + " not found!")
 
+    def get_sensor_handle_by_id(self, station_id, sensor_name,
+                                start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        Method to resolve sensor identifiers for station by station ID
+        Networks catalog is not needed for this method, so it does not load catalog in lazy mode
+        :param station_id: int or string - station ID
+        :param sensor_name: string - sensor name for station
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :return: SensorHandle - resolved sensor identifiers
+        """
+        sensors = self.get_sensors_objects_list_for_station_by_id(station_id, start_date, end_date)
+        return self._make_sensor_handle(station_id, sensors, sensor_name)
+
+    def get_sensor_handle(self, station_name, sensor_name,
+                          start_date="2017/01/01", end_date="2017/12/31", network_name=None):
+        """
+        Method to resolve sensor identifiers for station by station name
+        :param station_name: string - station name
+        :param sensor_name: string - sensor name for station
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param network_name: string - (optional) network name to choose station from (default = None)
+        :return: SensorHandle - resolved sensor identifiers
+        """
+        station_id = self.get_station_id_by_name(station_name, network_name)
+        return self.get_sensor_handle_by_id(station_id, sensor_name, start_date, end_date)
+
+    def get_observations(self, handle, start_date="2017/01/01", end_date="2017/12/31", normalize=True,
+                         as_numpy=False, dtype=np.float64, stream=False):
+        """
+        Method to get observation data for already resolved sensor
+        Only one request to server is made - no catalog or sensors metadata needed
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - (optional) if True dates are returned as numpy datetime64[s] array
+        and observations as numpy array of dtype type (default = False)
+        :param dtype: numpy dtype - (optional) observations array type, np.float32 halves memory (default = np.float64)
+        :param stream: bool - (optional) if True response is decoded while it is downloaded straight to numpy arrays,
+        so whole response text is never kept in memory, works only with as_numpy=True (default = False)
+        :return: dict - {"dates": list of observation dates, "observation": list of observations}
+        """
+        if not isinstance(handle, SensorHandle):
+            raise ValueError("Handle must be SensorHandle object!")
+
+        if stream and not as_numpy:
+            raise ValueError("Streaming decode returns only numpy arrays! Use it with as_numpy=True.")
+
+        self._validate_dates(start_date, end_date)
+
+        if self.__observation_store is not None:
+            def download(missing_start_date, missing_end_date):
+                return self._download_observations(handle, missing_start_date, missing_end_date,
+                                                   normalize=False, as_numpy=True, stream=stream)
+
+            return self._get_stored_observations(handle, start_date, end_date, download, normalize, as_numpy, dtype)
+
+        return self._download_observations(handle, start_date, end_date, normalize=normalize,
+                                           as_numpy=as_numpy, dtype=dtype, stream=stream)
+
+    def _get_catalog_last_date(self, station_id):
+        """
+        Method to get station 'maximum' date from catalog, catalog is loaded if it was not loaded yet
+        :param station_id: int - station ID
+        :return: string - last observation date of station or None if catalog can not be loaded or has no such station
+        """
+        try:
+            return self.get_station_object_by_id(station_id).get("maximum") or None
+        except (ValueError, ConnectionError, requests.RequestException):
+            return None
+
+    def _get_stored_observations(self, handle, start_date, end_date, download, normalize, as_numpy, dtype):
+        """
+        Method to get observations from local store, missing periods are downloaded and saved to store
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param download: function - download(start date, end date) which returns not normalized numpy observations
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - return numpy arrays instead of lists
+        :param dtype: numpy dtype - observations array type if as_numpy is True
+        :return: dict - {"dates": observation dates, "observation": observations}
+        """
+        started_at = time.perf_counter()
+        downloads = []
+
+        def counted_download(missing_start_date, missing_end_date):
+            downloads.append((missing_start_date, missing_end_date))
+            return download(missing_start_date, missing_end_date)
+
+        # catalog is needed only to mark downloaded tiles complete, so stored tiles are read without it
+        data = self.__observation_store.get_observations(
+            handle, start_date, end_date, counted_download,
+            data_end=lambda: self._get_catalog_last_date(handle.station_id))
+        # store lookup is hit only if nothing was downloaded
+        self._emit_cache_lookup("observations", handle.station_id, not downloads, started_at)
+        observations = data["observations"].astype(dtype)
+        if normalize:
+            observations /= 100
+            np.round(observations, 5, out=observations)
+
+        if as_numpy:
+            return {"dates": data["dates"], "observations": observations}
+        return {"dates": dates_to_strings(data["dates"]), "observations": observations.tolist()}
+
+    def _download_observations(self, handle, start_date, end_date, normalize=True,
+                               as_numpy=False, dtype=np.float64, stream=False):
+        """
+        Method to download observation data for already resolved sensor with one request
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - (optional) return numpy arrays instead of lists (default = False)
+        :param dtype: numpy dtype - (optional) observations array type if as_numpy is True (default = np.float64)
+        :param stream: bool - (optional) decode response while downloading, only with as_numpy=True (default = False)
+        :return: dict - {"dates": observation dates, "observation": observations}
+        """
+        # preparing url for request
+        request_url = self.DATA_URL + f"?station_id={handle.station_id}&start={start_date}&end={end_date}&" \
+            f"depth_id={handle.depth_id}&sensor_id={handle.sensor_id}&variable_id={handle.variable_id}"
+
+        # threads requesting the same observations at once wait for one request and decode,
+        # every thread gets its own copy of result, so it can be changed
+        key = ("observations", request_url, normalize, as_numpy, np.dtype(dtype).str, stream)
+        data, shared = self._coalesce(key, lambda: self._request_observations(request_url, handle.station_id,
+                                                                              normalize, as_numpy, dtype, stream))
+        return self._copy_observations(data) if shared else data
+
     @staticmethod
-    def get_sensor_type_and_depth_by_name(sensor_name):
+    def _copy_observations(data):
+        """
+        Method to copy observations result shared between threads
+        :param data: dict - {"dates": observation dates, "observation": observations}
+        :return: dict - result with copied lists or arrays
+        """
+        return {key: value.copy() if isinstance(value, np.ndarray) else list(value) for key, value in data.items()}
+
+    def _request_observations(self, request_url, station_id, normalize, as_numpy, dtype, stream):
         """
-        Method to extract sensor type and sensor depth from sensor name
-        :param sensor_name: string - sensor name
-        :return: dict - {"sensor_type": sensor_type, "sensor_depth": sensor_depth}
+        Method to make observations request and decode response
+        :param request_url: string - observations request url
+        :param station_id: int or string - requested station
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - return numpy arrays instead of lists
+        :param dtype: numpy dtype - observations array type if as_numpy is True
+        :param stream: bool - decode response while downloading, only with as_numpy=True
+        :return: dict - {"dates": observation dates, "observation": observations}
         """
-        if not sensor_name:
-            raise ValueError("You need to specify correct sensor name!")
+        with self._measure("observations", request_url, station_id) as measurement:
+            request = measurement.set_response(self._get(request_url, stream=stream), stream=stream)
+            if stream:
+                # streamed response must be closed to return connection to pool
+                with request:
+                    if request.status_code != 200:
+                        raise ConnectionError("Can not get data from server! Check parameters!")
+
+                    decoder = ObservationsStreamDecoder(normalize=normalize, dtype=dtype)
+                    for chunk in request.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+                        measurement.add_size(len(chunk))
+                        measurement.decode(decoder.feed, chunk)
+                    return measurement.decode(decoder.close)
 
-        sensor_type = sensor_name.split("(")[0]
-        sensor_depth = re.search(r"(-?\d\.\d+[a-z]-?)+", sensor_name).group(0)
-        return {"sensor_type": sensor_type, "sensor_depth": sensor_depth}
+            if request.status_code != 200:
+                raise ConnectionError("Can not get data from server! Check parameters!")
+
+            return measurement.decode(lambda: self._parse_observations(self._parse_json_response(request.content),
+                                                                       normalize, as_numpy, dtype))
 
     def get_sensor_observation_by_name(self, station_name, sensor_name,
-                                       start_date="2017/01/01", end_date="2017/12/31", normalize=True):
+                                       start_date="2017/01/01", end_date="2017/12/31", normalize=True,
+                                       as_numpy=False, dtype=np.float64, stream=False, chunk_by=None):
         """
         Method to get observation data for sensor in station by sensor ID
         :param station_name: string - station name
@@ -327,37 +845,391 @@ class ISMNDataParser:
         :param start_date: string - date format YYYY/MM/DD
         :param end_date: string - date format YYYY/MM/DD
         :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - (optional) if True dates are returned as numpy datetime64[s] array
+        and observations as numpy array of dtype type (default = False)
+        :param dtype: numpy dtype - (optional) observations array type, np.float32 halves memory (default = np.float64)
+        :param stream: bool - (optional) if True response is decoded while it is downloaded straight to numpy arrays,
+        so whole response text is never kept in memory, works only with as_numpy=True (default = False)
+        :param chunk_by: string or int - (optional) split period to "year" or "month" chunks or chunks
+        of this number of days and request them concurrently, one request for whole period if None (default = None)
         :return: dict - {"dates": list of observation dates, "observation": list of observations}
         """
-        try:
-            start_date_object = datetime.datetime.strptime(start_date, '%Y/%m/%d')
-            end_date_object = datetime.datetime.strptime(end_date, '%Y/%m/%d')
-        except Exception:
-            raise ValueError("Start and end dates must be in YYYY/MM/DD format!")
-
-        if start_date_object > end_date_object:
-            raise ValueError("Start date must be earlier then end date!")
+        self._validate_dates(start_date, end_date)
 
         # gather all data we need for request
-        station_id = self.get_station_id_by_name(station_name)
-        sensor_object = self.get_sensor_object_by_name(station_name, sensor_name)
-        sensor_id, variable_id, depth_id = sensor_object["sensorId"], sensor_object["variableId"], sensor_object["depthId"]
+        handle = self.get_sensor_handle(station_name, sensor_name, start_date, end_date)
+        if chunk_by is not None:
+            return self.get_observations_by_chunks(handle, start_date, end_date, chunk_by=chunk_by,
+                                                   normalize=normalize, as_numpy=as_numpy, dtype=dtype, stream=stream)
 
-        # preparing url for request
-        request_url = self.DATA_URL + f"?station_id={station_id}&start={start_date}&end={end_date}&" \
-            f"depth_id={depth_id}&sensor_id={sensor_id}&variable_id={variable_id}"
+        return self.get_observations(handle, start_date, end_date, normalize=normalize,
+                                     as_numpy=as_numpy, dtype=dtype, stream=stream)
+
+    @staticmethod
+    def _split_date_range(start_date, end_date, chunk_by="year"):
+        """
+        Method to split period to consecutive not overlapping chunks
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param chunk_by: string or int - "year", "month" or number of days in one chunk (default = "year")
+        :return: list of tuples - (chunk start date, chunk end date) in YYYY/MM/DD format
+        """
+        start_date_object, end_date_object = ISMNDataParser._validate_dates(start_date, end_date)
+
+        if chunk_by == "year":
+            def next_chunk_start(date):
+                return date.replace(year=date.year + 1, month=1, day=1)
+        elif chunk_by == "month":
+            def next_chunk_start(date):
+                return date.replace(year=date.year + date.month // 12, month=date.month % 12 + 1, day=1)
+        elif isinstance(chunk_by, int) and not isinstance(chunk_by, bool) and chunk_by > 0:
+            def next_chunk_start(date):
+                return date + datetime.timedelta(days=chunk_by)
+        else:
+            raise ValueError("Chunk must be 'year', 'month' or positive number of days!")
+
+        chunks = []
+        chunk_start = start_date_object
+        while chunk_start <= end_date_object:
+            next_start = next_chunk_start(chunk_start)
+            chunk_end = min(next_start - datetime.timedelta(days=1), end_date_object)
+            chunks.append((chunk_start.strftime("%Y/%m/%d"), chunk_end.strftime("%Y/%m/%d")))
+            chunk_start = next_start
+
+        return chunks
+
+    @staticmethod
+    def _merge_observations(chunks_data):
+        """
+        Method to merge observations of consecutive chunks, points repeated on chunks borders are removed
+        :param chunks_data: list of dicts - observations of chunks in time order
+        :return: dict - {"dates": observation dates, "observation": observations}
+        """
+        if chunks_data and isinstance(chunks_data[0]["dates"], np.ndarray):
+            dates = np.concatenate([data["dates"] for data in chunks_data])
+            observations = np.concatenate([data["observations"] for data in chunks_data])
+            # point is kept only if it is later than all previous points
+            if len(dates) > 1:
+                keep = np.empty(len(dates), dtype=bool)
+                keep[0] = True
+                keep[1:] = dates[1:] > np.maximum.accumulate(dates)[:-1]
+                if not keep.all():
+                    dates, observations = dates[keep], observations[keep]
+            return {"dates": dates, "observations": observations}
+
+        dates, observations = [], []
+        for data in chunks_data:
+            for date, observation in zip(data["dates"], data["observations"]):
+                # dates have YYYY/MM/DD HH:MM:SS format, so they can be compared as strings
+                if not dates or date > dates[-1]:
+                    dates.append(date)
+                    observations.append(observation)
+
+        return {"dates": dates, "observations": observations}
+
+    def get_observations_by_chunks(self, handle, start_date="2017/01/01", end_date="2017/12/31", chunk_by="year",
+                                   max_workers=CHUNK_WORKERS, retries=CHUNK_RETRIES, normalize=True,
+                                   as_numpy=False, dtype=np.float64, stream=False):
+        """
+        Method to get observation data for long period with several smaller requests made concurrently
+        Failed chunk is requested again up to 'retries' times without requesting other chunks again.
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param chunk_by: string or int - (optional) "year", "month" or number of days in one chunk (default = "year")
+        :param max_workers: int - (optional) number of chunks requested at the same time (default = 4)
+        :param retries: int - (optional) number of additional attempts for failed chunk (default = 2)
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - (optional) return numpy arrays instead of lists (default = False)
+        :param dtype: numpy dtype - (optional) observations array type if as_numpy is True (default = np.float64)
+        :param stream: bool - (optional) decode responses while downloading, only with as_numpy=True (default = False)
+        :return: dict - {"dates": observation dates, "observation": observations}
+        """
+        if not isinstance(handle, SensorHandle):
+            raise ValueError("Handle must be SensorHandle object!")
+
+        if stream and not as_numpy:
+            raise ValueError("Streaming decode returns only numpy arrays! Use it with as_numpy=True.")
+
+        if int(max_workers) < 1 or int(retries) < 0:
+            raise ValueError("Number of workers must be positive and number of retries can not be negative!")
+
+        # chunks are checked before any request is made
+        self._split_date_range(start_date, end_date, chunk_by)
+
+        if self.__observation_store is not None:
+            def download(missing_start_date, missing_end_date):
+                return self._download_observations_by_chunks(handle, missing_start_date, missing_end_date, chunk_by,
+                                                             max_workers, retries, normalize=False,
+                                                             as_numpy=True, stream=stream)
+
+            return self._get_stored_observations(handle, start_date, end_date, download, normalize, as_numpy, dtype)
+
+        return self._download_observations_by_chunks(handle, start_date, end_date, chunk_by, max_workers, retries,
+                                                     normalize=normalize, as_numpy=as_numpy, dtype=dtype,
+                                                     stream=stream)
+
+    def _download_observations_by_chunks(self, handle, start_date, end_date, chunk_by, max_workers, retries,
+                                         normalize=True, as_numpy=False, dtype=np.float64, stream=False):
+        """
+        Method to download observation data for period split to chunks, chunks are downloaded concurrently
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param chunk_by: string or int - "year", "month" or number of days in one chunk
+        :param max_workers: int - number of chunks requested at the same time
+        :param retries: int - number of additional attempts for failed chunk
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - (optional) return numpy arrays instead of lists (default = False)
+        :param dtype: numpy dtype - (optional) observations array type if as_numpy is True (default = np.float64)
+        :param stream: bool - (optional) decode responses while downloading, only with as_numpy=True (default = False)
+        :return: dict - {"dates": observation dates, "observation": observations}
+        """
+        chunks = self._split_date_range(start_date, end_date, chunk_by)
+        # chunks requested from fetch_many batch must use the same rate limiter as the batch
+        rate_limiter = getattr(self.__thread_data, "rate_limiter", None)
+
+        def fetch(chunk):
+            previous_rate_limiter = getattr(self.__thread_data, "rate_limiter", None)
+            self.__thread_data.rate_limiter = rate_limiter
+            try:
+                for attempt in range(int(retries) + 1):
+                    try:
+                        return self._download_observations(handle, chunk[0], chunk[1], normalize=normalize,
+                                                           as_numpy=as_numpy, dtype=dtype, stream=stream)
+                    except (ConnectionError, requests.RequestException):
+                        if attempt == int(retries):
+                            raise
+                        time.sleep(0.5 * 2 ** attempt)
+            finally:
+                self.__thread_data.rate_limiter = previous_rate_limiter
+
+        if len(chunks) == 1:
+            return fetch(chunks[0])
+
+        self.resize_connection_pool(int(max_workers))
+        with ThreadPoolExecutor(max_workers=min(int(max_workers), len(chunks))) as executor:
+            chunks_data = list(executor.map(fetch, chunks))
+
+        return self._merge_observations(chunks_data)
+
+    def fetch_many(self, requests_list, max_workers=8, rate_limit=None, normalize=True,
+                   as_numpy=False, dtype=np.float64, stream=False):
+        """
+        Method to get observations for many sensors using thread pool
+        Results are yielded as soon as they are ready, so order can differ from requests order.
+        Error in one request does not stop others - it is returned in result 'error' field.
+
+        Usage example:
+            for result in parser.fetch_many([("fraye", sensor_name, "2016/01/01", "2016/12/31")], rate_limit=5):
+                if result.error is None:
+                    process(result.data)
+
+        :param requests_list: iterable - (station name, sensor name, start date, end date) tuples,
+        dates can be omitted to use defaults
+        :param max_workers: int - (optional) number of threads (default = 8)
+        :param rate_limit: int or float - (optional) maximum number of requests to server per second
+        for whole batch including retries, not limited if None (default = None)
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param as_numpy: bool - (optional) return numpy arrays instead of lists (default = False)
+        :param dtype: numpy dtype - (optional) observations array type if as_numpy is True (default = np.float64)
+        :param stream: bool - (optional) decode responses while downloading, only with as_numpy=True (default = False)
+        :return: generator of FetchResult - (request, data, error) tuples
+        """
+        if int(max_workers) < 1:
+            raise ValueError("Number of workers must be positive integer!")
+
+        requests_list = [tuple(request) for request in requests_list]
+        for request in requests_list:
+            if not 2 <= len(request) <= 4:
+                raise ValueError("Every request must be (station name, sensor name, start date, end date) tuple!")
+
+        rate_limiter = TokenBucket(rate_limit) if rate_limit is not None else None
+
+        def fetch(request):
+            return self.get_sensor_observation_by_name(*request, normalize=normalize,
+                                                       as_numpy=as_numpy, dtype=dtype, stream=stream)
+
+        # arguments are checked above on call, requests are started only when results are iterated
+        return self._run_batch(requests_list, fetch, FetchResult, int(max_workers), rate_limiter)
+
+    def _run_batch(self, items, function, make_result, max_workers, rate_limiter):
+        """
+        Method to call function for every item in thread pool and yield results as soon as they are ready
+        :param items: list - function arguments
+        :param function: function - function(item) which is called in worker thread
+        :param make_result: function - make_result(item, function return value, error) which builds yielded result
+        :param max_workers: int - number of threads
+        :param rate_limiter: TokenBucket - limiter of requests made by all threads or None
+        :return: generator - make_result() values
+        """
+        # catalog is loaded before threads start, so workers do not wait for each other on first lookup
+        self.load_catalog()
+        self.resize_connection_pool(max_workers)
 
-        request = self.__session.get(request_url, headers=self.headers, timeout=self.request_timeout)
-        if request.status_code != 200:
-            raise ConnectionError("Can not get data from server! Check parameters!")
+        def run(item):
+            self.__thread_data.rate_limiter = rate_limiter
+            try:
+                return function(item)
+            finally:
+                self.__thread_data.rate_limiter = None
 
-        # preparing data
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {executor.submit(run, item): item for item in items}
         try:
-            observation_data = json.loads(request.content.decode("utf-8"))
-        except json.decoder.JSONDecodeError:
-            raise ValueError("Error while server response processing! "
-                             "Check input parameters or https://www.geo.tuwien.ac.at/ server status.") from None
-
-        observations = [float(obs) for obs in observation_data[1]]
-        observations = [round(float(obs) / 100, 5) for obs in observation_data[1]] if normalize else observations
-        return {"dates": observation_data[0], "observations": observations}
+            for future in as_completed(futures):
+                try:
+                    yield make_result(futures[future], future.result(), None)
+                except Exception as error:
+                    yield make_result(futures[future], None, error)
+        finally:
+            # if generator was closed before all results were read - not started requests are cancelled
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def build_panel(self, stations, variable, depth=None, start_date="2017/01/01", end_date="2017/12/31",
+                    freq="1h", max_workers=8, dtype=np.float32, chunk_size=None, normalize=True):
+        """
+        Method to get observations of many stations aligned on common time axis
+        Stations are fetched by thread pool, observations are put into time bins of freq size (values in one bin
+        are averaged) in one vectorized pass. Stations without matching sensor or with failed request
+        have NaN rows and their errors are returned in panel 'errors' field.
+
+        Usage example:
+            stations = parser.get_stations_names_list_for_network("SCAN")
+            panel = parser.build_panel(stations, "soil moisture", 0.05, "2016/01/01", "2016/12/31", freq="1D")
+            daily_mean = np.nanmean(panel.values, axis=0)
+
+        :param stations: iterable - station names or IDs
+        :param variable: string - measured variable, e.g. "soil moisture"
+        :param depth: int, float or tuple - (optional) depth in m or (depth from, depth to) range,
+        first sensor of variable used if None (default = None)
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD - last day is included in time axis
+        :param freq: string or int - (optional) time step as "30min", "1h", "1D" or number of seconds (default = "1h")
+        :param max_workers: int - (optional) number of stations fetched at the same time (default = 8)
+        :param dtype: numpy dtype - (optional) values type (default = np.float32)
+        :param chunk_size: int - (optional) if passed, generator of panels with chunk_size stations is returned,
+        so only one chunk is kept in memory, otherwise one panel of all stations (default = None)
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :return: Panel or generator of Panel - (values, dates, stations, errors) tuple with (stations, times)
+        values matrix, datetime64 time axis, stations list and station -> exception dict
+        """
+        self._validate_dates(start_date, end_date)
+        step = parse_frequency(freq)
+        if int(max_workers) < 1:
+            raise ValueError("Number of workers must be positive integer!")
+        if chunk_size is not None and int(chunk_size) < 1:
+            raise ValueError("Chunk size must be positive integer!")
+
+        stations = list(stations)
+        dates = get_time_axis(start_date, end_date, step)
+        # catalog is loaded before threads start, so workers do not wait for each other on first lookup
+        self.load_catalog()
+        self.resize_connection_pool(int(max_workers))
+
+        def fetch(station):
+            # station names are resolved with catalog, IDs are used as is
+            station_id = station if isinstance(station, (int, np.integer)) else self.get_station_id_by_name(station)
+            sensors = self.get_sensors_objects_list_for_station_by_id(station_id, start_date, end_date)
+            handle = self._make_sensor_handle(station_id, sensors, find_sensor_name(sensors, variable, depth))
+            data = self.get_observations(handle, start_date, end_date, normalize=normalize, as_numpy=True,
+                                         dtype=dtype)
+            return get_time_indexes(data["dates"], data["observations"], dates[0], step, len(dates))
+
+        def build(stations_chunk):
+            series, errors = [], dict()
+            with ThreadPoolExecutor(max_workers=min(int(max_workers), max(len(stations_chunk), 1))) as executor:
+                futures = [executor.submit(fetch, station) for station in stations_chunk]
+                for station, future in zip(stations_chunk, futures):
+                    try:
+                        series.append(future.result())
+                    except Exception as error:
+                        errors[station] = error
+                        series.append((np.empty(0, dtype=np.int64), np.empty(0, dtype=dtype)))
+            return Panel(align_series(series, len(dates), dtype), dates, stations_chunk, errors)
+
+        if chunk_size is None:
+            return build(stations)
+        return (build(stations[index:index + int(chunk_size)]) for index in range(0, len(stations), int(chunk_size)))
+
+    def _sync_sensor(self, handle, start_date=None, stream=False):
+        """
+        Method to download observations of one sensor since last stored observation till catalog 'maximum' date
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param start_date: string - (optional) date format YYYY/MM/DD to start from if nothing is stored yet,
+        station 'minimum' date is used if None (default = None)
+        :param stream: bool - (optional) decode responses while downloading (default = False)
+        :return: tuple - (number of new observations, last stored observation date)
+        """
+        station = self.get_station_object_by_id(handle.station_id)
+        if not station.get("maximum") or not station.get("minimum"):
+            raise ValueError(f"Station with ID \'{handle.station_id}\' has no observations period in catalog!")
+
+        catalog_last_date = dates_to_numpy([station["maximum"]])[0]
+        last_date = self.__observation_store.get_last_date(handle)
+        # nothing new on server - no requests are made
+        if last_date is not None and last_date >= catalog_last_date:
+            return 0, last_date
+
+        if last_date is None:
+            sync_start_date = start_date if start_date is not None else station["minimum"][:10]
+        else:
+            sync_start_date = last_date.astype("datetime64[D]").item().strftime("%Y/%m/%d")
+        sync_end_date = station["maximum"][:10]
+        self._validate_dates(sync_start_date, sync_end_date)
+
+        def download(missing_start_date, missing_end_date):
+            return self._download_observations(handle, missing_start_date, missing_end_date,
+                                               normalize=False, as_numpy=True, stream=stream)
+
+        # tile with last stored observation is downloaded again even if it is complete, so data published
+        # inside it after last sync is not lost
+        dates = self.__observation_store.get_observations(handle, sync_start_date, sync_end_date, download,
+                                                          data_end=station["maximum"], refresh_from=last_date)["dates"]
+        new_dates = dates if last_date is None else dates[dates > last_date]
+        return len(new_dates), new_dates.max() if len(new_dates) else last_date
+
+    def sync_observations(self, handles, start_date=None, max_workers=4, rate_limit=None, stream=False):
+        """
+        Method to update local observations store for tracked sensors
+        For every sensor only observations after last stored one till station 'maximum' date from catalog
+        are downloaded, so periodical sync costs only new data. Catalog is not reloaded by this method.
+
+        Usage example:
+            parser = ISMNDataParser(observations_store_dir="ismn_store")
+            handles = [parser.get_sensor_handle("fraye", sensor_name)]
+            for result in parser.sync_observations(handles):
+                print(result.handle.station_id, result.new_observations, result.last_date)
+
+        :param handles: iterable - SensorHandle objects of tracked sensors
+        :param start_date: string - (optional) date format YYYY/MM/DD to start from for sensors without stored
+        observations, station 'minimum' date is used if None (default = None)
+        :param max_workers: int - (optional) number of sensors synced at the same time (default = 4)
+        :param rate_limit: int or float - (optional) maximum number of requests to server per second
+        for whole sync including retries, not limited if None (default = None)
+        :param stream: bool - (optional) decode responses while downloading (default = False)
+        :return: generator of SyncResult - (handle, new observations number, last stored date, error) tuples
+        """
+        if self.__observation_store is None:
+            raise ValueError("Observations store is not used! Create parser with observations_store_dir.")
+
+        if int(max_workers) < 1:
+            raise ValueError("Number of workers must be positive integer!")
+
+        handles = list(handles)
+        for handle in handles:
+            if not isinstance(handle, SensorHandle):
+                raise ValueError("Every handle must be SensorHandle object!")
+
+        rate_limiter = TokenBucket(rate_limit) if rate_limit is not None else None
+
+        def sync(handle):
+            return self._sync_sensor(handle, start_date, stream)
+
+        def make_result(handle, synced, error):
+            return SyncResult(handle, *synced, None) if error is None else SyncResult(handle, 0, None, error)
+
+        # arguments are checked above on call, syncs are started only when results are iterated
+        return self._run_batch(handles, sync, make_result, int(max_workers), rate_limiter)
@@ -0,0 +1,157 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SensorsMetadataPrefetcher:
+    """
+    Background download of stations sensors metadata into parser sensors cache
+
+    When stations of network are enumerated, their sensors metadata for one period is requested by a few
+    background threads, so following per-station calls of parser return metadata from memory. Foreground
+    request of station which is being prefetched waits for the same request instead of making new one.
+
+    Usage example:
+        parser = ISMNDataParser(prefetch_sensors=True)
+        for station_name in parser.get_stations_names_list_for_network("SCAN"):
+            sensors = parser.get_sensors_names_list_for_station_by_name(station_name)
+        print(parser.prefetcher.info()["hit_rate"])
+    """
+
+    def __init__(self, parser, max_workers=4, start_date="2017/01/01", end_date="2017/12/31"):
+        """
+        :param parser: ISMNDataParser - parser to warm sensors cache of
+        :param max_workers: int - (optional) number of metadata requests made at the same time (default = 4)
+        :param start_date: string - (optional) date format YYYY/MM/DD - period start of prefetched metadata,
+        must be the same as in later calls (default = "2017/01/01")
+        :param end_date: string - (optional) date format YYYY/MM/DD - period end of prefetched metadata
+        (default = "2017/12/31")
+        """
+        if int(max_workers) < 1:
+            raise ValueError("Number of workers must be positive integer!")
+
+        self.parser = parser
+        self.max_workers = int(max_workers)
+        self.start_date = start_date
+        self.end_date = end_date
+
+        self.__executor = None
+        self.__lock = threading.Lock()
+        # prefetch threads are marked, so their own lookups are not counted
+        self.__thread_data = threading.local()
+        # station ID -> future of scheduled prefetch, kept until first foreground lookup of station
+        self.__futures = dict()
+        self.__stats = {"scheduled": 0, "prefetched": 0, "failed": 0, "cancelled": 0, "hits": 0, "late": 0,
+                        "misses": 0}
+
+    def prefetch(self, stations_ids):
+        """
+        Method to schedule sensors metadata download for stations which are not cached or scheduled yet
+        Not more stations than sensors cache can keep are scheduled, so prefetched metadata is not evicted.
+        :param stations_ids: iterable of ints - stations IDs in order of expected requests
+        :return: int - number of scheduled stations
+        """
+        max_size = self.parser.sensors_cache_info["max_size"]
+        scheduled = 0
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                     thread_name_prefix="sensors-prefetch")
+                self.parser.resize_connection_pool(self.max_workers)
+
+            for station_id in stations_ids:
+                if scheduled >= max_size:
+                    break
+                station_id = int(station_id)
+                if station_id in self.__futures or \
+                        self.parser._is_sensors_metadata_cached(station_id, self.start_date, self.end_date):
+                    continue
+                self.__futures[station_id] = self.__executor.submit(self._prefetch_station, station_id)
+                scheduled += 1
+            self.__stats["scheduled"] += scheduled
+        return scheduled
+
+    def _prefetch_station(self, station_id):
+        """
+        Method to download sensors metadata of one station in prefetch thread
+        :param station_id: int - station ID
+        """
+        self.__thread_data.is_prefetching = True
+        try:
+            self.parser.get_station_sensors_metadata_list_by_id(station_id, self.start_date, self.end_date)
+        except Exception:
+            # station is requested again in foreground, so error is raised there
+            self._count("failed")
+            raise
+        self._count("prefetched")
+
+    def _count(self, name, value=1):
+        """
+        Method to add value to statistics counter
+        :param name: string - counter name
+        :param value: int - (optional) added value (default = 1)
+        """
+        with self.__lock:
+            self.__stats[name] += value
+
+    def record_lookup(self, station_id, start_date, end_date, is_hit):
+        """
+        Method called by parser on every sensors metadata lookup to count prefetch hits
+        Only the first foreground lookup of every prefetched station is counted.
+        :param station_id: int or string - station ID
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param is_hit: bool - True if metadata was found in sensors cache
+        """
+        if getattr(self.__thread_data, "is_prefetching", False) or \
+                (start_date, end_date) != (self.start_date, self.end_date):
+            return
+
+        with self.__lock:
+            future = self.__futures.pop(station_id, None)
+            if future is None:
+                return
+            if is_hit:
+                self.__stats["hits"] += 1
+            elif not future.done():
+                # request is still running or queued, caller waits for it or makes its own
+                self.__stats["late"] += 1
+            else:
+                # prefetch failed, was cancelled or its result was evicted
+                self.__stats["misses"] += 1
+
+    def cancel(self):
+        """
+        Method to cancel queued prefetch requests, running ones are finished
+        :return: int - number of cancelled requests
+        """
+        with self.__lock:
+            cancelled = [station_id for station_id, future in self.__futures.items() if future.cancel()]
+            for station_id in cancelled:
+                del self.__futures[station_id]
+            self.__stats["cancelled"] += len(cancelled)
+        return len(cancelled)
+
+    def close(self):
+        """
+        Method to cancel queued requests and stop prefetch threads
+        """
+        self.cancel()
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def info(self):
+        """
+        Method to get prefetch statistics
+        :return: dict - {"scheduled": int, "prefetched": int, "failed": int, "cancelled": int, "pending": int,
+        "hits": int, "late": int, "misses": int, "hit_rate": float or None} - hits are first lookups of prefetched
+        stations served from memory, late ones came while request was queued or running, misses came after
+        failed prefetch or eviction, hit rate is hits share of these lookups
+        """
+        with self.__lock:
+            info = dict(self.__stats)
+            info["pending"] = sum(not future.done() for future in self.__futures.values())
+        lookups = info["hits"] + info["late"] + info["misses"]
+        info["hit_rate"] = info["hits"] / lookups if lookups else None
+        return info
@@ -0,0 +1,282 @@
+import argparse
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from sm_tools.cache import ResponseDiskStore
+from sm_tools.parsers import ISMNDataParser
+from sm_tools.single_flight import SingleFlight
+from sm_tools.transport import HTTPTransport
+
+
+# size suffixes of command line sizes
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(size):
+    """
+    Method to parse size with optional unit
+    :param size: string - size in bytes or with K, M, G or T suffix, e.g. "500M"
+    :return: int - size in bytes
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*", str(size).upper())
+    if match is None:
+        raise ValueError(f"Wrong size '{size}'! Use number of bytes or number with K, M, G or T suffix.")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+class _ProxyRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handler of proxy requests, responses are built by server.proxy
+    """
+
+    # kept alive connections, headers and body are sent without waiting for acknowledgement
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        status, body, headers = self.server.proxy.handle_request(self.path, dict(self.headers))
+        self.send_response(status)
+        headers["Content-Length"] = str(len(body))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ISMNCachingProxy:
+    """
+    Local caching proxy of ISMN server for many parsers, processes and users on one host
+
+    Proxy serves the same catalog, sensors metadata and observations endpoints as ISMN server. Successful
+    responses are kept in shared on-disk store with limited size, so every url is downloaded once while it is
+    fresh, and concurrent requests of the same url wait for one download. Expired catalog is revalidated
+    with ETag, stale response is served if ISMN server can not be reached.
+
+    Usage example:
+        proxy = ISMNCachingProxy("/var/cache/ismn", max_size=10 * 1024 ** 3, port=8765)
+        proxy.serve_forever()
+
+        # in any process on this host
+        parser = ISMNDataParser(proxy_url="http://127.0.0.1:8765")
+    """
+
+    # time in seconds while stored response is used without request to ISMN server
+    DEFAULT_TTLS = {"networks": 24 * 60 * 60, "sensors": 24 * 60 * 60, "observations": 7 * 24 * 60 * 60}
+
+    # response headers kept in store and sent to clients
+    KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+    def __init__(self, store_dir, max_size=1024 ** 3, host="127.0.0.1", port=8765, ttls=None, transport=None,
+                 headers=None, upstream_url=None):
+        """
+        :param store_dir: string - directory of shared responses store
+        :param max_size: int - (optional) maximum store size in bytes (default = 1 GB)
+        :param host: string - (optional) host to listen on (default = "127.0.0.1")
+        :param port: int - (optional) port to listen on, random free port if 0 (default = 8765)
+        :param ttls: dict - (optional) endpoint ("networks", "sensors" or "observations") -> time in seconds
+        while stored response is fresh, DEFAULT_TTLS used for missing endpoints (default = None)
+        :param transport: Transport - (optional) transport for requests to ISMN server, HTTPTransport
+        with default retries used if None (default = None)
+        :param headers: dict - (optional) headers of requests to ISMN server,
+        ISMNDataParser.DEFAULT_HEADERS used if None (default = None)
+        :param upstream_url: string - (optional) server to proxy instead of ISMN server, e.g. other proxy
+        or MockISMNServer url (default = None)
+        """
+        self.store = ResponseDiskStore(store_dir, max_size)
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.transport = transport if transport is not None else HTTPTransport()
+        self.headers = headers if headers is not None else ISMNDataParser.DEFAULT_HEADERS
+
+        # proxy path -> (endpoint name, ISMN server url)
+        self.__endpoints = dict()
+        for endpoint, url in (("networks", ISMNDataParser.NETWORKS_URL), ("sensors", ISMNDataParser.SENSOR_URL),
+                              ("observations", ISMNDataParser.DATA_URL)):
+            if upstream_url is not None:
+                url = ISMNDataParser.get_proxy_url(upstream_url, url)
+            self.__endpoints[urlsplit(url).path] = (endpoint, url)
+
+        self.__single_flight = SingleFlight()
+        self.__stats_lock = threading.Lock()
+        self.__stats = {"requests": 0, "hits": 0, "misses": 0, "revalidated": 0, "stale": 0, "errors": 0}
+
+        self.__server = ThreadingHTTPServer((host, port), _ProxyRequestHandler)
+        self.__server.daemon_threads = True
+        self.__server.proxy = self
+        self.__thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def url(self):
+        """
+        Method to get proxy url for ISMNDataParser proxy_url option
+        :return: string - e.g. "http://127.0.0.1:8765"
+        """
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Method to start serving requests in background thread
+        :return: ISMNCachingProxy - the same proxy
+        """
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+            self.__thread.start()
+        return self
+
+    def serve_forever(self):
+        """
+        Method to serve requests in current thread until stop() is called or process is interrupted
+        """
+        self.__server.serve_forever()
+
+    def stop(self):
+        """
+        Method to stop proxy and close its socket
+        """
+        if self.__thread is not None:
+            self.__server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__server.server_close()
+
+    def info(self):
+        """
+        Method to get proxy statistics
+        :return: dict - {"requests": int, "hits": int, "misses": int, "revalidated": int, "stale": int,
+        "errors": int, "coalesced": int, "store": dict} - hits are served from store, misses are downloaded,
+        revalidated are confirmed by ISMN server, stale are expired responses served when server failed
+        """
+        with self.__stats_lock:
+            info = dict(self.__stats)
+        info["coalesced"] = self.__single_flight.info()["coalesced"]
+        info["store"] = self.store.info()
+        return info
+
+    def _count(self, name):
+        """
+        Method to add one to statistics counter
+        :param name: string - counter name
+        """
+        with self.__stats_lock:
+            self.__stats[name] += 1
+
+    def handle_request(self, path, headers):
+        """
+        Method to build response for client request
+        :param path: string - request path with query
+        :param headers: dict - client request headers
+        :return: tuple - (status, body bytes, headers dict)
+        """
+        self._count("requests")
+        request_url = urlsplit(path)
+        endpoint = self.__endpoints.get(request_url.path)
+        if endpoint is None:
+            return 404, b"", dict()
+
+        endpoint_name, endpoint_url = endpoint
+        query = f"?{request_url.query}" if request_url.query else ""
+        # responses are stored by path, so store can be used with other upstream server
+        key = request_url.path + query
+
+        stored = self.store.load(key)
+        if stored is not None and stored["age"] < self.ttls[endpoint_name]:
+            self._count("hits")
+            status, content, response_headers, cache_status = 200, stored["content"], stored["headers"], "HIT"
+        else:
+            # clients requesting the same url at once wait for one download
+            response, _ = self.__single_flight.do(key, lambda: self._fetch(key, endpoint_url + query))
+            status, content, response_headers, cache_status = response
+
+        response_headers = dict(response_headers, **{"X-Cache": cache_status})
+        if status == 200 and response_headers.get("ETag") and headers.get("If-None-Match") == response_headers["ETag"]:
+            return 304, b"", response_headers
+        return status, content, response_headers
+
+    def _fetch(self, key, url):
+        """
+        Method to download response from ISMN server and save it to store
+        Expired stored response is revalidated with ETag and served if server can not be reached.
+        :param key: string - store key, request path with query
+        :param url: string - ISMN server url
+        :return: tuple - (status, body bytes, headers dict, cache status - "MISS", "REVALIDATED", "STALE"
+        or "ERROR")
+        """
+        stored = self.store.load(key)
+        request_headers = dict(self.headers)
+        if stored is not None and stored["headers"].get("ETag"):
+            request_headers["If-None-Match"] = stored["headers"]["ETag"]
+
+        try:
+            response = self.transport.get(url, headers=request_headers)
+        except Exception:
+            response = None
+
+        if response is not None and response.status_code == 304 and stored is not None:
+            # store time is updated, so response is fresh again
+            self.store.store(key, stored["content"], stored["headers"])
+            self._count("revalidated")
+            return 200, stored["content"], stored["headers"], "REVALIDATED"
+
+        if response is not None and response.status_code == 200:
+            response_headers = {name: response.headers[name] for name in self.KEPT_HEADERS
+                                if name in response.headers}
+            self.store.store(key, response.content, response_headers)
+            self._count("misses")
+            return 200, response.content, response_headers, "MISS"
+
+        # old data is better than no data when ISMN server fails
+        if stored is not None:
+            self._count("stale")
+            return 200, stored["content"], stored["headers"], "STALE"
+
+        self._count("errors")
+        if response is None:
+            return 502, b"", dict(), "ERROR"
+        return response.status_code, response.content, dict(), "ERROR"
+
+
+def main(argv=None):
+    """
+    Entry point of 'ismn-proxy' command
+    :param argv: list of strings - (optional) command line arguments, sys.argv if None (default = None)
+    :return: int - exit code
+    """
+    argument_parser = argparse.ArgumentParser(prog="ismn-proxy",
+                                              description="Local caching proxy of ISMN server shared by all "
+                                                          "parsers on this host.")
+    argument_parser.add_argument("store", help="directory to keep downloaded responses in")
+    argument_parser.add_argument("--host", default="127.0.0.1", help="host to listen on (default 127.0.0.1)")
+    argument_parser.add_argument("-p", "--port", type=int, default=8765, help="port to listen on (default 8765)")
+    argument_parser.add_argument("--max-size", type=parse_size, default="1G",
+                                 help="maximum store size, e.g. 500M or 10G (default 1G)")
+    for endpoint, ttl in ISMNCachingProxy.DEFAULT_TTLS.items():
+        argument_parser.add_argument(f"--{endpoint}-ttl", type=float, default=ttl,
+                                     help=f"seconds while stored {endpoint} response is fresh (default {ttl})")
+    arguments = argument_parser.parse_args(argv)
+
+    ttls = {endpoint: getattr(arguments, f"{endpoint}_ttl") for endpoint in ISMNCachingProxy.DEFAULT_TTLS}
+    proxy = ISMNCachingProxy(arguments.store, max_size=arguments.max_size, host=arguments.host, port=arguments.port,
+                             ttls=ttls)
+    print(f"Serving ISMN proxy on {proxy.url}, use ISMNDataParser(proxy_url=\"{proxy.url}\")", flush=True)
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import datetime
+import re
+from collections import namedtuple
+import numpy as np
+
+
+# station catalog fields parsed from html strings - sets of names, depth intervals in m and observations period
+StationFields = namedtuple("StationFields", ["station_id", "network", "country", "variables", "depths",
+                                             "sensors", "minimum", "maximum"])
+
+# depth interval in depthText - "0.00 - 0.05 m"
+DEPTH_PATTERN = re.compile(r"(-?\d+(?:\.\d+)?)\s*-\s*(-?\d+(?:\.\d+)?)\s*m")
+# items separator in catalog html strings
+BREAK_PATTERN = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+
+def normalize_name(name):
+    """
+    Method to normalize variable, sensor, network or country name for search
+    :param name: string - name, e.g. "soil_moisture" or "Soil Moisture"
+    :return: string - lowercase name with spaces, e.g. "soil moisture"
+    """
+    return " ".join(str(name).replace("_", " ").lower().split())
+
+
+def parse_variables(variable_text):
+    """
+    Method to parse station variableText
+    :param variable_text: string - e.g. "soil moisture<br>soil temperature<br>"
+    :return: frozenset of strings - normalized variables names
+    """
+    return frozenset(normalize_name(item) for item in BREAK_PATTERN.split(variable_text or "") if item.strip())
+
+
+def parse_depths(depth_text):
+    """
+    Method to parse station depthText
+    :param depth_text: string - e.g. "0.00 - 0.05 m <br>0.25 - 0.25 m <br>"
+    :return: tuple of tuples - (depth from, depth to) intervals in m
+    """
+    depths = []
+    for start, end in DEPTH_PATTERN.findall(depth_text or ""):
+        start, end = float(start), float(end)
+        depths.append((min(start, end), max(start, end)))
+    return tuple(depths)
+
+
+def parse_sensors(sensor_text):
+    """
+    Method to parse station sensorText - every item is comma separated manufacturer and model names
+    :param sensor_text: string - e.g. "Delta-T Devices, ThetaProbe ML2X,<br>"
+    :return: frozenset of strings - normalized manufacturers and models names
+    """
+    return frozenset(normalize_name(name) for item in BREAK_PATTERN.split(sensor_text or "")
+                     for name in item.split(",") if name.strip())
+
+
+def parse_catalog_date(value):
+    """
+    Method to parse catalog or query date
+    :param value: string, datetime.date or numpy.datetime64 - date, strings in YYYY/MM/DD [HH:MM:SS] format
+    :return: numpy.datetime64 - date with seconds precision or NaT if date is missing or broken
+    """
+    if value is None or value == "":
+        return np.datetime64("NaT", "s")
+
+    try:
+        if isinstance(value, str):
+            return np.datetime64(value.strip().replace("/", "-").replace(" ", "T"), "s")
+        return np.datetime64(value, "s")
+    except ValueError:
+        return np.datetime64("NaT", "s")
+
+
+class StationQueryIndex:
+    """
+    Class for searching stations by measured variables, depths, sensors, observations period,
+    network and country
+
+    Catalog html strings are parsed once, names are kept in inverted indexes (name -> stations)
+    and depths and periods in numpy arrays, so queries do not parse or scan all station objects.
+
+    Usage example:
+        index = StationQueryIndex(parser.networks_objects)
+        stations = index.query_stations(variable="soil moisture", depth=0.05,
+                                        active_between=("2016/01/01", "2016/12/31"))
+    """
+
+    def __init__(self, networks_objects_list):
+        """
+        :param networks_objects_list: list of dicts or Network records - networks with inner stations
+        """
+        self.__stations = []
+        self.__fields = []
+        # name -> set of stations indexes
+        self.__by_variable = dict()
+        self.__by_sensor = dict()
+        self.__by_network = dict()
+        self.__by_country = dict()
+        # depth intervals of all stations - station index, depth from, depth to
+        depths_stations, depths_from, depths_to = [], [], []
+
+        for network in networks_objects_list:
+            for station in network["Stations"]:
+                index = len(self.__stations)
+                fields = StationFields(int(station["stationID"]), network["networkID"],
+                                       network.get("network_country"),
+                                       parse_variables(station.get("variableText")),
+                                       parse_depths(station.get("depthText")),
+                                       parse_sensors(station.get("sensorText")),
+                                       parse_catalog_date(station.get("minimum")),
+                                       parse_catalog_date(station.get("maximum")))
+                self.__stations.append(station)
+                self.__fields.append(fields)
+
+                for variable in fields.variables:
+                    self.__by_variable.setdefault(variable, set()).add(index)
+                for sensor in fields.sensors:
+                    self.__by_sensor.setdefault(sensor, set()).add(index)
+                self.__by_network.setdefault(normalize_name(fields.network), set()).add(index)
+                if fields.country:
+                    self.__by_country.setdefault(normalize_name(fields.country), set()).add(index)
+                for depth_from, depth_to in fields.depths:
+                    depths_stations.append(index)
+                    depths_from.append(depth_from)
+                    depths_to.append(depth_to)
+
+        self.__index_by_id = {fields.station_id: index for index, fields in enumerate(self.__fields)}
+        self.__depths_stations = np.array(depths_stations, dtype=np.intp)
+        self.__depths_from = np.array(depths_from, dtype=np.float64)
+        self.__depths_to = np.array(depths_to, dtype=np.float64)
+        self.__minimums = np.array([fields.minimum for fields in self.__fields], dtype="datetime64[s]")
+        self.__maximums = np.array([fields.maximum for fields in self.__fields], dtype="datetime64[s]")
+
+    def __len__(self):
+        return len(self.__stations)
+
+    @property
+    def variables(self):
+        """
+        Method to get all measured variables names
+        :return: list of strings - normalized variables names
+        """
+        return sorted(self.__by_variable)
+
+    @property
+    def sensors(self):
+        """
+        Method to get all sensors manufacturers and models names
+        :return: list of strings - normalized sensors names
+        """
+        return sorted(self.__by_sensor)
+
+    @property
+    def countries(self):
+        """
+        Method to get all countries names
+        :return: list of strings - normalized countries names
+        """
+        return sorted(self.__by_country)
+
+    def get_station_fields(self, station_id):
+        """
+        Method to get parsed catalog fields of station
+        :param station_id: int or string - station ID
+        :return: StationFields - parsed station fields
+        """
+        try:
+            return self.__fields[self.__index_by_id[int(station_id)]]
+        except (KeyError, ValueError, TypeError):
+            raise ValueError(f"Not found station with ID \'{station_id}\'") from None
+
+    @staticmethod
+    def _get_names_indexes(index, names):
+        """
+        Method to get stations which have at least one of names
+        :param index: dict - inverted index name -> stations indexes
+        :param names: string or list of strings - searched names
+        :return: set of ints - stations indexes
+        """
+        names = [names] if isinstance(names, str) else names
+        result = set()
+        for name in names:
+            result |= index.get(normalize_name(name), set())
+        return result
+
+    def _get_depth_mask(self, depth):
+        """
+        Method to get stations which measure at depth
+        :param depth: int, float or tuple - depth in m which must be inside station depth interval
+        or (depth from, depth to) range which must overlap with station depth interval
+        :return: numpy.ndarray - bool mask over stations
+        """
+        try:
+            depth_from, depth_to = (float(depth), float(depth)) if np.isscalar(depth) else map(float, depth)
+        except (TypeError, ValueError):
+            raise ValueError("Depth must be number or (depth from, depth to) tuple in m!") from None
+
+        # small tolerance for depths like 0.05 stored as text
+        matched = (self.__depths_from <= max(depth_from, depth_to) + 1e-9) & \
+                  (self.__depths_to >= min(depth_from, depth_to) - 1e-9)
+        mask = np.zeros(len(self.__stations), dtype=bool)
+        mask[self.__depths_stations[matched]] = True
+        return mask
+
+    def _get_period_mask(self, active_between):
+        """
+        Method to get stations which observations period overlaps with period
+        :param active_between: tuple - (start date, end date), dates are YYYY/MM/DD strings or date objects,
+        None for open end
+        :return: numpy.ndarray - bool mask over stations
+        """
+        try:
+            start_date, end_date = active_between
+        except (TypeError, ValueError):
+            raise ValueError("Period must be (start date, end date) tuple!") from None
+
+        if (start_date is not None and np.isnat(parse_catalog_date(start_date))) or \
+                (end_date is not None and np.isnat(parse_catalog_date(end_date))):
+            raise ValueError("Wrong date format! Use YYYY/MM/DD.")
+
+        # end date without time includes whole day
+        is_end_day = isinstance(end_date, str) and len(end_date.strip()) <= 10 or \
+            isinstance(end_date, datetime.date) and not isinstance(end_date, datetime.datetime)
+        start_date, end_date = parse_catalog_date(start_date), parse_catalog_date(end_date)
+        if is_end_day:
+            end_date = end_date + np.timedelta64(1, "D") - np.timedelta64(1, "s")
+
+        mask = ~np.isnat(self.__minimums) & ~np.isnat(self.__maximums)
+        if not np.isnat(end_date):
+            mask &= self.__minimums <= end_date
+        if not np.isnat(start_date):
+            mask &= self.__maximums >= start_date
+        return mask
+
+    def query_stations(self, variable=None, depth=None, active_between=None, network=None, country=None,
+                       sensor=None):
+        """
+        Method to get stations matching all passed conditions
+        Names are case insensitive and "_" is the same as space, list of names matches any of them.
+        :param variable: string or list of strings - (optional) measured variable, e.g. "soil moisture"
+        (default = None)
+        :param depth: int, float or tuple - (optional) depth in m or (depth from, depth to) range (default = None)
+        :param active_between: tuple - (optional) (start date, end date) period with observations,
+        dates in YYYY/MM/DD format (default = None)
+        :param network: string or list of strings - (optional) network name (default = None)
+        :param country: string or list of strings - (optional) country name (default = None)
+        :param sensor: string or list of strings - (optional) sensor model or manufacturer, e.g. "ThetaProbe ML2X"
+        (default = None)
+        :return: list - stations in catalog order in the same type as passed to index
+        """
+        # candidates are intersected from inverted indexes, search stops as soon as nothing is left
+        candidates = None
+        for index, names in ((self.__by_network, network), (self.__by_country, country),
+                             (self.__by_variable, variable), (self.__by_sensor, sensor)):
+            if names is None:
+                continue
+            indexes = self._get_names_indexes(index, names)
+            candidates = indexes if candidates is None else candidates & indexes
+            if not candidates:
+                return []
+
+        mask = None
+        if depth is not None:
+            mask = self._get_depth_mask(depth)
+        if active_between is not None:
+            period_mask = self._get_period_mask(active_between)
+            mask = period_mask if mask is None else mask & period_mask
+
+        if candidates is None:
+            result = np.nonzero(mask)[0] if mask is not None else range(len(self.__stations))
+        else:
+            result = sorted(candidates)
+            if mask is not None:
+                result = [index for index in result if mask[index]]
+        return [self.__stations[index] for index in result]
@@ -0,0 +1,67 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket rate limiter
+
+    Bucket is refilled with 'rate' tokens per second up to 'capacity' tokens,
+    every request takes one token and waits if bucket is empty
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: int or float - number of allowed requests per second
+        :param capacity: int - (optional) maximum burst size, rate rounded up if None (default = None)
+        """
+        if rate is None or rate <= 0:
+            raise ValueError("Rate limit must be positive number of requests per second!")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else float(max(1, int(rate + 0.999)))
+        if self.capacity < 1:
+            raise ValueError("Bucket capacity must be at least 1!")
+
+        self.__tokens = self.capacity
+        self.__last_update = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def _refill(self):
+        """
+        Method to add tokens for time passed since last update
+        """
+        now = time.monotonic()
+        self.__tokens = min(self.capacity, self.__tokens + (now - self.__last_update) * self.rate)
+        self.__last_update = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Method to take tokens without waiting
+        :param tokens: int - (optional) number of tokens to take (default = 1)
+        :return: bool - True if tokens were taken
+        """
+        with self.__lock:
+            self._refill()
+            if self.__tokens >= tokens:
+                self.__tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        """
+        Method to take tokens, waits until there is enough tokens in bucket
+        :param tokens: int - (optional) number of tokens to take (default = 1)
+        """
+        if tokens > self.capacity:
+            raise ValueError("Can not take more tokens than bucket capacity!")
+
+        while True:
+            with self.__lock:
+                self._refill()
+                if self.__tokens >= tokens:
+                    self.__tokens -= tokens
+                    return
+                wait_time = (tokens - self.__tokens) / self.rate
+
+            time.sleep(wait_time)
@@ -0,0 +1,189 @@
+import sys
+
+
+def _intern(value):
+    """
+    Method to intern string, so repeated catalog texts are kept in memory once
+    :param value: any - catalog value
+    :return: any - interned string or the same value
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _compact_number(value, number_type):
+    """
+    Method to convert catalog number string to number if it is converted back to the same string
+    :param value: any - catalog value, e.g. "-34.780428"
+    :param number_type: type - int or float
+    :return: int, float or interned original value if it can not be restored from number
+    """
+    if isinstance(value, str):
+        try:
+            number = number_type(value)
+        except ValueError:
+            return _intern(value)
+        if str(number) == value:
+            return number
+    return _intern(value)
+
+
+def _view_number(value):
+    """
+    Method to get catalog string for compact number
+    :param value: int, float or original value
+    :return: string or original value
+    """
+    return str(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+
+
+class Station:
+    """
+    Compact station record - numbers are kept as int and float, repeated texts are interned
+    and unknown fields are kept only if server sends them
+
+    Record can be read like station object - station["station_name"] or station.get("lat"),
+    to_dict() builds station object in server format.
+    """
+
+    # station object field -> record attribute, in server response order
+    FIELDS = (("comment", "comment"), ("depthText", "depth_text"), ("extMetadata", "ext_metadata"),
+              ("lat", "lat"), ("lng", "lng"), ("maximum", "maximum"), ("minimum", "minimum"),
+              ("sensorText", "sensor_text"), ("stationID", "station_id"), ("station_abbr", "abbr"),
+              ("station_name", "name"), ("variableText", "variable_text"))
+    ATTRIBUTES = dict(FIELDS)
+    # fields which are kept as numbers
+    NUMBERS = {"lat": float, "lng": float, "stationID": int}
+
+    __slots__ = tuple(attribute for _, attribute in FIELDS) + ("network", "extra")
+
+    def __init__(self, station_object, network=None):
+        """
+        :param station_object: dict - station object from server response
+        :param network: Network - (optional) network record where station is placed (default = None)
+        """
+        for field, attribute in self.FIELDS:
+            value = station_object.get(field)
+            number_type = self.NUMBERS.get(field)
+            setattr(self, attribute, _compact_number(value, number_type) if number_type else _intern(value))
+
+        self.network = network
+        extra = {_intern(field): value for field, value in station_object.items() if field not in self.ATTRIBUTES}
+        self.extra = extra or None
+
+    @classmethod
+    def from_values(cls, values, network=None, extra=None):
+        """
+        Method to create record from already compact values without checking them
+        :param values: iterable - attributes values in FIELDS order
+        :param network: Network - (optional) network record where station is placed (default = None)
+        :param extra: dict - (optional) unknown station object fields (default = None)
+        :return: Station - station record
+        """
+        station = cls.__new__(cls)
+        for (_, attribute), value in zip(cls.FIELDS, values):
+            setattr(station, attribute, value)
+        station.network = network
+        station.extra = extra or None
+        return station
+
+    def __getitem__(self, field):
+        attribute = self.ATTRIBUTES.get(field)
+        if attribute is not None:
+            value = getattr(self, attribute)
+            return _view_number(value) if field in self.NUMBERS else value
+        if self.extra is not None and field in self.extra:
+            return self.extra[field]
+        raise KeyError(field)
+
+    def get(self, field, default=None):
+        """
+        Method to get station object field
+        :param field: string - station object field, e.g. "station_name"
+        :param default: any - (optional) value for missing field (default = None)
+        :return: any - field value
+        """
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Station({self.station_id}, {self.name!r})"
+
+    def to_dict(self):
+        """
+        Method to build station object in server format
+        :return: dict - station object
+        """
+        station_object = {field: self[field] for field, _ in self.FIELDS}
+        if self.extra is not None:
+            station_object.update(self.extra)
+        return station_object
+
+
+class Network:
+    """
+    Compact network record with station records
+
+    Record can be read like network object - network["networkID"] or network["Stations"],
+    to_dict() builds network object with station objects in server format.
+    """
+
+    __slots__ = ("name", "stations", "fields")
+
+    def __init__(self, network_object):
+        """
+        :param network_object: dict - network object from server response
+        """
+        self.name = _intern(network_object["networkID"])
+        self.stations = [Station(station, self) for station in network_object.get("Stations") or []]
+        # other network fields are kept in server order, there are only few hundreds of networks
+        self.fields = {_intern(field): _intern(value) for field, value in network_object.items()
+                       if field not in ("Stations", "networkID")}
+
+    @classmethod
+    def from_values(cls, name, fields):
+        """
+        Method to create record without stations from already compact values
+        :param name: string - network name
+        :param fields: dict - other network object fields except "Stations"
+        :return: Network - network record, stations must be appended to 'stations' list
+        """
+        network = cls.__new__(cls)
+        network.name = _intern(name)
+        network.stations = []
+        network.fields = {_intern(field): _intern(value) for field, value in fields.items()}
+        return network
+
+    def __getitem__(self, field):
+        if field == "networkID":
+            return self.name
+        if field == "Stations":
+            return self.stations
+        return self.fields[field]
+
+    def get(self, field, default=None):
+        """
+        Method to get network object field
+        :param field: string - network object field, e.g. "network_country"
+        :param default: any - (optional) value for missing field (default = None)
+        :return: any - field value
+        """
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Network({self.name!r}, {len(self.stations)} stations)"
+
+    def to_dict(self, with_stations=True):
+        """
+        Method to build network object in server format
+        :param with_stations: bool - (optional) include station objects (default = True)
+        :return: dict - network object
+        """
+        network_object = {"Stations": [station.to_dict() for station in self.stations] if with_stations else [],
+                          "networkID": self.name}
+        network_object.update(self.fields)
+        return network_object
@@ -0,0 +1,86 @@
+import threading
+
+
+class _Call:
+    """
+    Function call which is running now, other threads wait for its result
+    """
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Thread safe deduplication of concurrent identical calls
+
+    Only first thread calling function with some key runs it, other threads which call it with the same key
+    while it is running wait and get the same result or exception. Finished calls are not remembered,
+    so next call with this key runs function again.
+
+    Usage example:
+        single_flight = SingleFlight()
+        result, shared = single_flight.do(request_url, lambda: download(request_url))
+    """
+
+    def __init__(self):
+        self.__calls = dict()
+        self.__lock = threading.Lock()
+        self.__executions = 0
+        self.__coalesced = 0
+
+    def do(self, key, function):
+        """
+        Method to run function or wait for result of the same running call
+        :param key: hashable - call key, calls with equal keys must return the same result
+        :param function: function - function without arguments
+        :return: tuple - (function result, True if result is shared with other threads)
+        """
+        with self.__lock:
+            call = self.__calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self.__calls[key] = _Call()
+                self.__executions += 1
+            else:
+                call.waiters += 1
+                self.__coalesced += 1
+
+        if is_leader:
+            try:
+                call.result = function()
+            except BaseException as error:
+                call.error = error
+            finally:
+                # call is removed before waking waiters, so new calls with this key run function again
+                with self.__lock:
+                    del self.__calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        # waiters are counted under lock, so number is final after call was removed
+        return call.result, not is_leader or call.waiters > 0
+
+    def info(self):
+        """
+        Method to get calls statistics
+        :return: dict - {"executions": int, "coalesced": int, "in_flight": int}
+        """
+        with self.__lock:
+            return {"executions": self.__executions, "coalesced": self.__coalesced, "in_flight": len(self.__calls)}
+
+    def reset(self):
+        """
+        Method to reset calls statistics, running calls are not affected
+        """
+        with self.__lock:
+            self.__executions = 0
+            self.__coalesced = 0
@@ -0,0 +1,160 @@
+import json
+import mmap
+import struct
+import numpy as np
+from sm_tools.records import Network, Station, _intern
+
+
+# snapshot file signature with format version
+SNAPSHOT_MAGIC = b"ISMNCAT1"
+# signature and header length
+PREFIX = struct.Struct("<8sQ")
+# arrays are aligned to 8 bytes, so they can be read directly from memory map
+ALIGNMENT = 8
+
+
+def _align(offset):
+    """
+    Method to round offset up to arrays alignment
+    :param offset: int - offset in bytes
+    :return: int - aligned offset
+    """
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_networks(networks):
+    """
+    Method to encode networks records to compact binary snapshot
+
+    Snapshot is signature, json header with table of unique values and networks fields
+    and numpy arrays - network of every station, index of every station field in values table
+    and numeric station IDs and coordinates.
+
+    :param networks: list of Network - networks records
+    :return: bytes - snapshot
+    """
+    values, values_indexes = [], dict()
+
+    def get_value_index(value):
+        # values are compared by json text, so 1 and "1" or 1 and True are different values
+        key = json.dumps(value, sort_keys=True)
+        index = values_indexes.get(key)
+        if index is None:
+            index = values_indexes[key] = len(values)
+            values.append(value)
+        return index
+
+    stations = [station for network in networks for station in network.stations]
+    numbers = {attribute: field for field, attribute in Station.FIELDS if field in Station.NUMBERS}
+    stations_networks = np.empty(len(stations), dtype=np.int32)
+    columns = np.empty((len(stations), len(Station.FIELDS)), dtype=np.int32)
+    # numeric values, columns have -1 index for them
+    numeric = {attribute: np.zeros(len(stations), dtype=np.float64 if Station.NUMBERS[field] is float else np.int64)
+               for attribute, field in numbers.items()}
+    extras = dict()
+
+    row = 0
+    for network_index, network in enumerate(networks):
+        for station in network.stations:
+            stations_networks[row] = network_index
+            for column, (field, attribute) in enumerate(Station.FIELDS):
+                value = getattr(station, attribute)
+                if attribute in numbers and isinstance(value, Station.NUMBERS[field]) and not isinstance(value, bool):
+                    numeric[attribute][row] = value
+                    columns[row, column] = -1
+                else:
+                    columns[row, column] = get_value_index(value)
+            if station.extra is not None:
+                extras[str(row)] = station.extra
+            row += 1
+
+    header = json.dumps({"values": values,
+                         "networks": [[network.name, network.fields] for network in networks],
+                         "extras": extras,
+                         "stations": len(stations),
+                         "numbers": list(numbers)}).encode("utf-8")
+
+    arrays = [stations_networks, columns] + [numeric[attribute] for attribute in numbers]
+    parts = [PREFIX.pack(SNAPSHOT_MAGIC, len(header)), header]
+    offset = PREFIX.size + len(header)
+    for array in arrays:
+        padding = _align(offset) - offset
+        parts.append(b"\0" * padding)
+        parts.append(array.tobytes())
+        offset += padding + array.nbytes
+    return b"".join(parts)
+
+
+def decode_networks(buffer):
+    """
+    Method to decode networks records from snapshot, buffer is read without copying arrays
+    :param buffer: bytes, memoryview or mmap - snapshot, buffer can be bigger than snapshot
+    :return: list of Network - networks records
+    """
+    buffer = memoryview(buffer)
+    try:
+        magic, header_size = PREFIX.unpack_from(buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError
+        header = json.loads(bytes(buffer[PREFIX.size:PREFIX.size + header_size]).decode("utf-8"))
+        stations_count = header["stations"]
+
+        offset = PREFIX.size + header_size
+
+        def read_array(dtype, count):
+            nonlocal offset
+            offset = _align(offset)
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        stations_networks = read_array(np.int32, stations_count).tolist()
+        columns = read_array(np.int32, stations_count * len(Station.FIELDS)).reshape(stations_count, -1).tolist()
+        attributes = dict((attribute, field) for field, attribute in Station.FIELDS)
+        numeric = {attribute: read_array(np.float64 if Station.NUMBERS[attributes[attribute]] is float else np.int64,
+                                         stations_count).tolist()
+                   for attribute in header["numbers"]}
+    except (struct.error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+        raise ValueError("Wrong catalog snapshot format!") from None
+    finally:
+        # memory map can be closed only when there is no views of it
+        try:
+            buffer.release()
+        except BufferError:
+            pass
+
+    try:
+        values = [_intern(value) for value in header["values"]]
+        networks = [Network.from_values(name, fields) for name, fields in header["networks"]]
+        extras = header["extras"]
+        numeric_columns = [numeric.get(attribute) for _, attribute in Station.FIELDS]
+        for row in range(stations_count):
+            network = networks[stations_networks[row]]
+            station_values = [values[index] if index >= 0 else numeric_columns[column][row]
+                              for column, index in enumerate(columns[row])]
+            network.stations.append(Station.from_values(station_values, network, extras.get(str(row))))
+    except (IndexError, KeyError, TypeError, ValueError):
+        raise ValueError("Wrong catalog snapshot format!") from None
+    return networks
+
+
+def save_snapshot(snapshot, path):
+    """
+    Method to write snapshot to file
+    :param snapshot: bytes - catalog snapshot
+    :param path: string - file path
+    """
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(snapshot)
+
+
+def load_snapshot_file(path):
+    """
+    Method to decode networks records from snapshot file through memory map,
+    so file is not copied to memory of every process which reads it
+    :param path: string - snapshot file path
+    :return: list of Network - networks records
+    """
+    with open(path, "rb") as snapshot_file:
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as snapshot:
+            return decode_networks(snapshot)
@@ -0,0 +1,328 @@
+import math
+import numpy as np
+
+
+# mean Earth radius in km
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _to_float(value):
+    """
+    Method to convert station coordinate to float
+    :param value: string or number - coordinate
+    :return: float - coordinate or NaN if it can not be converted
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _to_unit_vectors(lats, lons):
+    """
+    Method to convert coordinates to points on unit sphere
+    :param lats: numpy.ndarray - latitudes in degrees
+    :param lons: numpy.ndarray - longitudes in degrees
+    :return: numpy.ndarray - (N, 3) array of unit vectors
+    """
+    lats, lons = np.radians(lats), np.radians(lons)
+    return np.stack([np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)], axis=-1)
+
+
+def _chord_to_km(chords):
+    """
+    Method to convert chord length on unit sphere to great circle distance
+    :param chords: numpy.ndarray or float - chord lengths
+    :return: numpy.ndarray or float - distances in km
+    """
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chords / 2, 0, 1))
+
+
+class StationSpatialIndex:
+    """
+    Grid index over stations coordinates for nearest stations and bounding box searches
+
+    Stations are placed to cells of cell_size degrees, so single queries check only stations
+    from cells around query point. Batch queries for many points are computed with numpy
+    over all stations at once. Distances are great circle distances in km.
+    Stations without valid coordinates are not indexed.
+
+    Usage example:
+        index = StationSpatialIndex(parser.stations_objects)
+        stations = index.find_stations_near(41.2, -5.5, radius_km=25)
+    """
+
+    def __init__(self, stations_objects, cell_size=1.0):
+        """
+        :param stations_objects: list of dicts or Station records - stations with 'lat' and 'lng' fields
+        :param cell_size: int or float - (optional) grid cell size in degrees (default = 1.0)
+        """
+        # cells must cover longitudes without partial cell at antimeridian
+        if cell_size is None or cell_size <= 0 or abs(360 / cell_size - round(360 / cell_size)) > 1e-9:
+            raise ValueError("Cell size must be positive number of degrees which 360 is divisible by!")
+
+        self.cell_size = float(cell_size)
+        self.__lats_cells = int(math.ceil(180 / self.cell_size))
+        self.__lons_cells = int(round(360 / self.cell_size))
+
+        lats = np.array([_to_float(station.get("lat")) for station in stations_objects], dtype=np.float64)
+        lons = np.array([_to_float(station.get("lng")) for station in stations_objects], dtype=np.float64)
+        valid = np.isfinite(lats) & np.isfinite(lons) & (np.abs(lats) <= 90)
+
+        self.__stations = [station for station, is_valid in zip(stations_objects, valid) if is_valid]
+        self.__lats = lats[valid]
+        # longitudes are kept in [-180, 180) range
+        self.__lons = (lons[valid] + 180) % 360 - 180
+        self.__vectors = _to_unit_vectors(self.__lats, self.__lons)
+
+        # cell -> array of stations indexes in this cell
+        cells = dict()
+        for index, cell in enumerate(zip(self._get_lat_cells(self.__lats), self._get_lon_cells(self.__lons))):
+            cells.setdefault(cell, []).append(index)
+        self.__cells = {cell: np.array(indexes, dtype=np.intp) for cell, indexes in cells.items()}
+
+    def __len__(self):
+        return len(self.__stations)
+
+    @property
+    def stations_objects(self):
+        """
+        Method to get indexed stations, batch queries return indexes in this list
+        :return: list of dicts or Station records - stations with valid coordinates
+        """
+        return self.__stations
+
+    def _get_lat_cells(self, lats):
+        """
+        Method to get grid rows for latitudes
+        :param lats: numpy.ndarray - latitudes in degrees
+        :return: numpy.ndarray - rows indexes
+        """
+        return np.clip(np.floor((np.asarray(lats) + 90) / self.cell_size).astype(int), 0, self.__lats_cells - 1)
+
+    def _get_lon_cells(self, lons):
+        """
+        Method to get grid columns for longitudes
+        :param lons: numpy.ndarray - longitudes in degrees
+        :return: numpy.ndarray - columns indexes
+        """
+        return np.floor(((np.asarray(lons) + 180) % 360) / self.cell_size).astype(int) % self.__lons_cells
+
+    def _get_candidates(self, lat_cells, lon_cells):
+        """
+        Method to get stations indexes from grid cells
+        :param lat_cells: range - grid rows
+        :param lon_cells: list of ints - grid columns
+        :return: numpy.ndarray - stations indexes
+        """
+        # for big areas it is cheaper to check all stations than to visit every cell
+        if len(lat_cells) * len(lon_cells) > len(self.__cells):
+            rows, columns = set(lat_cells), set(lon_cells)
+            indexes = [cell_indexes for cell, cell_indexes in self.__cells.items()
+                       if cell[0] in rows and cell[1] in columns]
+        else:
+            indexes = [self.__cells[(row, column)] for row in lat_cells for column in lon_cells
+                       if (row, column) in self.__cells]
+        return np.concatenate(indexes) if indexes else np.empty(0, dtype=np.intp)
+
+    def _get_lon_cells_range(self, min_lon, max_lon):
+        """
+        Method to get grid columns for longitudes range, range can cross antimeridian
+        :param min_lon: float - western longitude in degrees
+        :param max_lon: float - eastern longitude in degrees, not smaller than western one
+        :return: list of ints - grid columns
+        """
+        if max_lon - min_lon >= 360 - self.cell_size:
+            return list(range(self.__lons_cells))
+
+        first_column, last_column = int(self._get_lon_cells(min_lon)), int(self._get_lon_cells(max_lon))
+        if first_column <= last_column:
+            return list(range(first_column, last_column + 1))
+        return list(range(first_column, self.__lons_cells)) + list(range(0, last_column + 1))
+
+    def _get_distances(self, lat, lon, indexes):
+        """
+        Method to get distances from point to stations
+        :param lat: float - latitude in degrees
+        :param lon: float - longitude in degrees
+        :param indexes: numpy.ndarray - stations indexes
+        :return: numpy.ndarray - distances in km
+        """
+        point = _to_unit_vectors(np.float64(lat), np.float64(lon))
+        return _chord_to_km(np.linalg.norm(self.__vectors[indexes] - point, axis=-1))
+
+    def _find_indexes_near(self, lat, lon, radius_km):
+        """
+        Method to get indexes of stations inside circle sorted by distance
+        :param lat: float - latitude in degrees
+        :param lon: float - longitude in degrees
+        :param radius_km: float - circle radius in km
+        :return: tuple - (stations indexes, distances in km)
+        """
+        # circle is placed inside latitude band and longitude range which grows to the poles
+        radius_degrees = math.degrees(radius_km / EARTH_RADIUS_KM)
+        min_lat, max_lat = lat - radius_degrees, lat + radius_degrees
+        lat_cells = range(int(self._get_lat_cells(max(min_lat, -90))), int(self._get_lat_cells(min(max_lat, 90))) + 1)
+        if min_lat <= -90 or max_lat >= 90 or radius_degrees >= 90:
+            lon_cells = list(range(self.__lons_cells))
+        else:
+            lon_radius = math.degrees(math.asin(min(1.0, math.sin(math.radians(radius_degrees)) /
+                                                    math.cos(math.radians(lat)))))
+            lon_cells = self._get_lon_cells_range(lon - lon_radius, lon + lon_radius)
+
+        indexes = self._get_candidates(lat_cells, lon_cells)
+        distances = self._get_distances(lat, lon, indexes)
+        inside = distances <= radius_km
+        indexes, distances = indexes[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return indexes[order], distances[order]
+
+    @staticmethod
+    def _validate_point(lat, lon):
+        """
+        Method to check query point coordinates
+        :param lat: int or float - latitude in degrees
+        :param lon: int or float - longitude in degrees
+        :return: tuple of floats - (latitude, longitude)
+        """
+        try:
+            lat, lon = float(lat), float(lon)
+        except (TypeError, ValueError):
+            raise ValueError("Coordinates must be numbers!") from None
+
+        if not -90 <= lat <= 90 or not math.isfinite(lon):
+            raise ValueError("Latitude must be in [-90, 90] range and longitude must be finite!")
+        return lat, lon
+
+    def find_stations_near(self, lat, lon, radius_km):
+        """
+        Method to get stations inside circle around point
+        :param lat: int or float - latitude in degrees
+        :param lon: int or float - longitude in degrees
+        :param radius_km: int or float - circle radius in km
+        :return: list of tuples - (station object, distance in km) sorted by distance
+        """
+        lat, lon = self._validate_point(lat, lon)
+        if radius_km is None or radius_km < 0:
+            raise ValueError("Radius must be positive number of km!")
+
+        indexes, distances = self._find_indexes_near(lat, lon, float(radius_km))
+        return [(self.__stations[index], float(distance)) for index, distance in zip(indexes, distances)]
+
+    def find_nearest_stations(self, lat, lon, k=1, max_distance_km=None):
+        """
+        Method to get k nearest stations to point
+        :param lat: int or float - latitude in degrees
+        :param lon: int or float - longitude in degrees
+        :param k: int - (optional) number of stations (default = 1)
+        :param max_distance_km: int or float - (optional) do not return stations farther than this distance,
+        not limited if None (default = None)
+        :return: list of tuples - (station object, distance in km) sorted by distance
+        """
+        lat, lon = self._validate_point(lat, lon)
+        if int(k) < 1:
+            raise ValueError("Number of stations must be positive integer!")
+
+        k = min(int(k), len(self.__stations))
+        max_radius = math.pi * EARTH_RADIUS_KM if max_distance_km is None else float(max_distance_km)
+        # search circle grows until it contains k stations - stations inside circle are nearest ones
+        radius = min(max_radius, self.cell_size * 111.2)
+        while True:
+            indexes, distances = self._find_indexes_near(lat, lon, radius)
+            if len(indexes) >= k or radius >= max_radius:
+                break
+            radius = min(max_radius, radius * 2)
+
+        return [(self.__stations[index], float(distance)) for index, distance in zip(indexes[:k], distances[:k])]
+
+    def find_stations_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        Method to get stations inside bounding box
+        If min_lon is bigger than max_lon box crosses antimeridian.
+        :param min_lat: int or float - southern latitude in degrees
+        :param min_lon: int or float - western longitude in degrees
+        :param max_lat: int or float - northern latitude in degrees
+        :param max_lon: int or float - eastern longitude in degrees
+        :return: list - stations from index in the same type as passed to index
+        """
+        min_lat, min_lon = self._validate_point(min_lat, min_lon)
+        max_lat, max_lon = self._validate_point(max_lat, max_lon)
+        if min_lat > max_lat:
+            raise ValueError("Southern latitude must not be bigger than northern one!")
+
+        min_lon, max_lon = (min_lon + 180) % 360 - 180, (max_lon + 180) % 360 - 180
+        crosses_antimeridian = min_lon > max_lon
+        lat_cells = range(int(self._get_lat_cells(min_lat)), int(self._get_lat_cells(max_lat)) + 1)
+        lon_cells = self._get_lon_cells_range(min_lon, max_lon + 360 if crosses_antimeridian else max_lon)
+
+        indexes = np.sort(self._get_candidates(lat_cells, lon_cells))
+        lats, lons = self.__lats[indexes], self.__lons[indexes]
+        inside = (lats >= min_lat) & (lats <= max_lat)
+        if crosses_antimeridian:
+            inside &= (lons >= min_lon) | (lons <= max_lon)
+        else:
+            inside &= (lons >= min_lon) & (lons <= max_lon)
+        return [self.__stations[index] for index in indexes[inside]]
+
+    def find_nearest_stations_batch(self, lats, lons, k=1, max_distance_km=None, batch_size=1024):
+        """
+        Method to get k nearest stations for many points, e.g. for satellite pixels centers
+        :param lats: array-like - latitudes in degrees
+        :param lons: array-like - longitudes in degrees
+        :param k: int - (optional) number of stations for every point (default = 1)
+        :param max_distance_km: int or float - (optional) stations farther than this distance are not
+        returned, not limited if None (default = None)
+        :param batch_size: int - (optional) number of points processed at once (default = 1024)
+        :return: tuple of numpy.ndarray - (indexes, distances) with (points number, k) shapes,
+        indexes point to 'stations_objects' list, missing stations have index -1 and distance NaN
+        """
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        if lats.shape != lons.shape:
+            raise ValueError("Latitudes and longitudes must have the same size!")
+        if np.any(np.abs(lats) > 90) or not np.all(np.isfinite(lats)) or not np.all(np.isfinite(lons)):
+            raise ValueError("Latitude must be in [-90, 90] range and longitude must be finite!")
+        if int(k) < 1:
+            raise ValueError("Number of stations must be positive integer!")
+
+        k = int(k)
+        found = min(k, len(self.__stations))
+        indexes = np.full((len(lats), k), -1, dtype=np.intp)
+        distances = np.full((len(lats), k), np.nan, dtype=np.float64)
+        if found == 0:
+            return indexes, distances
+
+        points = _to_unit_vectors(lats, lons)
+        batch_size = max(1, int(batch_size))
+        for start in range(0, len(points), batch_size):
+            # squared chord lengths between batch points and all stations
+            batch = points[start:start + batch_size]
+            squared_chords = np.maximum(2 - 2 * batch @ self.__vectors.T, 0)
+            nearest = np.argpartition(squared_chords, found - 1, axis=1)[:, :found] \
+                if found < len(self.__stations) else np.tile(np.arange(found), (len(batch), 1))
+            nearest_chords = np.take_along_axis(squared_chords, nearest, axis=1)
+            order = np.argsort(nearest_chords, axis=1, kind="stable")
+            indexes[start:start + batch_size, :found] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:start + batch_size, :found] = _chord_to_km(
+                np.sqrt(np.take_along_axis(nearest_chords, order, axis=1)))
+
+        if max_distance_km is not None:
+            too_far = distances > float(max_distance_km)
+            indexes[too_far] = -1
+            distances[too_far] = np.nan
+        return indexes, distances
+
+    def find_stations_near_batch(self, lats, lons, radius_km):
+        """
+        Method to get stations inside circles around many points
+        :param lats: array-like - latitudes in degrees
+        :param lons: array-like - longitudes in degrees
+        :param radius_km: int or float - circles radius in km
+        :return: list of lists - (station object, distance in km) tuples sorted by distance for every point
+        """
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        if lats.shape != lons.shape:
+            raise ValueError("Latitudes and longitudes must have the same size!")
+
+        return [self.find_stations_near(lat, lon, radius_km) for lat, lon in zip(lats, lons)]
@@ -0,0 +1,228 @@
+import re
+import numpy as np
+
+
+def dates_to_numpy(dates):
+    """
+    Method to convert observation dates strings to numpy array
+    :param dates: list of strings - dates in YYYY/MM/DD HH:MM:SS format
+    :return: numpy.ndarray - datetime64[s] array
+    """
+    if len(dates) == 0:
+        return np.empty(0, dtype="datetime64[s]")
+
+    # numpy parses only ISO dates, so date parts separator is replaced for whole array at once
+    return np.char.replace(np.asarray(dates, dtype=str), "/", "-").astype("datetime64[s]")
+
+
+def dates_to_strings(dates):
+    """
+    Method to convert numpy dates array to list of strings in server format
+    :param dates: numpy.ndarray - datetime64 dates
+    :return: list of strings - dates in YYYY/MM/DD HH:MM:SS format
+    """
+    if len(dates) == 0:
+        return []
+
+    iso_dates = np.datetime_as_string(dates.astype("datetime64[s]"), unit="s")
+    return np.char.replace(np.char.replace(iso_dates, "-", "/"), "T", " ").tolist()
+
+
+def values_to_numpy(values, normalize=True, dtype=np.float64):
+    """
+    Method to convert observation values to numpy array
+    :param values: list of strings or numbers - observation values, missing values are NaN
+    :param normalize: bool - use absolute values if True, otherwise - values * 100
+    :param dtype: numpy dtype - (optional) result array type (default = np.float64)
+    :return: numpy.ndarray - observations array
+    """
+    try:
+        observations = np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError):
+        # slow path only for responses with missing or broken values
+        observations = np.array([_to_float(value) for value in values], dtype=dtype)
+
+    if normalize:
+        observations /= 100
+        np.round(observations, 5, out=observations)
+    return observations
+
+
+def _to_float(value):
+    """
+    Method to convert one observation value to float
+    :param value: string or number - observation value
+    :return: float - value or NaN if it can not be converted
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class GrowableArray:
+    """
+    Numpy array with amortized appends - capacity is doubled when array is full
+    """
+
+    def __init__(self, dtype, capacity=1024):
+        """
+        :param dtype: numpy dtype - array elements type
+        :param capacity: int - (optional) initial capacity (default = 1024)
+        """
+        self.__data = np.empty(max(1, int(capacity)), dtype=dtype)
+        self.__size = 0
+
+    def __len__(self):
+        return self.__size
+
+    def extend(self, values):
+        """
+        Method to append values to the end of array
+        :param values: numpy.ndarray - values to append
+        """
+        new_size = self.__size + len(values)
+        if new_size > len(self.__data):
+            capacity = len(self.__data)
+            while capacity < new_size:
+                capacity *= 2
+            data = np.empty(capacity, dtype=self.__data.dtype)
+            data[:self.__size] = self.__data[:self.__size]
+            self.__data = data
+
+        self.__data[self.__size:new_size] = values
+        self.__size = new_size
+
+    def to_array(self):
+        """
+        Method to get filled part of array, unused capacity is released
+        :return: numpy.ndarray - array with appended values
+        """
+        data, self.__data = self.__data, np.empty(1, dtype=self.__data.dtype)
+        # array owns its memory, so it can be shrunk in place without copying values
+        data.resize(self.__size, refcheck=False)
+        self.__size = 0
+        return data
+
+
+class ObservationsStreamDecoder:
+    """
+    Incremental decoder for observations response - [[dates], [values]] json arrays
+
+    Response chunks are tokenized as they come and every batch_size tokens are converted to numpy,
+    so only final arrays and one batch of strings are kept in memory instead of whole response text
+    and parsed json lists.
+
+    Usage example:
+        decoder = ObservationsStreamDecoder()
+        for chunk in response.iter_content(65536):
+            decoder.feed(chunk)
+        result = decoder.close()
+    """
+
+    # json tokens of observations response - brackets, strings, numbers and literals,
+    # objects are not expected in response and are marked as errors
+    TOKENS_PATTERN = re.compile(rb'(\[)|(\])|"((?:[^"\\]|\\.)*)"|(-?[0-9][0-9.eE+\-]*)|(null|true|false)|([{}:])')
+
+    def __init__(self, normalize=True, dtype=np.float64, batch_size=8192):
+        """
+        :param normalize: bool - use absolute values if True, otherwise - values * 100
+        :param dtype: numpy dtype - (optional) observations array type (default = np.float64)
+        :param batch_size: int - (optional) number of tokens converted to numpy at once (default = 8192)
+        """
+        self.normalize = normalize
+        self.dtype = dtype
+        self.batch_size = int(batch_size)
+        self.__tail = b""
+        self.__depth = 0
+        # index of inner array which is parsed now - 0 for dates and 1 for values
+        self.__array_index = -1
+        self.__batches = ([], [])
+        self.__dates = GrowableArray(np.int64)
+        self.__values = GrowableArray(dtype)
+
+    @staticmethod
+    def _raise_format_error():
+        raise ValueError("Error while server response processing! "
+                         "Check input parameters or https://www.geo.tuwien.ac.at/ server status.")
+
+    def feed(self, chunk):
+        """
+        Method to process next part of response
+        :param chunk: bytes - response part
+        """
+        data = self.__tail + chunk
+        # tokens never contain delimiters, so everything before last delimiter can be tokenized safely
+        split_position = max(data.rfind(b","), data.rfind(b"]"), data.rfind(b"["))
+        if split_position < 0:
+            self.__tail = data
+            return
+
+        self.__tail = data[split_position + 1:]
+        self._process(data[:split_position + 1])
+
+    def _process(self, data):
+        """
+        Method to tokenize complete part of response
+        :param data: bytes - response part which ends with delimiter
+        """
+        for match in self.TOKENS_PATTERN.finditer(data):
+            opening, closing, string, number, literal, error = match.groups()
+            if error is not None:
+                self._raise_format_error()
+
+            if opening is not None:
+                self.__depth += 1
+                if self.__depth == 2:
+                    self.__array_index += 1
+                if self.__depth > 2 or self.__array_index > 1:
+                    self._raise_format_error()
+            elif closing is not None:
+                if self.__depth == 2:
+                    self._flush(self.__array_index)
+                self.__depth -= 1
+                if self.__depth < 0:
+                    self._raise_format_error()
+            elif self.__depth == 2:
+                token = string if string is not None else number if number is not None else literal
+                batch = self.__batches[self.__array_index]
+                batch.append(token.decode("utf-8"))
+                if len(batch) >= self.batch_size:
+                    self._flush(self.__array_index)
+            else:
+                self._raise_format_error()
+
+    def _flush(self, array_index):
+        """
+        Method to convert collected tokens batch to numpy and append it to result array
+        :param array_index: int - 0 for dates batch and 1 for values batch
+        """
+        batch = self.__batches[array_index]
+        if not batch:
+            return
+
+        if array_index == 0:
+            self.__dates.extend(dates_to_numpy(batch).view(np.int64))
+        else:
+            self.__values.extend(values_to_numpy(batch, normalize=False, dtype=self.dtype))
+        batch.clear()
+
+    def close(self):
+        """
+        Method to finish decoding
+        :return: dict - {"dates": numpy datetime64[s] array, "observations": numpy array}
+        """
+        self._process(self.__tail)
+        self.__tail = b""
+        if self.__depth != 0 or self.__array_index != 1:
+            self._raise_format_error()
+
+        dates = self.__dates.to_array().view("datetime64[s]")
+        observations = self.__values.to_array()
+        if len(dates) != len(observations):
+            self._raise_format_error()
+
+        if self.normalize and len(observations):
+            observations /= 100
+            np.round(observations, 5, out=observations)
+        return {"dates": dates, "observations": observations}
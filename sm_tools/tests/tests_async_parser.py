@@ -0,0 +1,107 @@
+import asyncio
+import unittest
+from sm_tools.async_parsers import AsyncISMNDataParser
+from sm_tools.mock_server import MockISMNServer
+from sm_tools.parsers import SensorHandle
+
+
+class TestAsyncParser(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestAsyncParser, self).__init__(*args, **kwargs)
+        self.default_network_name = "NETWORK0"
+        self.default_station_name = "Station0_0"
+        self.default_station_id = MockISMNServer.FIRST_STATION_ID
+        self.default_sensor_id = 8
+        self.default_sensor_name = "soil_moisture(m3m-3 * 100)_0.05m ThetaProbe ML2X"
+
+    def tests_initialization(self):
+        with self.assertRaises(ValueError):
+            AsyncISMNDataParser(max_concurrency=0)
+
+        parser = AsyncISMNDataParser()
+        self.assertFalse(parser.is_catalog_loaded)
+        with self.assertRaises(RuntimeError):
+            parser.get_station_id_by_name(self.default_station_name)
+
+    def tests_lookups(self):
+        async def run(server):
+            async with server.configure_parser(AsyncISMNDataParser()) as parser:
+                await parser.load_catalog()
+                self.assertIn(self.default_network_name, parser.network_names_list)
+                self.assertEqual(parser.get_station_id_by_name(self.default_station_name), self.default_station_id)
+
+                sensors = await parser.get_sensors_names_list_for_station_by_name(self.default_station_name)
+                self.assertIn(self.default_sensor_name, sensors)
+
+                metadata = await parser.get_station_sensors_metadata_list_by_name(self.default_station_name)
+                self.assertEqual([sensor["variableName"] for sensor in metadata["variables"]], sensors)
+
+                sensor = await parser.get_sensor_object_by_name(self.default_station_name, self.default_sensor_name)
+                self.assertEqual(sensor["variableName"], self.default_sensor_name)
+                with self.assertRaises(ValueError):
+                    await parser.get_sensor_object_by_name(self.default_station_name, "unknown")
+
+                sensors = await parser.get_sensor_objects_list_by_id(self.default_station_name, self.default_sensor_id)
+                self.assertTrue(sensors)
+                self.assertTrue(all(sensor["sensorId"] == str(self.default_sensor_id) for sensor in sensors))
+
+                handle = await parser.get_sensor_handle(self.default_station_name, self.default_sensor_name)
+                self.assertIsInstance(handle, SensorHandle)
+
+        with MockISMNServer(networks=2, stations=3) as server:
+            asyncio.run(run(server))
+
+    def tests_get_sensor_observations(self):
+        async def run(server):
+            async with server.configure_parser(AsyncISMNDataParser(max_concurrency=2)) as parser:
+                await parser.load_catalog()
+                with self.assertRaises(ValueError):
+                    await parser.get_sensor_observation_by_name("", "", "", "")
+
+                pairs = [(self.default_station_name, self.default_sensor_name)] * 3 + [("", "")]
+                results = await parser.get_sensor_observations_by_name(pairs, return_exceptions=True)
+                self.assertEqual(len(results), 4)
+                self.assertIsInstance(results[-1], ValueError)
+                for data in results[:-1]:
+                    self.assertIsInstance(data, dict)
+                    self.assertIsInstance(data["dates"], list)
+                    self.assertIsInstance(data["observations"], list)
+                self.assertEqual(results[0], results[1])
+
+                # all requests were made for one station and period, so metadata was requested once
+                self.assertEqual(parser.sensors_cache_info["size"], 1)
+                self.assertEqual(server.requests_count["sensors"], 1)
+
+        with MockISMNServer(networks=1, stations=2) as server:
+            asyncio.run(run(server))
+
+    def tests_cancelled_request_is_shared(self):
+        async def run(server):
+            async with server.configure_parser(AsyncISMNDataParser()) as parser:
+                first = asyncio.ensure_future(parser.get_station_sensors_metadata_list_by_id(self.default_station_id))
+                second = asyncio.ensure_future(parser.get_station_sensors_metadata_list_by_id(self.default_station_id))
+                await asyncio.sleep(0)
+                # cancelled caller does not cancel request awaited by other task
+                first.cancel()
+                self.assertTrue((await second)["variables"])
+                self.assertEqual(server.requests_count["sensors"], 1)
+
+        with MockISMNServer(networks=1, stations=1, latency=0.05) as server:
+            asyncio.run(run(server))
+
+    def tests_not_modified_is_error_for_data_requests(self):
+        async def run(server):
+            # sensors endpoint answers 304 with empty body, because request has catalog validator
+            parser = AsyncISMNDataParser(headers={"If-None-Match": server.catalog_etag})
+            async with server.configure_parser(parser):
+                parser.SENSOR_URL = server.urls["NETWORKS_URL"]
+                with self.assertRaises(ConnectionError):
+                    await parser.get_station_sensors_metadata_list_by_id(self.default_station_id)
+
+        with MockISMNServer(networks=1, stations=1) as server:
+            asyncio.run(run(server))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+from sm_tools.cache import CatalogDiskCache, LRUCache
+from sm_tools.mock_server import MockISMNServer
+
+
+class TestCache(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestCache, self).__init__(*args, **kwargs)
+        self.default_url = "https://ismn.earth/en/dataviewer/get_networks_station_info/"
+        self.default_content = b'{"Networks": []}'
+        self.default_network_name = "NETWORK0"
+        self.default_station_name = "Station0_0"
+
+    def tests_store_and_load(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = CatalogDiskCache(cache_dir)
+            self.assertIsNone(cache.load(self.default_url))
+
+            cache.store(self.default_url, self.default_content, etag='"abc"')
+            cached = cache.load(self.default_url)
+            self.assertIsInstance(cached, dict)
+            self.assertEqual(cached["content"], self.default_content)
+            self.assertEqual(cached["etag"], '"abc"')
+            self.assertIsNone(cached["last_modified"])
+            self.assertTrue(cached["is_fresh"])
+
+            # no temporary files must be left after atomic replace
+            cache.store(self.default_url, self.default_content)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            cache.clear()
+            self.assertIsNone(cache.load(self.default_url))
+
+    def tests_ttl(self):
+        for ttl in (-1, -0.001, None):
+            with self.assertRaises(ValueError):
+                CatalogDiskCache(tempfile.gettempdir(), ttl=ttl)
+
+        # zero is the smallest valid ttl
+        self.assertEqual(CatalogDiskCache(tempfile.gettempdir(), ttl=0).ttl, 0)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = CatalogDiskCache(cache_dir, ttl=0)
+            cache.store(self.default_url, self.default_content)
+            self.assertFalse(cache.load(self.default_url)["is_fresh"])
+
+    def tests_broken_entry(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = CatalogDiskCache(cache_dir)
+            cache.store(self.default_url, self.default_content)
+            with open(os.path.join(cache_dir, os.listdir(cache_dir)[0]), "wb") as cache_file:
+                cache_file.write(b"broken")
+
+            self.assertIsNone(cache.load(self.default_url))
+
+    def tests_lru_cache(self):
+        with self.assertRaises(ValueError):
+            LRUCache(-1)
+
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        # "b" is least recently used now and must be removed first
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.info(), {"hits": 1, "misses": 1, "evictions": 1, "size": 2, "max_size": 2})
+
+        self.assertEqual(cache.remove_if(lambda key: key == "c"), 1)
+        self.assertIn("a", cache)
+        self.assertNotIn("c", cache)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.info()["hits"], 0)
+
+        disabled_cache = LRUCache(0)
+        disabled_cache.put("a", 1)
+        self.assertIsNone(disabled_cache.get("a"))
+
+    def tests_parser_sensors_cache(self):
+        with MockISMNServer(networks=1, stations=1) as server:
+            parser = server.create_parser()
+            for _ in range(3):
+                parser.get_sensors_names_list_for_station_by_name(self.default_station_name)
+
+            info = parser.sensors_cache_info
+            self.assertEqual(info["misses"], 1)
+            self.assertEqual(info["hits"], 2)
+            self.assertEqual(server.requests_count["sensors"], 1)
+
+            parser.clear_cache()
+            self.assertEqual(parser.sensors_cache_info["size"], 0)
+
+    def tests_parser_with_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir, MockISMNServer(networks=1, stations=1) as server:
+            server.create_parser(cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            cached_parser = server.create_parser(cache_dir=cache_dir)
+            self.assertIn(self.default_network_name, cached_parser.network_names_list)
+            # second parser loads catalog from disk cache
+            self.assertEqual(server.requests_count["networks"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
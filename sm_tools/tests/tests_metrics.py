@@ -0,0 +1,87 @@
+import unittest
+from sm_tools.metrics import MetricsAggregator, RequestEvent, RequestMeasurement
+from sm_tools.mock_server import MockISMNServer
+
+
+class TestMetrics(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestMetrics, self).__init__(*args, **kwargs)
+        self.default_station_id = MockISMNServer.FIRST_STATION_ID
+
+    def get_event(self, latency, status=200, station_id=None, cache=None, error=None):
+        url = "http://localhost/data" if cache is None else None
+        return RequestEvent("observations", url, station_id or self.default_station_id, status, latency,
+                            100 if url else 0, 0.01 if url else 0.0, cache, error)
+
+    def tests_aggregator(self):
+        with self.assertRaises(ValueError):
+            MetricsAggregator(max_samples=0)
+
+        metrics = MetricsAggregator()
+        for latency in range(1, 101):
+            metrics(self.get_event(latency / 100))
+        metrics(self.get_event(5, status=503, station_id=2002, error="ConnectionError"))
+        metrics(self.get_event(0, cache="hit"))
+        metrics(self.get_event(0, cache="miss"))
+
+        summary = metrics.summary()["observations"]
+        self.assertEqual(summary["requests"], 101)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(summary["statuses"], {200: 100, 503: 1})
+        self.assertEqual(summary["size"], 10100)
+        self.assertEqual(summary["cache_hit_rate"], 0.5)
+        self.assertAlmostEqual(summary["latency"]["p50"], 0.51, places=2)
+        self.assertEqual(summary["latency"]["max"], 5)
+        self.assertAlmostEqual(summary["decode_time"]["mean"], 0.01)
+
+        self.assertEqual(metrics.get_slowest_stations(1)[0][:2], (2002, 1))
+        self.assertEqual(metrics.get_slowest_stations(endpoint="sensors"), [])
+
+        metrics.reset()
+        self.assertEqual(metrics.summary(), {})
+
+    def tests_samples_limit(self):
+        metrics = MetricsAggregator(max_samples=10)
+        for latency in range(100):
+            metrics(self.get_event(latency))
+
+        summary = metrics.summary()["observations"]
+        # counters include all requests and percentiles only last ones
+        self.assertEqual(summary["requests"], 100)
+        self.assertTrue(summary["latency"]["p50"] >= 90)
+
+    def tests_measurement(self):
+        events = []
+        with self.assertRaises(ValueError):
+            with RequestMeasurement(events.append, "sensors", "http://localhost/sensors") as measurement:
+                measurement.add_size(10)
+                self.assertEqual(measurement.decode(int, "5"), 5)
+                int("wrong")
+
+        self.assertEqual(events[0].size, 10)
+        self.assertEqual(events[0].error, "ValueError")
+        self.assertTrue(events[0].decode_time > 0)
+
+    def tests_parser_hooks(self):
+        metrics = MetricsAggregator()
+        events = []
+        with MockISMNServer(networks=1, stations=1) as server:
+            parser = server.create_parser(hooks=[metrics])
+            parser.add_hook(events.append)
+            parser.get_station_sensors_metadata_list_by_id(self.default_station_id)
+            parser.get_station_sensors_metadata_list_by_id(self.default_station_id)
+
+        summary = metrics.summary()
+        self.assertEqual(summary["networks"]["requests"], 1)
+        self.assertEqual(summary["sensors"]["requests"], 1)
+        self.assertEqual(summary["sensors"]["cache_hits"], 1)
+        self.assertEqual([event.cache for event in events], [None, "miss", "hit"])
+
+        parser.remove_hook(events.append)
+        with self.assertRaises(ValueError):
+            parser.remove_hook(events.append)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sm_tools.mirror import MirrorManifest, NetworkMirror, main
+from sm_tools.mock_server import MockISMNServer
+from sm_tools.parsers import ISMNDataParser
+
+
+class TestMirror(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestMirror, self).__init__(*args, **kwargs)
+        self.default_station_id = MockISMNServer.FIRST_STATION_ID
+        self.default_start_date = "2016/01/01"
+        self.default_end_date = "2016/01/31"
+
+    def tests_manifest(self):
+        output_dir = tempfile.mkdtemp()
+        manifest = MirrorManifest(os.path.join(output_dir, "manifest.json"))
+        self.assertEqual(manifest.tasks, {})
+
+        open(os.path.join(output_dir, "task.npz"), "wb").close()
+        manifest.mark_done("task", "task.npz", 10)
+        manifest.mark_failed("failed task", ValueError("error"))
+        manifest.save()
+
+        manifest = MirrorManifest(os.path.join(output_dir, "manifest.json"))
+        self.assertTrue(manifest.is_done("task", output_dir))
+        self.assertFalse(manifest.is_done("failed task", output_dir))
+        self.assertEqual(manifest.tasks["failed task"]["error"], "ValueError: error")
+
+        # finished task is downloaded again if its file was removed
+        os.remove(os.path.join(output_dir, "task.npz"))
+        self.assertFalse(manifest.is_done("task", output_dir))
+
+    def tests_mirror_resume(self):
+        with self.assertRaises(ValueError):
+            NetworkMirror(tempfile.mkdtemp(), workers=0)
+
+        with MockISMNServer(networks=1, stations=1) as server:
+            mirror = NetworkMirror(tempfile.mkdtemp(), workers=2, parser=server.create_parser(lazy=True))
+            tasks, errors = mirror.get_tasks(stations=[self.default_station_id], start_date=self.default_start_date,
+                                             end_date=self.default_end_date)
+            self.assertEqual(errors, {})
+            self.assertGreater(len(tasks), 0)
+
+            statistics = mirror.run(tasks)
+            self.assertEqual(statistics["done"], len(tasks))
+            for task in tasks:
+                path = mirror.manifest.tasks[task.key]["path"]
+                self.assertTrue(os.path.exists(os.path.join(mirror.output_dir, path)))
+
+            # finished tasks are not downloaded again
+            server.reset_requests_count()
+            statistics = NetworkMirror(mirror.output_dir, parser=server.create_parser(lazy=True)).run(tasks)
+            self.assertEqual(statistics["skipped"], len(tasks))
+            self.assertEqual(statistics["done"], 0)
+            self.assertEqual(server.requests_count["observations"], 0)
+
+    def tests_process_workers_use_passed_parser(self):
+        with MockISMNServer(networks=1, stations=2) as server:
+            # workers download observations from mock server, so passed parser settings reach them
+            mirror = NetworkMirror(tempfile.mkdtemp(), workers=2, use_processes=True,
+                                   parser=server.create_parser(lazy=True))
+            tasks, errors = mirror.get_tasks(networks=["NETWORK0"], start_date=self.default_start_date,
+                                             end_date=self.default_end_date)
+            self.assertEqual(errors, {})
+            statistics = mirror.run(tasks)
+            self.assertEqual(statistics["done"], len(tasks))
+            self.assertEqual(server.requests_count["observations"], len(tasks))
+
+    def tests_main(self):
+        with self.assertRaises(SystemExit):
+            main([tempfile.mkdtemp()])
+
+        # command creates its own parser, so parser endpoints are pointed to mock server
+        with MockISMNServer(networks=1, stations=1) as server, mock.patch.multiple(ISMNDataParser, **server.urls):
+            exit_code = main([tempfile.mkdtemp(), "-s", str(self.default_station_id), "--start",
+                              self.default_start_date, "--end", self.default_end_date, "-q"])
+            self.assertEqual(exit_code, 0)
+            self.assertGreater(server.requests_count["observations"], 0)
+
+        # server is not available - error is printed instead of traceback
+        with MockISMNServer(networks=1, stations=1) as server:
+            urls = server.urls
+        with mock.patch.multiple(ISMNDataParser, **urls), mock.patch("sys.stderr"):
+            exit_code = main([tempfile.mkdtemp(), "-s", str(self.default_station_id), "-q"])
+            self.assertEqual(exit_code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
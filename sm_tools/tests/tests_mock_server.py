@@ -0,0 +1,114 @@
+import json
+import tempfile
+import unittest
+import numpy as np
+from sm_tools.benchmarks import compare_results, get_result_key, run_benchmarks
+from sm_tools.mock_server import MockISMNServer, load_payloads, save_payloads
+
+
+class TestMockServer(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestMockServer, self).__init__(*args, **kwargs)
+        self.default_start_date = "2016/01/01"
+        self.default_end_date = "2016/01/31"
+
+    def tests_mock_server(self):
+        with self.assertRaises(ValueError):
+            MockISMNServer(networks=0)
+
+        with MockISMNServer(networks=2, stations=3, observations_step=1800) as server:
+            parser = server.create_parser(cache_dir=tempfile.mkdtemp())
+            self.assertEqual(len(parser.network_names_list), 2)
+            self.assertEqual(len(parser.stations_names_list), 6)
+
+            handle = parser.get_sensor_handle_by_id(server.first_station_id, server.sensors_names[0])
+            data = parser.get_observations(handle, self.default_start_date, self.default_end_date, as_numpy=True)
+            self.assertEqual(len(data["dates"]), 31 * 48)
+            self.assertEqual(data["dates"][0], np.datetime64("2016-01-01T00:00:00"))
+            self.assertTrue(np.all((data["observations"] > 0.1) & (data["observations"] < 0.4)))
+
+            # catalog is revalidated with ETag
+            self.assertTrue(parser.refresh_catalog().is_empty)
+            self.assertEqual(server.requests_count, {"networks": 1, "sensors": 1, "observations": 1,
+                                                     "not_modified": 1})
+            server.reset_requests_count()
+            self.assertEqual(server.requests_count["networks"], 0)
+
+    def tests_duplicate_station_names(self):
+        with MockISMNServer(networks=2, stations=1) as server:
+            catalog = json.loads(server.catalog_payload.decode("utf-8"))
+        # station of second network has the same name as station of first network
+        catalog["Networks"][1]["Stations"][0]["station_name"] = "Station0_0"
+
+        with MockISMNServer(payloads={"networks": json.dumps(catalog).encode("utf-8")}) as server:
+            parser = server.create_parser()
+            sensor_name = server.sensors_names[0]
+            with self.assertWarns(UserWarning):
+                self.assertEqual(parser.get_station_id_by_name("Station0_0"), server.first_station_id)
+            self.assertEqual(parser.get_station_id_by_name("Station0_0", "NETWORK1"), server.first_station_id + 1)
+
+            handle = parser.get_sensor_handle_by_id(server.first_station_id, sensor_name)
+            expected = parser.get_observations(handle, self.default_start_date, self.default_end_date)
+            with self.assertWarns(UserWarning):
+                data = parser.get_sensor_observation_by_name("Station0_0", sensor_name, self.default_start_date,
+                                                             self.default_end_date)
+            self.assertEqual(data, expected)
+
+            with self.assertWarns(UserWarning):
+                handle = parser.get_sensor_handle("Station0_0", sensor_name)
+            self.assertEqual(handle.station_id, server.first_station_id)
+
+            results = list(parser.fetch_many([("Station0_0", sensor_name, self.default_start_date,
+                                               self.default_end_date)]))
+            self.assertIsNone(results[0].error)
+            self.assertEqual(results[0].data, expected)
+
+    def tests_fetch_many_arguments(self):
+        with MockISMNServer(networks=1, stations=1) as server:
+            parser = server.create_parser(lazy=True)
+            # wrong arguments are reported on call, before results are iterated and without requests
+            with self.assertRaises(ValueError):
+                parser.fetch_many([], max_workers=0)
+            with self.assertRaises(ValueError):
+                parser.fetch_many([("Station0_0",)])
+            with self.assertRaises(ValueError):
+                parser.fetch_many([], rate_limit=0)
+            self.assertEqual(server.requests_count["networks"], 0)
+
+            results = parser.fetch_many([("Station0_0", server.sensors_names[0])])
+            self.assertEqual(server.requests_count["networks"], 0)
+            self.assertIsNone(next(results).error)
+
+    def tests_recorded_payloads(self):
+        with MockISMNServer(networks=1, stations=2) as server:
+            payloads = {"networks": server.catalog_payload,
+                        "observations": json.dumps([["2016/01/01 00:00:00"], ["25.0"]]).encode("utf-8")}
+
+        payloads_dir = tempfile.mkdtemp()
+        save_payloads(payloads_dir, payloads)
+        self.assertEqual(load_payloads(payloads_dir), payloads)
+
+        with MockISMNServer(payloads=load_payloads(payloads_dir), compress=True) as server:
+            parser = server.create_parser()
+            self.assertEqual(len(parser.stations_names_list), 2)
+            handle = parser.get_sensor_handle_by_id(server.first_station_id, server.sensors_names[0])
+            data = parser.get_observations(handle, self.default_start_date, self.default_end_date)
+            self.assertEqual(data, {"dates": ["2016/01/01 00:00:00"], "observations": [0.25]})
+
+    def tests_benchmarks(self):
+        results = run_benchmarks(networks=2, stations=5, repeat=1, series_days=(7,), bulk_latency=0)
+        # results must be saved as json
+        results = json.loads(json.dumps(results))
+        names = {result["name"] for result in results["results"]}
+        self.assertTrue({"catalog_load", "lookup_station_by_id", "resolve_sensor_handle", "fetch_observations",
+                         "bulk_fetch"} <= names)
+        self.assertEqual(get_result_key(results["results"][0]), "catalog_load[stations=10]")
+
+        comparison = compare_results(results, results)
+        self.assertEqual(len(comparison), len(results["results"]))
+        self.assertTrue(all(ratio == 1 for _, _, _, ratio in comparison if ratio is not None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -38,6 +38,36 @@ class TestSearch(unittest.TestCase):
         self.assertIsNotNone(station)
         self.assertIsInstance(station, dict)
 
+    def tests_get_station_by_id(self):
+        with self.assertRaises(ValueError):
+            self.ismn_parser.get_station_object_by_id(self.default_wrong_id)
+
+        with self.assertRaises(ValueError):
+            self.ismn_parser.get_station_object_by_id("")
+
+        station = self.ismn_parser.get_station_object_by_id(self.default_station_id)
+        self.assertIsNotNone(station)
+        self.assertIsInstance(station, dict)
+        self.assertEqual(station["station_name"], self.default_station_name)
+
+    def tests_get_network_for_station(self):
+        with self.assertRaises(ValueError):
+            self.ismn_parser.get_network_for_station(self.default_wrong_id)
+
+        network = self.ismn_parser.get_network_for_station(self.default_station_id)
+        self.assertIsNotNone(network)
+        self.assertIsInstance(network, dict)
+        self.assertEqual(network["networkID"], self.default_network_name)
+
+    def tests_get_station_by_name_in_network(self):
+        with self.assertRaises(ValueError):
+            self.ismn_parser.get_station_object_by_name(self.default_station_name, "")
+
+        station = self.ismn_parser.get_station_object_by_name(self.default_station_name, self.default_network_name)
+        self.assertIsNotNone(station)
+        self.assertIsInstance(station, dict)
+        self.assertEqual(int(station["stationID"]), self.default_station_id)
+
     def tests_get_stations_objects_for_network(self):
         with self.assertRaises(ValueError):
             self.ismn_parser.get_stations_objects_list_for_network(self.default_station_id)
@@ -76,6 +106,35 @@ class TestSearch(unittest.TestCase):
         self.assertIsInstance(station_id, int)
         self.assertEqual(station_id, self.default_station_id)
 
+    def tests_find_stations_by_coordinates(self):
+        station = self.ismn_parser.get_station_object_by_id(self.default_station_id)
+        lat, lon = float(station["lat"]), float(station["lng"])
+
+        stations = self.ismn_parser.find_stations_near(lat, lon, 1)
+        self.assertIn(station, [near_station for near_station, _ in stations])
+
+        nearest_station, distance = self.ismn_parser.find_nearest_stations(lat, lon)[0]
+        self.assertEqual(int(nearest_station["stationID"]), self.default_station_id)
+        self.assertAlmostEqual(distance, 0, places=3)
+
+        stations = self.ismn_parser.find_stations_in_bbox(lat - 0.01, lon - 0.01, lat + 0.01, lon + 0.01)
+        self.assertIn(station, stations)
+
+        stations, distances = self.ismn_parser.find_nearest_stations_batch([lat, lat], [lon, lon], k=2)
+        self.assertEqual(len(stations), 2)
+        self.assertEqual(stations[0][0], nearest_station)
+        self.assertEqual(distances.shape, (2, 2))
+
+    def tests_query_stations(self):
+        stations = self.ismn_parser.query_stations(variable="soil moisture", depth=0.05,
+                                                   network=self.default_network_name)
+        self.assertIn(self.default_station_id, [int(station["stationID"]) for station in stations])
+        self.assertEqual(self.ismn_parser.query_stations(network=self.default_network_name, country="Antarctica"), [])
+
+        fields = self.ismn_parser.get_station_fields(self.default_station_id)
+        self.assertEqual(fields.network, self.default_network_name)
+        self.assertIn("soil moisture", fields.variables)
+
     def tests_get_station_sensors_metadata_list_by_id(self):
         with self.assertRaises(ValueError):
             self.ismn_parser.get_station_sensors_metadata_list_by_id(self.default_station_id, "", "")
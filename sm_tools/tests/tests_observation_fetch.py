@@ -1,5 +1,8 @@
+import pickle
+import tempfile
 import unittest
-from sm_tools.parsers import ISMNDataParser
+import numpy as np
+from sm_tools.parsers import ISMNDataParser, SensorHandle, FetchResult, SyncResult
 
 
 class TestObservations(unittest.TestCase):
@@ -8,6 +11,7 @@ class TestObservations(unittest.TestCase):
         super(TestObservations, self).__init__(*args, **kwargs)
         self.ismn_parser = ISMNDataParser()
         self.default_station_name = "fraye"
+        self.default_station_id = 3506
         self.default_sensor_id = 8
         self.default_wrong_id = 125482
         self.default_sensor_name = "soil_moisture(m3m-3 * 100)_0.05m ThetaProbe ML2X"
@@ -33,6 +37,149 @@ class TestObservations(unittest.TestCase):
         for observations in data["observations"]:
             self.assertIsInstance(observations, float)
 
+    def tests_get_sensor_handle(self):
+        with self.assertRaises(ValueError):
+            self.ismn_parser.get_sensor_handle(self.default_station_name, "")
+
+        handle = self.ismn_parser.get_sensor_handle(self.default_station_name, self.default_sensor_name)
+        self.assertIsInstance(handle, SensorHandle)
+        self.assertEqual(handle.station_id, self.default_station_id)
+        self.assertEqual(handle.sensor_type, "soil_moisture")
+        self.assertEqual(handle.sensor_depth, "0.05m")
+
+        handle_by_id = self.ismn_parser.get_sensor_handle_by_id(self.default_station_id, self.default_sensor_name)
+        self.assertEqual(handle, handle_by_id)
+        self.assertEqual(pickle.loads(pickle.dumps(handle)), handle)
+        self.assertEqual(SensorHandle(**handle._asdict()), handle)
+
+    def tests_get_observations(self):
+        with self.assertRaises(ValueError):
+            self.ismn_parser.get_observations(None)
+
+        handle = self.ismn_parser.get_sensor_handle(self.default_station_name, self.default_sensor_name)
+        with self.assertRaises(ValueError):
+            self.ismn_parser.get_observations(handle, "", "")
+
+        data = self.ismn_parser.get_observations(handle)
+        self.assertEqual(data, self.ismn_parser.get_sensor_observation_by_name(self.default_station_name,
+                                                                               self.default_sensor_name))
+
+    def tests_get_sensor_observation_as_numpy(self):
+        data = self.ismn_parser.get_sensor_observation_by_name(self.default_station_name, self.default_sensor_name)
+        numpy_data = self.ismn_parser.get_sensor_observation_by_name(self.default_station_name,
+                                                                     self.default_sensor_name, as_numpy=True)
+        self.assertIsInstance(numpy_data["dates"], np.ndarray)
+        self.assertEqual(numpy_data["dates"].dtype, np.dtype("datetime64[s]"))
+        self.assertIsInstance(numpy_data["observations"], np.ndarray)
+        self.assertEqual(numpy_data["observations"].dtype, np.float64)
+        self.assertEqual(len(numpy_data["dates"]), len(data["dates"]))
+        self.assertTrue(np.allclose(numpy_data["observations"], data["observations"]))
+
+        float32_data = self.ismn_parser.get_sensor_observation_by_name(self.default_station_name,
+                                                                       self.default_sensor_name,
+                                                                       as_numpy=True, dtype=np.float32)
+        self.assertEqual(float32_data["observations"].dtype, np.float32)
+
+    def tests_get_sensor_observation_stream(self):
+        with self.assertRaises(ValueError):
+            self.ismn_parser.get_sensor_observation_by_name(self.default_station_name, self.default_sensor_name,
+                                                            stream=True)
+
+        numpy_data = self.ismn_parser.get_sensor_observation_by_name(self.default_station_name,
+                                                                     self.default_sensor_name, as_numpy=True)
+        stream_data = self.ismn_parser.get_sensor_observation_by_name(self.default_station_name,
+                                                                      self.default_sensor_name,
+                                                                      as_numpy=True, stream=True)
+        self.assertTrue(np.array_equal(stream_data["dates"], numpy_data["dates"]))
+        self.assertTrue(np.allclose(stream_data["observations"], numpy_data["observations"], equal_nan=True))
+
+    def tests_split_date_range(self):
+        with self.assertRaises(ValueError):
+            ISMNDataParser._split_date_range("2016/01/01", "2016/12/31", "week")
+
+        with self.assertRaises(ValueError):
+            ISMNDataParser._split_date_range("2016/01/01", "2016/12/31", 0)
+
+        chunks = ISMNDataParser._split_date_range("2015/12/15", "2017/01/10", "year")
+        self.assertEqual(chunks, [("2015/12/15", "2015/12/31"), ("2016/01/01", "2016/12/31"),
+                                  ("2017/01/01", "2017/01/10")])
+
+        chunks = ISMNDataParser._split_date_range("2016/12/15", "2017/01/10", "month")
+        self.assertEqual(chunks, [("2016/12/15", "2016/12/31"), ("2017/01/01", "2017/01/10")])
+
+        chunks = ISMNDataParser._split_date_range("2016/01/01", "2016/01/05", 2)
+        self.assertEqual(chunks, [("2016/01/01", "2016/01/02"), ("2016/01/03", "2016/01/04"),
+                                  ("2016/01/05", "2016/01/05")])
+
+    def tests_merge_observations(self):
+        data = ISMNDataParser._merge_observations([{"dates": ["a", "b"], "observations": [1, 2]},
+                                                  {"dates": ["b", "c"], "observations": [2, 3]}])
+        self.assertEqual(data, {"dates": ["a", "b", "c"], "observations": [1, 2, 3]})
+
+        data = ISMNDataParser._merge_observations([{"dates": np.array([1, 2]), "observations": np.array([1., 2.])},
+                                                  {"dates": np.array([2, 3]), "observations": np.array([2., 3.])}])
+        self.assertTrue(np.array_equal(data["dates"], [1, 2, 3]))
+        self.assertTrue(np.array_equal(data["observations"], [1., 2., 3.]))
+
+    def tests_get_sensor_observation_by_chunks(self):
+        data = self.ismn_parser.get_sensor_observation_by_name(self.default_station_name, self.default_sensor_name)
+        chunked_data = self.ismn_parser.get_sensor_observation_by_name(self.default_station_name,
+                                                                       self.default_sensor_name, chunk_by="month")
+        self.assertEqual(data, chunked_data)
+
+    def tests_get_observations_from_store(self):
+        store_parser = ISMNDataParser(observations_store_dir=tempfile.mkdtemp())
+        handle = store_parser.get_sensor_handle(self.default_station_name, self.default_sensor_name)
+        data = self.ismn_parser.get_observations(handle)
+        self.assertEqual(data, store_parser.get_observations(handle))
+        # second request is read from store
+        self.assertEqual(data, store_parser.get_observations(handle))
+        self.assertEqual(len(store_parser.get_observations(handle, "2017/03/01", "2017/03/31", as_numpy=True)["dates"]),
+                         len([date for date in data["dates"] if date.startswith("2017/03")]))
+
+    def tests_sync_observations(self):
+        with self.assertRaises(ValueError):
+            self.ismn_parser.sync_observations([])
+
+        store_parser = ISMNDataParser(observations_store_dir=tempfile.mkdtemp())
+        handle = store_parser.get_sensor_handle(self.default_station_name, self.default_sensor_name)
+        with self.assertRaises(ValueError):
+            store_parser.sync_observations([None])
+
+        station = store_parser.get_station_object_by_id(handle.station_id)
+        start_date = station["maximum"][:8] + "01"
+        results = list(store_parser.sync_observations([handle], start_date=start_date))
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0], SyncResult)
+        self.assertIsNone(results[0].error)
+        self.assertGreater(results[0].new_observations, 0)
+
+        # nothing new on server after first sync
+        results = list(store_parser.sync_observations([handle]))
+        self.assertEqual(results[0].new_observations, 0)
+
+    def tests_fetch_many(self):
+        with self.assertRaises(ValueError):
+            self.ismn_parser.fetch_many([], max_workers=0)
+
+        with self.assertRaises(ValueError):
+            self.ismn_parser.fetch_many([(self.default_station_name,)])
+
+        requests_list = [(self.default_station_name, self.default_sensor_name, "2016/01/01", "2016/03/31"),
+                         (self.default_station_name, self.default_sensor_name),
+                         (self.default_station_name, "")]
+        results = list(self.ismn_parser.fetch_many(requests_list, max_workers=3, rate_limit=5))
+        self.assertEqual(len(results), len(requests_list))
+        for result in results:
+            self.assertIsInstance(result, FetchResult)
+            self.assertIn(result.request, requests_list)
+            if result.request[1]:
+                self.assertIsNone(result.error)
+                self.assertIsInstance(result.data, dict)
+            else:
+                self.assertIsNone(result.data)
+                self.assertIsInstance(result.error, ValueError)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from sm_tools.mock_server import MockISMNServer
+from sm_tools.panel import align_series, find_sensor_name, get_time_axis, get_time_indexes, parse_frequency
+
+
+class TestPanel(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestPanel, self).__init__(*args, **kwargs)
+        self.default_start_date = "2016/01/01"
+        self.default_end_date = "2016/01/31"
+        self.default_sensors = [{"variableName": "soil_moisture(m3m-3 * 100)_0.05m ThetaProbe ML2X"},
+                                {"variableName": "soil_moisture(m3m-3 * 100)_0.25m ThetaProbe ML2X"},
+                                {"variableName": "soil_temperature(C)_0.00m-0.05m LI-COR"}]
+
+    def tests_frequency(self):
+        self.assertEqual(parse_frequency("30min"), np.timedelta64(1800, "s"))
+        self.assertEqual(parse_frequency("D"), np.timedelta64(86400, "s"))
+        self.assertEqual(parse_frequency(3600), np.timedelta64(3600, "s"))
+        self.assertEqual(parse_frequency(np.timedelta64(2, "h")), np.timedelta64(7200, "s"))
+        for freq in ("1 month", 0):
+            with self.assertRaises(ValueError):
+                parse_frequency(freq)
+
+        dates = get_time_axis(self.default_start_date, self.default_end_date, parse_frequency("1D"))
+        self.assertEqual(len(dates), 31)
+        self.assertEqual(dates[-1], np.datetime64("2016-01-31T00:00:00"))
+
+    def tests_sensor_search(self):
+        self.assertEqual(find_sensor_name(self.default_sensors, "soil moisture", 0.25),
+                         self.default_sensors[1]["variableName"])
+        self.assertEqual(find_sensor_name(self.default_sensors, "soil_moisture"),
+                         self.default_sensors[0]["variableName"])
+        self.assertEqual(find_sensor_name(self.default_sensors, "soil temperature", (0.02, 0.03)),
+                         self.default_sensors[2]["variableName"])
+        with self.assertRaises(ValueError):
+            find_sensor_name(self.default_sensors, "soil moisture", 1.0)
+
+    def tests_align_series(self):
+        start = np.datetime64("2016-01-01T00:00:00")
+        step = np.timedelta64(1, "h")
+        dates = start + np.array([0, 1800, 3600, 7200, -3600, 36000], dtype="timedelta64[s]")
+        observations = np.array([0.1, 0.3, np.nan, 0.4, 1, 1])
+        series = get_time_indexes(dates, observations, start, step, 4)
+        self.assertEqual(series[0].tolist(), [0, 0, 2])
+
+        # values in one bin are averaged, reversed series are sorted
+        values = align_series([series, (series[0][::-1], series[1][::-1]), (np.array([3]), np.array([0.5]))], 4)
+        self.assertEqual(values.shape, (3, 4))
+        self.assertEqual(values.dtype, np.float32)
+        np.testing.assert_allclose(values[0], [0.2, np.nan, 0.4, np.nan])
+        np.testing.assert_allclose(values[1], values[0])
+        np.testing.assert_allclose(values[2], [np.nan, np.nan, np.nan, 0.5])
+        self.assertEqual(align_series([], 4).shape, (0, 4))
+
+    def tests_build_panel(self):
+        with MockISMNServer(networks=1, stations=5, observations_step=1800) as server:
+            parser = server.create_parser()
+            stations = parser.get_stations_names_list_for_network("NETWORK0") + [server.first_station_id, "Unknown"]
+            panel = parser.build_panel(stations, "soil moisture", 0.05, self.default_start_date,
+                                       self.default_end_date, freq="1D", max_workers=4)
+            self.assertEqual(panel.values.shape, (7, 31))
+            self.assertEqual(panel.values.dtype, np.float32)
+            self.assertEqual(panel.stations, stations)
+            self.assertEqual(list(panel.errors), ["Unknown"])
+            self.assertTrue(np.all(np.isnan(panel.values[-1])))
+            np.testing.assert_allclose(panel.values[0], panel.values[5])
+
+            handle = parser.get_sensor_handle(stations[0], server.sensors_names[0], self.default_start_date,
+                                              self.default_end_date)
+            data = parser.get_observations(handle, self.default_start_date, self.default_end_date, as_numpy=True)
+            self.assertAlmostEqual(float(panel.values[0, 0]), float(np.mean(data["observations"][:48])), places=5)
+
+            chunks = list(parser.build_panel(stations, "soil moisture", 0.05, self.default_start_date,
+                                             self.default_end_date, freq="1D", chunk_size=3))
+            self.assertEqual([chunk.values.shape for chunk in chunks], [(3, 31), (3, 31), (1, 31)])
+            np.testing.assert_array_equal(np.vstack([chunk.values for chunk in chunks]), panel.values)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import pickle
+import tempfile
 import unittest
 from sm_tools.parsers import ISMNDataParser
 
@@ -19,6 +21,48 @@ class TestInitialization(unittest.TestCase):
         self.assertIsNotNone(self.ismn_parser.headers)
         self.assertIsNotNone(self.ismn_parser.request_timeout)
 
+    def tests_lazy_initialization(self):
+        lazy_parser = ISMNDataParser(lazy=True)
+        self.assertFalse(lazy_parser.is_catalog_loaded)
+
+        # first access to catalog must load it
+        networks = lazy_parser.network_names_list
+        self.assertTrue(lazy_parser.is_catalog_loaded)
+        self.assertIn(self.default_network_name, networks)
+
+        lazy_parser = ISMNDataParser(lazy=True)
+        lazy_parser.load_catalog()
+        self.assertTrue(lazy_parser.is_catalog_loaded)
+
+    def tests_catalog_sharing(self):
+        snapshot = self.ismn_parser.catalog.to_snapshot()
+        parser = ISMNDataParser(lazy=True, catalog=snapshot)
+        self.assertTrue(parser.is_catalog_loaded)
+        self.assertEqual(parser.networks_objects, self.ismn_parser.networks_objects)
+
+        snapshot_path = tempfile.mktemp()
+        self.ismn_parser.catalog.save(snapshot_path)
+        parser = ISMNDataParser(lazy=True)
+        parser.attach_catalog(snapshot_path)
+        self.assertEqual(parser.stations_names_list, self.ismn_parser.stations_names_list)
+
+        # parser is pickled with catalog and without session
+        parser = pickle.loads(pickle.dumps(self.ismn_parser))
+        self.assertTrue(parser.is_catalog_loaded)
+        self.assertEqual(parser.headers, self.ismn_parser.headers)
+        self.assertEqual(parser.network_names_list, self.ismn_parser.network_names_list)
+
+    def tests_catalog_refresh(self):
+        parser = ISMNDataParser(lazy=True, cache_dir=tempfile.mkdtemp())
+        # catalog which was not loaded is added fully
+        diff = parser.refresh_catalog()
+        self.assertTrue(parser.is_catalog_loaded)
+        self.assertEqual(len(diff.added_stations), len(parser.stations_names_list))
+
+        # catalog is not changed on server between two requests
+        self.assertTrue(parser.refresh_catalog().is_empty)
+        self.assertIn(self.default_network_name, parser.network_names_list)
+
     def tests_networks_names(self):
         networks = self.ismn_parser.network_names_list
         self.assertIsNotNone(networks)
@@ -0,0 +1,71 @@
+import pickle
+import time
+import unittest
+from sm_tools.mock_server import MockISMNServer
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestPrefetch, self).__init__(*args, **kwargs)
+        self.default_network_name = "NETWORK0"
+
+    @staticmethod
+    def wait_for_prefetch(prefetcher, timeout=10):
+        deadline = time.monotonic() + timeout
+        while prefetcher.info()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def tests_prefetch(self):
+        with MockISMNServer(networks=2, stations=10) as server:
+            parser = server.create_parser()
+            self.assertIsNone(parser.prefetcher)
+            parser.get_stations_names_list_for_network(self.default_network_name)
+            self.assertEqual(server.requests_count["sensors"], 0)
+
+            parser = server.create_parser(prefetch_sensors=True, prefetch_workers=2)
+            stations_names = parser.get_stations_names_list_for_network(self.default_network_name)
+            self.wait_for_prefetch(parser.prefetcher)
+            self.assertEqual(server.requests_count["sensors"], 10)
+
+            # stations are not prefetched twice and later calls are served from memory
+            parser.get_stations_objects_list_for_network(self.default_network_name)
+            for station_name in stations_names:
+                parser.get_sensors_names_list_for_station_by_name(station_name)
+            self.assertEqual(server.requests_count["sensors"], 10)
+
+            info = parser.prefetcher.info()
+            self.assertEqual(info["scheduled"], 10)
+            self.assertEqual(info["prefetched"], 10)
+            self.assertEqual(info["hits"], 10)
+            self.assertEqual(info["hit_rate"], 1)
+
+            self.assertEqual(pickle.loads(pickle.dumps(parser)).prefetcher.max_workers, 2)
+            parser.disable_prefetch()
+            self.assertIsNone(parser.prefetcher)
+
+    def tests_prefetch_cancel(self):
+        with MockISMNServer(networks=1, stations=20, latency=0.05) as server:
+            parser = server.create_parser()
+            with self.assertRaises(ValueError):
+                parser.enable_prefetch(max_workers=0)
+
+            prefetcher = parser.enable_prefetch(max_workers=1)
+            stations_names = parser.get_stations_names_list_for_network(self.default_network_name)
+            self.assertTrue(prefetcher.cancel() > 0)
+            self.wait_for_prefetch(prefetcher)
+
+            # cancelled stations are requested in foreground
+            for station_name in stations_names:
+                parser.get_sensors_names_list_for_station_by_name(station_name)
+            self.assertEqual(server.requests_count["sensors"], 20)
+            info = prefetcher.info()
+            self.assertEqual(info["cancelled"] + info["prefetched"], 20)
+            self.assertEqual(info["pending"], 0)
+
+        with self.assertRaises(ValueError):
+            server.create_parser(lazy=True, sensors_cache_size=0).enable_prefetch()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import pickle
+import socket
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from sm_tools.cache import ResponseDiskStore
+from sm_tools.mock_server import MockISMNServer
+from sm_tools.parsers import ISMNDataParser
+from sm_tools.proxy import ISMNCachingProxy, parse_size
+from sm_tools.transport import HTTPTransport, RetryPolicy
+
+
+class TestProxy(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestProxy, self).__init__(*args, **kwargs)
+        self.default_start_date = "2016/01/01"
+        self.default_end_date = "2016/01/31"
+
+    @staticmethod
+    def get_free_port():
+        with socket.socket() as free_socket:
+            free_socket.bind(("127.0.0.1", 0))
+            return free_socket.getsockname()[1]
+
+    def tests_parse_size(self):
+        self.assertEqual(parse_size("1024"), 1024)
+        self.assertEqual(parse_size("500M"), 500 * 1024 ** 2)
+        self.assertEqual(parse_size("1.5kb"), 1536)
+        with self.assertRaises(ValueError):
+            parse_size("ten")
+
+    def tests_proxy_url(self):
+        self.assertEqual(ISMNDataParser.get_proxy_url("http://127.0.0.1:8765", ISMNDataParser.DATA_URL),
+                         "http://127.0.0.1:8765/en/dataviewer/dataviewer_load_variable/")
+        with self.assertRaises(ValueError):
+            ISMNDataParser.get_proxy_url("127.0.0.1", ISMNDataParser.DATA_URL)
+
+    def tests_proxy(self):
+        with MockISMNServer(networks=2, stations=3) as server, \
+                ISMNCachingProxy(tempfile.mkdtemp(), port=0, upstream_url=server.base_url) as proxy:
+            parser = ISMNDataParser(proxy_url=proxy.url)
+            self.assertEqual(len(parser.stations_names_list), 6)
+            self.assertEqual(pickle.loads(pickle.dumps(parser)).NETWORKS_URL, parser.NETWORKS_URL)
+
+            # concurrent parsers download every url once
+            def fetch(_):
+                client = ISMNDataParser(proxy_url=proxy.url)
+                handle = client.get_sensor_handle_by_id(server.first_station_id, server.sensors_names[0])
+                return client.get_observations(handle, self.default_start_date, self.default_end_date)
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(fetch, range(8)))
+            self.assertTrue(all(result == results[0] for result in results))
+            self.assertEqual(server.requests_count["networks"], 1)
+            self.assertEqual(server.requests_count["sensors"], 1)
+            self.assertEqual(server.requests_count["observations"], 1)
+
+            # expired catalog is revalidated with ETag
+            proxy.ttls["networks"] = 0
+            ISMNDataParser(proxy_url=proxy.url)
+            self.assertEqual(server.requests_count["not_modified"], 1)
+
+            info = proxy.info()
+            self.assertEqual(info["revalidated"], 1)
+            self.assertEqual(info["errors"], 0)
+            self.assertEqual(info["store"]["files"], 3)
+
+    def tests_stale_responses(self):
+        store_dir = tempfile.mkdtemp()
+        with MockISMNServer(networks=1, stations=2) as server, \
+                ISMNCachingProxy(store_dir, port=0, upstream_url=server.base_url) as proxy:
+            ISMNDataParser(proxy_url=proxy.url)
+
+        # stored catalog is served when upstream server is down
+        transport = HTTPTransport(retry_policy=RetryPolicy(retries=0), connect_timeout=1)
+        with ISMNCachingProxy(store_dir, port=0, upstream_url=f"http://127.0.0.1:{self.get_free_port()}",
+                              ttls={"networks": 0}, transport=transport) as proxy:
+            parser = ISMNDataParser(proxy_url=proxy.url)
+            self.assertEqual(len(parser.stations_names_list), 2)
+            self.assertEqual(proxy.info()["stale"], 1)
+
+    def tests_response_store(self):
+        store = ResponseDiskStore(tempfile.mkdtemp(), max_size=10000)
+        for index in range(20):
+            store.store(f"/data?id={index}", b"0" * 1000, {"ETag": str(index)})
+
+        # oldest responses are evicted
+        info = store.info()
+        self.assertTrue(info["size"] <= 10000)
+        self.assertTrue(info["evictions"] > 0)
+        self.assertIsNone(store.load("/data?id=0"))
+        self.assertEqual(store.load("/data?id=19")["headers"], {"ETag": "19"})
+        self.assertEqual(store.load("/data?id=19")["content"], b"0" * 1000)
+
+        store.clear()
+        self.assertEqual(store.info()["files"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
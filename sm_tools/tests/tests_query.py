@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+from sm_tools.query import StationQueryIndex, parse_depths, parse_sensors, parse_variables
+
+
+class TestQuery(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestQuery, self).__init__(*args, **kwargs)
+        self.networks = [
+            {"networkID": "REMEDHUS", "network_country": "Spain", "Stations": [
+                {"stationID": "1", "variableText": "soil moisture<br>soil temperature<br>",
+                 "depthText": "0.00 - 0.05 m <br>0.25 - 0.25 m <br>", "sensorText": "Delta-T Devices, ThetaProbe ML2X,<br>",
+                 "minimum": "2005/01/01 00:00:00", "maximum": "2017/12/31 23:00:00"},
+                {"stationID": "2", "variableText": "precipitation<br>", "depthText": "-1.50 - -1.50 m <br>",
+                 "sensorText": "Hydrological Services, TB4,<br>",
+                 "minimum": "2010/01/01 00:00:00", "maximum": "2015/06/30 23:00:00"}]},
+            {"networkID": "SCAN", "network_country": "USA", "Stations": [
+                {"stationID": "3", "variableText": "soil moisture<br>", "depthText": "0.05 - 0.05 m <br>",
+                 "sensorText": "Hydraprobe, Hydraprobe Analog (2.5 Volt),<br>",
+                 "minimum": "2016/12/31 23:00:00", "maximum": None}]}]
+        self.index = StationQueryIndex(self.networks)
+
+    def get_ids(self, stations):
+        return [int(station["stationID"]) for station in stations]
+
+    def tests_parse_fields(self):
+        self.assertEqual(parse_variables("soil moisture<br>Soil_Temperature<br>"),
+                         {"soil moisture", "soil temperature"})
+        self.assertEqual(parse_depths("0.00 - 0.05 m <br>-1.50 - -1.50 m <br>"), ((0.0, 0.05), (-1.5, -1.5)))
+        self.assertEqual(parse_sensors("Delta-T Devices, ThetaProbe ML2X,<br>"), {"delta-t devices", "thetaprobe ml2x"})
+        self.assertEqual(parse_variables(None), frozenset())
+
+        fields = self.index.get_station_fields(1)
+        self.assertEqual(fields.network, "REMEDHUS")
+        self.assertEqual(fields.maximum, np.datetime64("2017-12-31T23:00:00"))
+        self.assertTrue(np.isnat(self.index.get_station_fields("3").maximum))
+        with self.assertRaises(ValueError):
+            self.index.get_station_fields(4)
+
+    def tests_query_stations(self):
+        self.assertEqual(self.get_ids(self.index.query_stations()), [1, 2, 3])
+        self.assertEqual(self.get_ids(self.index.query_stations(variable="soil_moisture")), [1, 3])
+        self.assertEqual(self.get_ids(self.index.query_stations(variable="soil moisture", depth=0.05)), [1, 3])
+        self.assertEqual(self.get_ids(self.index.query_stations(depth=(0.1, 0.3))), [1])
+        self.assertEqual(self.get_ids(self.index.query_stations(network=["scan", "REMEDHUS"], country="spain")),
+                         [1, 2])
+        self.assertEqual(self.get_ids(self.index.query_stations(sensor="ThetaProbe ML2X")), [1])
+        self.assertEqual(self.index.query_stations(variable="snow depth"), [])
+
+        # station without end date is not active in any period
+        self.assertEqual(self.get_ids(self.index.query_stations(active_between=("2016/01/01", "2016/12/31"))), [1])
+        self.assertEqual(self.get_ids(self.index.query_stations(active_between=("2015/06/30", None))), [1, 2])
+
+        with self.assertRaises(ValueError):
+            self.index.query_stations(active_between=("2016-99", "2017/01/01"))
+
+        with self.assertRaises(ValueError):
+            self.index.query_stations(depth="deep")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import time
+import unittest
+from sm_tools.rate_limit import TokenBucket
+
+
+class TestRateLimit(unittest.TestCase):
+
+    def tests_initialization(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+        with self.assertRaises(ValueError):
+            TokenBucket(1, capacity=0.5)
+
+        bucket = TokenBucket(2.5)
+        self.assertEqual(bucket.capacity, 3)
+
+    def tests_try_acquire(self):
+        bucket = TokenBucket(1, capacity=2)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+    def tests_acquire(self):
+        bucket = TokenBucket(20, capacity=1)
+        with self.assertRaises(ValueError):
+            bucket.acquire(2)
+
+        start_time = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+
+        # first token is available at once, other four need 1/20 second each
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.18)
+
+
+if __name__ == "__main__":
+    unittest.main()
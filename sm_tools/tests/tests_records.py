@@ -0,0 +1,130 @@
+import pickle
+import tempfile
+import unittest
+from sm_tools.catalog import CatalogLookupMixin, ISMNCatalog
+from sm_tools.records import Network, Station
+
+
+class TestRecords(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestRecords, self).__init__(*args, **kwargs)
+        self.station_object = {"comment": None, "depthText": "0.00 - 0.06 m <br>", "extMetadata": None,
+                               "lat": "-34.780428", "lng": "147.140801", "maximum": "2010/02/10 01:00:00",
+                               "minimum": "2010/02/08 00:00:00", "sensorText": "Delta-T Devices, ThetaProbe ML2X,<br>",
+                               "stationID": "2134", "station_abbr": "25", "station_name": "Station25",
+                               "variableText": "soil moisture<br>"}
+        self.network_object = {"Stations": [self.station_object, dict(self.station_object, stationID="2135",
+                                                                      lat="-34.78000", newField=1)],
+                               "networkID": "AACES", "network_country": "Australia"}
+
+    def tests_station_record(self):
+        station = Station(self.station_object)
+        self.assertEqual(station.station_id, 2134)
+        self.assertEqual(station.lat, -34.780428)
+        self.assertEqual(station["lat"], "-34.780428")
+        self.assertEqual(station.get("missing", 0), 0)
+        self.assertEqual(station.to_dict(), self.station_object)
+        with self.assertRaises(AttributeError):
+            station.new_attribute = 1
+
+    def tests_network_record(self):
+        network = Network(self.network_object)
+        self.assertEqual(network["networkID"], "AACES")
+        self.assertIs(network.stations[0].network, network)
+        # numbers which are not restored to the same text and unknown fields are kept as they are
+        self.assertEqual(network.stations[1]["lat"], "-34.78000")
+        self.assertEqual(network.stations[1]["newField"], 1)
+        self.assertEqual(network.to_dict(), self.network_object)
+        self.assertEqual(network.to_dict(with_stations=False)["Stations"], [])
+
+    def tests_catalog_view(self):
+        catalog = ISMNCatalog([self.network_object])
+        self.assertEqual(catalog.networks_objects, [self.network_object])
+        self.assertEqual(catalog.get_station_object_by_id(2134), self.station_object)
+        self.assertIsInstance(catalog.stations[0], Station)
+        # objects are built on every call, so changes do not affect catalog
+        catalog.get_station_object_by_id(2134)["station_name"] = "changed"
+        self.assertEqual(catalog.get_station_object_by_id(2134)["station_name"], "Station25")
+
+    def tests_lookup_mixin(self):
+        # parser without catalog property can not be created
+        with self.assertRaises(TypeError):
+            type("Parser", (CatalogLookupMixin,), {})()
+
+        catalog = ISMNCatalog([self.network_object])
+        parser = type("Parser", (CatalogLookupMixin,), {"catalog": catalog})()
+        self.assertEqual(parser.get_station_object_by_id(2134), self.station_object)
+
+    def tests_catalog_snapshot(self):
+        catalog = ISMNCatalog([self.network_object])
+        snapshot = catalog.to_snapshot()
+        self.assertIsInstance(snapshot, bytes)
+        self.assertEqual(ISMNCatalog.from_snapshot(snapshot).networks_objects, [self.network_object])
+        # buffer can be bigger than snapshot, e.g. shared memory block
+        self.assertEqual(ISMNCatalog.from_snapshot(memoryview(snapshot + b"\0" * 100)).networks_objects,
+                         [self.network_object])
+        self.assertEqual(pickle.loads(pickle.dumps(catalog)).networks_objects, [self.network_object])
+
+        snapshot_path = tempfile.mktemp()
+        catalog.save(snapshot_path)
+        self.assertEqual(ISMNCatalog.attach(snapshot_path).get_station_object_by_id(2134), self.station_object)
+        self.assertIs(ISMNCatalog.attach(catalog), catalog)
+
+        with self.assertRaises(ValueError):
+            ISMNCatalog.from_snapshot(b"wrong snapshot")
+
+        with self.assertRaises(ValueError):
+            ISMNCatalog.from_snapshot(snapshot[:len(snapshot) // 2])
+
+    def tests_catalog_update(self):
+        catalog = ISMNCatalog([self.network_object])
+        spatial_index = catalog.spatial_index
+        station = catalog.stations[0]
+
+        new_network_object = dict(self.network_object, network_country="Australia ",
+                                  Stations=[dict(self.station_object, maximum="2011/01/01 00:00:00"),
+                                            dict(self.station_object, stationID="2136", station_name="New")])
+        diff = catalog.update([new_network_object, {"Stations": [], "networkID": "NEW"}])
+        self.assertEqual(diff.added_stations, [2136])
+        self.assertEqual(diff.removed_stations, [2135])
+        self.assertEqual(diff.changed_stations, {2134: ("maximum",)})
+        self.assertEqual(diff.get_changed_stations("lat", "lng"), [])
+        self.assertEqual(diff.added_networks, ["NEW"])
+        self.assertEqual(diff.changed_networks, {"AACES": ("network_country",)})
+        self.assertFalse(diff.is_empty)
+
+        # records are changed in place and lookups use new catalog
+        self.assertIs(catalog.stations[0], station)
+        self.assertEqual(station.maximum, "2011/01/01 00:00:00")
+        self.assertEqual(catalog.get_station_id_by_name("New"), 2136)
+        with self.assertRaises(ValueError):
+            catalog.get_station_object_by_id(2135)
+        self.assertIsNot(catalog.spatial_index, spatial_index)
+        self.assertEqual(catalog.networks_objects, [new_network_object, {"Stations": [], "networkID": "NEW"}])
+
+        spatial_index = catalog.spatial_index
+        self.assertTrue(catalog.update(catalog.networks_objects).is_empty)
+        self.assertIs(catalog.spatial_index, spatial_index)
+
+    def tests_duplicate_station_names(self):
+        other_network_object = dict(self.network_object, networkID="OTHER",
+                                    Stations=[dict(self.station_object, stationID="3000")])
+        catalog = ISMNCatalog([self.network_object, other_network_object])
+
+        # first station in catalog order is used and warning is shown
+        with self.assertWarns(UserWarning):
+            self.assertEqual(catalog.get_station_id_by_name("Station25"), 2134)
+        self.assertEqual(catalog.get_station_id_by_name("Station25", "OTHER"), 3000)
+        with self.assertRaises(ValueError):
+            catalog.get_station_id_by_name("Station25", "NEW")
+
+        # station added before others by refresh is found first
+        new_network_object = dict(other_network_object, Stations=[dict(self.station_object, stationID="2000")])
+        catalog.update([new_network_object, self.network_object])
+        with self.assertWarns(UserWarning):
+            self.assertEqual(catalog.get_station_id_by_name("Station25"), 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from sm_tools.mock_server import MockISMNServer
+from sm_tools.parsers import ISMNDataParser
+from sm_tools.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestSingleFlight, self).__init__(*args, **kwargs)
+        self.threads_count = 8
+
+    def tests_coalescing(self):
+        single_flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def function():
+            calls.append(1)
+            started.set()
+            # waiting while other threads join the running call
+            time.sleep(0.2)
+            return [1, 2, 3]
+
+        def call(_):
+            return single_flight.do("key", function)
+
+        with ThreadPoolExecutor(self.threads_count) as executor:
+            first = executor.submit(call, 0)
+            started.wait()
+            others = list(executor.map(call, range(self.threads_count - 1)))
+            results = [first.result()] + others
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0][0] and shared for result, shared in results))
+        self.assertEqual(single_flight.info(), {"executions": 1, "coalesced": self.threads_count - 1,
+                                                "in_flight": 0})
+
+        # finished calls are not remembered
+        self.assertEqual(single_flight.do("key", function), ([1, 2, 3], False))
+        self.assertEqual(len(calls), 2)
+
+        single_flight.reset()
+        self.assertEqual(single_flight.info()["executions"], 0)
+
+    def tests_errors(self):
+        single_flight = SingleFlight()
+
+        def function():
+            raise ConnectionError("Can not connect to server!")
+
+        with self.assertRaises(ConnectionError):
+            single_flight.do("key", function)
+        self.assertEqual(single_flight.info()["in_flight"], 0)
+        self.assertEqual(single_flight.do("key", lambda: 1), (1, False))
+
+    def tests_parser_coalescing(self):
+        # latency keeps first request in flight while other threads ask for the same data
+        with MockISMNServer(networks=1, stations=1, latency=0.2) as server:
+            parser = server.create_parser()
+            handle = parser.get_sensor_handle("Station0_0", server.sensors_names[0])
+
+            with ThreadPoolExecutor(self.threads_count) as executor:
+                results = list(executor.map(lambda _: parser.get_observations(handle, "2017/01/01", "2017/01/31"),
+                                            range(self.threads_count)))
+
+            info = parser.coalescing_info
+            self.assertEqual(info["executions"] + info["coalesced"], self.threads_count + 1)
+            self.assertLess(server.requests_count["observations"], self.threads_count)
+        self.assertTrue(all(result == results[0] for result in results))
+        # every thread gets its own copy of observations
+        self.assertIsNot(results[0]["observations"], results[1]["observations"])
+
+        self.assertIsNone(ISMNDataParser(lazy=True, coalesce_requests=False).coalescing_info)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from sm_tools.spatial import StationSpatialIndex
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestSpatialIndex, self).__init__(*args, **kwargs)
+        self.stations = [{"stationID": "1", "lat": "41.0", "lng": "-5.0"},
+                         {"stationID": "2", "lat": "41.1", "lng": "-5.0"},
+                         {"stationID": "3", "lat": "42.0", "lng": "-5.0"},
+                         {"stationID": "4", "lat": "-10.0", "lng": "179.9"},
+                         {"stationID": "5", "lat": "-10.0", "lng": "-179.9"},
+                         {"stationID": "6", "lat": None, "lng": "1.0"}]
+        self.index = StationSpatialIndex(self.stations)
+
+    @staticmethod
+    def get_ids(stations):
+        return [station["stationID"] for station in stations]
+
+    def tests_initialization(self):
+        with self.assertRaises(ValueError):
+            StationSpatialIndex(self.stations, cell_size=0)
+
+        with self.assertRaises(ValueError):
+            StationSpatialIndex(self.stations, cell_size=7)
+
+        # station without coordinates is not indexed
+        self.assertEqual(len(self.index), 5)
+
+    def tests_find_stations_near(self):
+        with self.assertRaises(ValueError):
+            self.index.find_stations_near(91, 0, 10)
+
+        stations = self.index.find_stations_near(41.0, -5.0, 20)
+        self.assertEqual(self.get_ids([station for station, _ in stations]), ["1", "2"])
+        self.assertAlmostEqual(stations[1][1], 11.1, places=1)
+
+        # search circle crosses antimeridian
+        stations = self.index.find_stations_near(-10.0, 180.0, 50)
+        self.assertEqual(sorted(self.get_ids([station for station, _ in stations])), ["4", "5"])
+
+    def tests_find_nearest_stations(self):
+        stations = self.index.find_nearest_stations(41.9, -5.0, k=2)
+        self.assertEqual(self.get_ids([station for station, _ in stations]), ["3", "2"])
+        self.assertEqual(len(self.index.find_nearest_stations(0, 0, k=10)), 5)
+        self.assertEqual(self.index.find_nearest_stations(0, 0, max_distance_km=100), [])
+
+    def tests_find_stations_in_bbox(self):
+        with self.assertRaises(ValueError):
+            self.index.find_stations_in_bbox(42, -6, 41, -4)
+
+        self.assertEqual(self.get_ids(self.index.find_stations_in_bbox(40, -6, 41.5, -4)), ["1", "2"])
+        self.assertEqual(self.get_ids(self.index.find_stations_in_bbox(-11, 179, -9, -179)), ["4", "5"])
+
+    def tests_find_nearest_stations_batch(self):
+        indexes, distances = self.index.find_nearest_stations_batch([41.0, 42.0, 0.0], [-5.0, -5.0, 0.0],
+                                                                    k=2, max_distance_km=200)
+        self.assertEqual(indexes.shape, (3, 2))
+        self.assertEqual(self.get_ids([self.index.stations_objects[index] for index in indexes[0]]), ["1", "2"])
+        self.assertEqual(self.index.stations_objects[indexes[1][0]]["stationID"], "3")
+        self.assertTrue(np.all(indexes[2] == -1))
+        self.assertTrue(np.all(np.isnan(distances[2])))
+
+
+if __name__ == '__main__':
+    unittest.main()
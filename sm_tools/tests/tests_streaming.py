@@ -0,0 +1,52 @@
+import json
+import unittest
+import numpy as np
+from sm_tools.streaming import GrowableArray, ObservationsStreamDecoder
+
+
+class TestStreaming(unittest.TestCase):
+    DEFAULT_DATES = ["2016/01/01 00:00:00", "2016/01/01 01:00:00", "2016/01/01 02:00:00"]
+    DEFAULT_VALUES = ["10.5", "11", None]
+
+    def _decode(self, content, chunk_size, **kwargs):
+        decoder = ObservationsStreamDecoder(**kwargs)
+        for position in range(0, len(content), chunk_size):
+            decoder.feed(content[position:position + chunk_size])
+        return decoder.close()
+
+    def tests_growable_array(self):
+        array = GrowableArray(np.int64, capacity=1)
+        for _ in range(10):
+            array.extend(np.arange(3))
+        self.assertEqual(len(array), 30)
+
+        result = array.to_array()
+        self.assertEqual(len(result), 30)
+        self.assertEqual(result[-1], 2)
+
+    def tests_decode(self):
+        content = json.dumps([self.DEFAULT_DATES, self.DEFAULT_VALUES]).encode("utf-8")
+        # every chunk size must give the same result, even one byte chunks
+        for chunk_size in (1, 5, len(content)):
+            data = self._decode(content, chunk_size, batch_size=2)
+            self.assertEqual(data["dates"].dtype, np.dtype("datetime64[s]"))
+            self.assertEqual(data["dates"][1], np.datetime64("2016-01-01T01:00:00"))
+            self.assertEqual(len(data["observations"]), 3)
+            self.assertAlmostEqual(data["observations"][0], 0.105)
+            self.assertTrue(np.isnan(data["observations"][2]))
+
+        data = self._decode(content, 4, normalize=False, dtype=np.float32)
+        self.assertEqual(data["observations"].dtype, np.float32)
+        self.assertAlmostEqual(float(data["observations"][1]), 11)
+
+        data = self._decode(b"[[], []]", 3)
+        self.assertEqual(len(data["dates"]), 0)
+
+    def tests_wrong_format(self):
+        for content in (b"", b'{"error": "wrong station"}', b"[[1], [2], [3]]", b'[["2016/01/01"], [1, 2]]'):
+            with self.assertRaises(ValueError):
+                self._decode(content, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import tempfile
+import unittest
+import datetime
+import numpy as np
+from sm_tools.mock_server import MockISMNServer
+from sm_tools.parsers import SensorHandle
+from sm_tools.tile_store import ObservationTileStore
+
+
+class TestTileStore(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestTileStore, self).__init__(*args, **kwargs)
+        self.handle = SensorHandle(1, 2, 3, 4, "sensor", "type", "0.05")
+        self.requests = []
+
+    def fetch(self, start_date, end_date):
+        # hourly fake observations for requested period
+        self.requests.append((start_date, end_date))
+        start = np.datetime64(start_date.replace("/", "-"), "s")
+        end = np.datetime64(end_date.replace("/", "-"), "s") + np.timedelta64(1, "D")
+        dates = np.arange(start, end, np.timedelta64(1, "h"))
+        return {"dates": dates, "observations": np.arange(len(dates), dtype=np.float64)}
+
+    def tests_initialization(self):
+        with self.assertRaises(ValueError):
+            ObservationTileStore(tempfile.mkdtemp(), tile="day")
+
+    def tests_get_tiles(self):
+        store = ObservationTileStore(tempfile.mkdtemp())
+        tiles = store.get_tiles(datetime.date(2017, 11, 15), datetime.date(2018, 1, 2))
+        self.assertEqual([tile_start for tile_start, _ in tiles],
+                         [datetime.date(2017, 11, 1), datetime.date(2017, 12, 1), datetime.date(2018, 1, 1)])
+        self.assertEqual(tiles[1][1], datetime.date(2017, 12, 31))
+
+        store = ObservationTileStore(tempfile.mkdtemp(), tile="year")
+        tiles = store.get_tiles(datetime.date(2017, 11, 15), datetime.date(2018, 1, 2))
+        self.assertEqual(tiles, [(datetime.date(2017, 1, 1), datetime.date(2017, 12, 31)),
+                                 (datetime.date(2018, 1, 1), datetime.date(2018, 12, 31))])
+
+    def tests_incremental_fetch(self):
+        store = ObservationTileStore(tempfile.mkdtemp())
+        data = store.get_observations(self.handle, "2017/01/10", "2017/02/20", self.fetch)
+        self.assertEqual(self.requests, [("2017/01/01", "2017/02/28")])
+        self.assertEqual(data["dates"][0], np.datetime64("2017-01-10T00:00:00"))
+        self.assertEqual(data["dates"][-1], np.datetime64("2017-02-20T23:00:00"))
+
+        # only months which are not stored yet are requested
+        data = store.get_observations(self.handle, "2017/02/01", "2017/04/30", self.fetch)
+        self.assertEqual(self.requests[1:], [("2017/03/01", "2017/04/30")])
+        self.assertEqual(len(data["dates"]), (28 + 31 + 30) * 24)
+
+        store.get_observations(self.handle, "2017/01/01", "2017/04/30", self.fetch)
+        self.assertEqual(len(self.requests), 2)
+
+        store.clear(self.handle)
+        store.get_observations(self.handle, "2017/01/01", "2017/01/31", self.fetch)
+        self.assertEqual(len(self.requests), 3)
+
+    def tests_current_tile_is_fetched_again(self):
+        store = ObservationTileStore(tempfile.mkdtemp())
+        today = datetime.datetime.now(datetime.timezone.utc).date().strftime("%Y/%m/%d")
+        store.get_observations(self.handle, today, today, self.fetch)
+        store.get_observations(self.handle, today, today, self.fetch)
+        self.assertEqual(len(self.requests), 2)
+
+    def tests_partly_published_tile_is_fetched_again(self):
+        store = ObservationTileStore(tempfile.mkdtemp())
+
+        # server has data only till middle of past month, so tile is not complete
+        def published_fetch(start_date, end_date):
+            return self.fetch(start_date, min(end_date, "2017/01/15"))
+
+        store.get_observations(self.handle, "2017/01/01", "2017/01/31", published_fetch)
+        self.assertFalse(store.load_tile(self.handle, datetime.date(2017, 1, 1))["complete"])
+        data = store.get_observations(self.handle, "2017/01/01", "2017/01/31", self.fetch)
+        self.assertEqual(self.requests[-1], ("2017/01/15", "2017/01/31"))
+        self.assertEqual(len(data["dates"]), 31 * 24)
+        self.assertTrue(store.load_tile(self.handle, datetime.date(2017, 1, 1))["complete"])
+
+        # tile is complete when catalog says that server data reaches its end
+        store.get_observations(self.handle, "2017/02/01", "2017/02/28", published_fetch,
+                               data_end="2017/03/10 00:00:00")
+        self.assertTrue(store.load_tile(self.handle, datetime.date(2017, 2, 1))["complete"])
+
+    def tests_tiles_after_data_end_are_complete(self):
+        store = ObservationTileStore(tempfile.mkdtemp())
+
+        # station was stopped in the middle of January, so it has no data after that
+        def stopped_fetch(start_date, end_date):
+            return self.fetch(start_date, min(end_date, "2017/01/15"))
+
+        for _ in range(2):
+            data = store.get_observations(self.handle, "2017/01/01", "2017/03/31", stopped_fetch,
+                                          data_end="2017/01/15 23:00:00")
+            self.assertEqual(len(data["dates"]), 15 * 24)
+        # second call reads all tiles from disk
+        self.assertEqual(len(self.requests), 1)
+
+        # last server date is got only if tiles are downloaded
+        data_end_calls = []
+
+        def get_data_end():
+            data_end_calls.append(1)
+            return "2017/01/15 23:00:00"
+
+        store.get_observations(self.handle, "2017/01/01", "2017/03/31", stopped_fetch, data_end=get_data_end)
+        self.assertEqual(data_end_calls, [])
+        store.get_observations(self.handle, "2017/04/01", "2017/04/30", stopped_fetch, data_end=get_data_end)
+        store.get_observations(self.handle, "2017/04/01", "2017/04/30", stopped_fetch, data_end=get_data_end)
+        self.assertEqual(data_end_calls, [1])
+        self.assertEqual(len(self.requests), 2)
+
+    def tests_parser_tiles_after_catalog_maximum(self):
+        with MockISMNServer(networks=1, stations=1) as server:
+            # server has observations only till the middle of december for any request
+            payload = server._build_observations_payload({"station_id": str(server.first_station_id),
+                                                          "start": "2017/12/01", "end": "2017/12/15"})
+        with MockISMNServer(networks=1, stations=1, payloads={"observations": payload}) as server:
+            parser = server.create_parser(lazy=True, observations_store_dir=tempfile.mkdtemp())
+            handle = parser.get_sensor_handle_by_id(server.first_station_id, server.sensors_names[0])
+            server.reset_requests_count()
+
+            # catalog 'maximum' is 2017/12/31, so 2018 tiles are complete without observations
+            for _ in range(2):
+                parser.get_observations(handle, "2017/12/01", "2018/02/28")
+            self.assertEqual(server.requests_count["observations"], 1)
+
+    def tests_incomplete_tile_tail_fetch(self):
+        store = ObservationTileStore(tempfile.mkdtemp())
+        self.assertIsNone(store.get_last_date(self.handle))
+
+        data = self.fetch("2017/01/01", "2017/01/10")
+        store.save_tile(self.handle, datetime.date(2017, 1, 1), data["dates"], data["observations"], False)
+        self.assertEqual(store.get_last_date(self.handle), np.datetime64("2017-01-10T23:00:00"))
+
+        # only last stored day and days after it are requested for incomplete tile
+        data = store.get_observations(self.handle, "2017/01/01", "2017/01/31", self.fetch)
+        self.assertEqual(self.requests[-1], ("2017/01/10", "2017/01/31"))
+        self.assertEqual(len(data["dates"]), 31 * 24)
+        self.assertEqual(len(np.unique(data["dates"])), 31 * 24)
+        self.assertEqual(store.get_last_date(self.handle), np.datetime64("2017-01-31T23:00:00"))
+
+    def tests_sync_arguments(self):
+        with MockISMNServer(networks=1, stations=1) as server:
+            # wrong arguments are reported on call, before results are iterated and without requests
+            with self.assertRaises(ValueError):
+                server.create_parser(lazy=True).sync_observations([])
+            parser = server.create_parser(lazy=True, observations_store_dir=tempfile.mkdtemp())
+            with self.assertRaises(ValueError):
+                parser.sync_observations([None])
+            with self.assertRaises(ValueError):
+                parser.sync_observations([self.handle], max_workers=0)
+            self.assertEqual(server.requests_count["networks"], 0)
+
+    def tests_sync_data_grows_inside_stored_tile(self):
+        store_dir = tempfile.mkdtemp()
+        with MockISMNServer(networks=1, stations=1) as server:
+            parser = server.create_parser(observations_store_dir=store_dir)
+            handle = parser.get_sensor_handle_by_id(server.first_station_id, server.sensors_names[0])
+
+            # december tile was saved as complete when server data ended on 15th
+            data = self.fetch("2017/12/01", "2017/12/15")
+            parser.observation_store.save_tile(handle, datetime.date(2017, 12, 1), data["dates"],
+                                               data["observations"], True)
+
+            # catalog 'maximum' is 2017/12/31, so the rest of december is downloaded
+            result = list(parser.sync_observations([handle]))[0]
+            self.assertIsNone(result.error)
+            self.assertEqual(result.new_observations, 16 * 24)
+            self.assertEqual(result.last_date, np.datetime64("2017-12-31T23:00:00"))
+            tile = parser.observation_store.load_tile(handle, datetime.date(2017, 12, 1))
+            self.assertEqual(len(tile["dates"]), 31 * 24)
+            self.assertTrue(tile["complete"])
+
+            self.assertEqual(list(parser.sync_observations([handle]))[0].new_observations, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
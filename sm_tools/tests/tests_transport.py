@@ -0,0 +1,117 @@
+import email.utils
+import pickle
+import socket
+import time
+import unittest
+import requests
+from sm_tools.mock_server import MockISMNServer
+from sm_tools.parsers import ISMNDataParser
+from sm_tools.transport import HTTPTransport, RetryPolicy, Transport
+
+
+class TestTransport(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestTransport, self).__init__(*args, **kwargs)
+        self.retry_policy = RetryPolicy(retries=2, backoff_factor=1, max_backoff=3)
+
+    @staticmethod
+    def get_response(headers):
+        response = requests.Response()
+        response.status_code = 503
+        response.headers.update(headers)
+        return response
+
+    def tests_retry_policy(self):
+        with self.assertRaises(ValueError):
+            RetryPolicy(retries=-1)
+
+        # full jitter backoff grows exponentially up to maximum
+        for attempt, max_backoff in ((1, 1), (2, 2), (3, 3), (10, 3)):
+            for _ in range(20):
+                self.assertTrue(0 <= self.retry_policy.get_backoff(attempt) <= max_backoff)
+
+        self.assertIn(503, self.retry_policy.retry_statuses)
+        self.assertNotIn(404, self.retry_policy.retry_statuses)
+
+    def tests_retry_after(self):
+        self.assertIsNone(RetryPolicy.get_retry_after(self.get_response({})))
+        self.assertEqual(RetryPolicy.get_retry_after(self.get_response({"Retry-After": "7"})), 7)
+        self.assertIsNone(RetryPolicy.get_retry_after(self.get_response({"Retry-After": "soon"})))
+
+        retry_date = email.utils.formatdate(time.time() + 60, usegmt=True)
+        retry_after = RetryPolicy.get_retry_after(self.get_response({"Retry-After": retry_date}))
+        self.assertTrue(55 <= retry_after <= 60)
+
+    def tests_transport_settings(self):
+        transport = HTTPTransport(pool_size=4, connect_timeout=2, read_timeout=30, retry_policy=self.retry_policy)
+        self.assertEqual(transport.timeout, (2, 30))
+        transport.resize_pool(2)
+        self.assertEqual(transport.pool_size, 4)
+        transport.resize_pool(8)
+        self.assertEqual(transport.pool_size, 8)
+
+        transport = pickle.loads(pickle.dumps(transport))
+        self.assertEqual(transport.timeout, (2, 30))
+        self.assertEqual(transport.retry_policy.retries, 2)
+        self.assertEqual(transport.info()["requests"], 0)
+
+        parser = ISMNDataParser(lazy=True, transport=transport)
+        parser.request_timeout = 60
+        self.assertEqual(transport.timeout, (2, 60))
+        self.assertIs(parser.transport, transport)
+        parser.resize_connection_pool(16)
+        self.assertEqual(transport.pool_size, 16)
+
+    @staticmethod
+    def get_closed_port_url():
+        # port is free after socket is closed, so connections to it are refused
+        with socket.socket() as free_socket:
+            free_socket.bind(("127.0.0.1", 0))
+            port = free_socket.getsockname()[1]
+        return f"http://127.0.0.1:{port}/"
+
+    def tests_transport_base(self):
+        # transport without get() can not be created
+        with self.assertRaises(TypeError):
+            Transport()
+
+        class EmptyTransport(Transport):
+            def get(self, url, headers=None, stream=False, on_attempt=None):
+                return None
+
+        transport = EmptyTransport(read_timeout=10)
+        self.assertEqual(transport.timeout, (5, 10))
+        self.assertEqual(transport.info(), {})
+
+    def tests_on_attempt(self):
+        attempts = []
+        transport = HTTPTransport(retry_policy=RetryPolicy(retries=2, backoff_factor=0), connect_timeout=1)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            transport.get(self.get_closed_port_url(), on_attempt=lambda: attempts.append(1))
+        # hook is called for first attempt and for every retry
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(transport.info()["attempts"], 3)
+
+    def tests_parser_rate_limit_retries(self):
+        transport = HTTPTransport(retry_policy=RetryPolicy(retries=3, backoff_factor=0), connect_timeout=1)
+        with MockISMNServer(networks=1, stations=1) as server:
+            parser = server.create_parser(transport=transport)
+            parser.SENSOR_URL = self.get_closed_port_url()
+
+            # 4 attempts of one request take tokens of 2 requests per second limit
+            start_time = time.monotonic()
+            results = list(parser.fetch_many([("Station0_0", server.sensors_names[0])], rate_limit=2))
+            self.assertIsNotNone(results[0].error)
+            self.assertGreaterEqual(time.monotonic() - start_time, 0.9)
+            self.assertEqual(transport.info()["attempts"], 5)
+
+    def tests_parser_requests_info(self):
+        with MockISMNServer(networks=1, stations=1) as server:
+            info = server.create_parser().transport_info
+        self.assertEqual(info["requests"], 1)
+        self.assertEqual(info["attempts"], info["requests"] + info["retries"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,274 @@
+import datetime
+import os
+import tempfile
+import numpy as np
+from sm_tools.query import parse_catalog_date
+
+
+class ObservationTileStore:
+    """
+    Class for storing downloaded observations on disk split to time tiles (months or years)
+
+    Every sensor has own directory named by station, sensor, variable and depth IDs, every tile is .npz file
+    with dates (datetime64[s]) and not normalized values. Tile is complete and is never downloaded again only
+    if its period is in the past and server will not add data to it - observations of its last day were received
+    or station catalog 'maximum' date is known (station data ends inside or before tile, or reaches its end).
+    Other tiles are downloaded again from their last stored day, because ISMN publishes data with delay.
+    """
+
+    TILES = ("month", "year")
+
+    def __init__(self, store_dir, tile="month"):
+        """
+        :param store_dir: string - directory to store tiles in
+        :param tile: string - (optional) tile period - "month" or "year" (default = "month")
+        """
+        if tile not in self.TILES:
+            raise ValueError(f"Tile must be one of {self.TILES}!")
+
+        self.store_dir = str(store_dir)
+        self.tile = tile
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    @staticmethod
+    def _get_sensor_key(handle):
+        """
+        Method to get sensor directory name
+        :param handle: SensorHandle - resolved sensor identifiers
+        :return: string - directory name
+        """
+        return f"{handle.station_id}_{handle.sensor_id}_{handle.variable_id}_{handle.depth_id}"
+
+    def _get_tile_path(self, handle, tile_start):
+        """
+        Method to get tile file path
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param tile_start: datetime.date - first day of tile
+        :return: string - path to tile file
+        """
+        tile_name = f"{tile_start.year:04d}" if self.tile == "year" else f"{tile_start.year:04d}-{tile_start.month:02d}"
+        return os.path.join(self.store_dir, self._get_sensor_key(handle), tile_name + ".npz")
+
+    def _get_tile_start(self, date):
+        """
+        Method to get first day of tile which contains date
+        :param date: datetime.date - date inside tile
+        :return: datetime.date - first day of tile
+        """
+        return date.replace(month=1, day=1) if self.tile == "year" else date.replace(day=1)
+
+    def _get_next_tile_start(self, tile_start):
+        """
+        Method to get first day of next tile
+        :param tile_start: datetime.date - first day of tile
+        :return: datetime.date - first day of next tile
+        """
+        if self.tile == "year":
+            return tile_start.replace(year=tile_start.year + 1)
+        return tile_start.replace(year=tile_start.year + tile_start.month // 12, month=tile_start.month % 12 + 1)
+
+    def get_tiles(self, start_date, end_date):
+        """
+        Method to get list of tiles covering period
+        :param start_date: datetime.date - first day of period
+        :param end_date: datetime.date - last day of period
+        :return: list of tuples - (tile first day, tile last day)
+        """
+        tiles = []
+        tile_start = self._get_tile_start(start_date)
+        while tile_start <= end_date:
+            next_tile_start = self._get_next_tile_start(tile_start)
+            tiles.append((tile_start, next_tile_start - datetime.timedelta(days=1)))
+            tile_start = next_tile_start
+        return tiles
+
+    def load_tile(self, handle, tile_start):
+        """
+        Method to read tile from disk
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param tile_start: datetime.date - first day of tile
+        :return: dict - {"dates": datetime64[s] array, "observations": float array, "complete": bool} or None
+        """
+        return self._load_tile_file(self._get_tile_path(handle, tile_start))
+
+    @staticmethod
+    def _load_tile_file(tile_path):
+        """
+        Method to read tile file
+        :param tile_path: string - path to tile file
+        :return: dict - {"dates": datetime64[s] array, "observations": float array, "complete": bool} or None
+        """
+        try:
+            with np.load(tile_path) as tile:
+                return {"dates": tile["dates"].astype("datetime64[s]"),
+                        "observations": tile["observations"],
+                        "complete": bool(tile["complete"])}
+        except (OSError, KeyError, ValueError):
+            # missing or broken tile is downloaded again
+            return None
+
+    def get_last_date(self, handle):
+        """
+        Method to get date of last stored observation for sensor
+        :param handle: SensorHandle - resolved sensor identifiers
+        :return: numpy.datetime64 - last stored observation date or None if there is no stored observations
+        """
+        sensor_dir = os.path.join(self.store_dir, self._get_sensor_key(handle))
+        if not os.path.isdir(sensor_dir):
+            return None
+
+        # tile names are YYYY or YYYY-MM, so name order is time order
+        tiles_names = sorted((file_name for file_name in os.listdir(sensor_dir) if file_name.endswith(".npz")),
+                             reverse=True)
+        for tile_name in tiles_names:
+            tile = self._load_tile_file(os.path.join(sensor_dir, tile_name))
+            if tile is not None and len(tile["dates"]):
+                return tile["dates"].max()
+        return None
+
+    def save_tile(self, handle, tile_start, dates, observations, complete):
+        """
+        Method to write tile to disk, old tile is replaced atomically
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param tile_start: datetime.date - first day of tile
+        :param dates: numpy.ndarray - datetime64[s] observation dates
+        :param observations: numpy.ndarray - not normalized observation values
+        :param complete: bool - True if tile period is in the past and server data reaches tile end
+        """
+        tile_path = self._get_tile_path(handle, tile_start)
+        os.makedirs(os.path.dirname(tile_path), exist_ok=True)
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(tile_path), suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as temp_file:
+                np.savez(temp_file, dates=dates.astype("datetime64[s]").view(np.int64),
+                         observations=observations.astype(np.float64), complete=complete)
+            os.replace(temp_path, tile_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _is_tile_complete(tile_end, tile_dates, data_end, today):
+        """
+        Method to check if tile will not get new observations
+        :param tile_end: datetime.date - last day of tile
+        :param tile_dates: numpy.ndarray - datetime64[s] stored dates of tile
+        :param data_end: numpy.datetime64 - last date of observations on server or None if it is unknown
+        :param today: datetime.date - current UTC date
+        :return: bool - True if tile period is in the past and server will not add data to it
+        """
+        if tile_end >= today:
+            return False
+
+        # if catalog knows where server data ends - past tile either has all data or will not get more
+        # (e.g. station was stopped), otherwise data of tile last day must be received
+        if data_end is not None:
+            return True
+        return bool(len(tile_dates)) and tile_dates.max().astype("datetime64[D]") >= np.datetime64(tile_end, "D")
+
+    def get_observations(self, handle, start_date, end_date, fetch, data_end=None, refresh_from=None):
+        """
+        Method to get observations for period - stored complete tiles are read from disk, other tiles are
+        downloaded with fetch function (consecutive missing tiles with one call) and saved
+        :param handle: SensorHandle - resolved sensor identifiers
+        :param start_date: string - date format YYYY/MM/DD
+        :param end_date: string - date format YYYY/MM/DD
+        :param fetch: function - fetch(start_date, end_date) which returns not normalized observations
+        as {"dates": datetime64[s] array, "observations": float array} for YYYY/MM/DD dates
+        :param data_end: numpy.datetime64, string or function - (optional) last date of observations on server,
+        e.g. station catalog 'maximum', or function without arguments which returns it and is called only if tiles
+        are downloaded, tiles are complete only when received data reaches their end if None (default = None)
+        :param refresh_from: numpy.datetime64 or string - (optional) tiles ending on this date or later are
+        downloaded again from their last stored day even if they are complete (default = None)
+        :return: dict - {"dates": datetime64[s] array, "observations": not normalized float64 array}
+        """
+        start_date_object = datetime.datetime.strptime(start_date, "%Y/%m/%d").date()
+        end_date_object = datetime.datetime.strptime(end_date, "%Y/%m/%d").date()
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+
+        def get_data_end():
+            value = data_end() if callable(data_end) else data_end
+            return parse_catalog_date(value) if value is not None else None
+        refresh_from = parse_catalog_date(refresh_from).astype("datetime64[D]").item() \
+            if refresh_from is not None else None
+
+        tiles = self.get_tiles(start_date_object, end_date_object)
+        tiles_data = {tile_start: self.load_tile(handle, tile_start) for tile_start, _ in tiles}
+        missing_tiles = [(tile_start, tile_end) for tile_start, tile_end in tiles
+                         if tiles_data[tile_start] is None or not tiles_data[tile_start]["complete"] or
+                         (refresh_from is not None and tile_end >= refresh_from)]
+
+        # last server date is got once and only if something is downloaded
+        server_data_end = get_data_end() if missing_tiles else None
+
+        # consecutive missing tiles are downloaded as one period
+        for period in self._group_consecutive_tiles(missing_tiles):
+            fetch_start = period[0][0]
+            first_tile = tiles_data[fetch_start]
+            if first_tile is not None and len(first_tile["dates"]):
+                # stored part of incomplete tile is kept, so only data since its last day is downloaded
+                fetch_start = max(fetch_start, first_tile["dates"].max().astype("datetime64[D]").item())
+
+            data = fetch(fetch_start.strftime("%Y/%m/%d"), period[-1][1].strftime("%Y/%m/%d"))
+            dates = data["dates"].astype("datetime64[s]")
+            for tile_start, tile_end in period:
+                tile_mask = (dates >= np.datetime64(max(tile_start, fetch_start), "s")) & \
+                            (dates < np.datetime64(tile_end + datetime.timedelta(days=1), "s"))
+                tile_dates = dates[tile_mask]
+                tile_observations = data["observations"][tile_mask].astype(np.float64)
+
+                stored_tile = tiles_data[tile_start]
+                if stored_tile is not None:
+                    # new data is appended to stored observations before downloaded period
+                    stored_mask = stored_tile["dates"] < np.datetime64(fetch_start, "s")
+                    tile_dates = np.concatenate([stored_tile["dates"][stored_mask], tile_dates])
+                    tile_observations = np.concatenate([stored_tile["observations"][stored_mask],
+                                                        tile_observations])
+
+                tile = {"dates": tile_dates, "observations": tile_observations,
+                        "complete": self._is_tile_complete(tile_end, tile_dates, server_data_end, today)}
+                self.save_tile(handle, tile_start, tile["dates"], tile["observations"], tile["complete"])
+                tiles_data[tile_start] = tile
+
+        dates = np.concatenate([tiles_data[tile_start]["dates"] for tile_start, _ in tiles])
+        observations = np.concatenate([tiles_data[tile_start]["observations"] for tile_start, _ in tiles])
+        # tiles can be bigger than requested period, so points outside of it are removed
+        period_mask = (dates >= np.datetime64(start_date_object, "s")) & \
+                      (dates < np.datetime64(end_date_object + datetime.timedelta(days=1), "s"))
+        return {"dates": dates[period_mask], "observations": observations[period_mask].astype(np.float64)}
+
+    @staticmethod
+    def _group_consecutive_tiles(tiles):
+        """
+        Method to group tiles which follow each other without gaps
+        :param tiles: list of tuples - (tile first day, tile last day) in time order
+        :return: list of lists - groups of consecutive tiles
+        """
+        groups = []
+        for tile in tiles:
+            if groups and groups[-1][-1][1] + datetime.timedelta(days=1) == tile[0]:
+                groups[-1].append(tile)
+            else:
+                groups.append([tile])
+        return groups
+
+    def clear(self, handle=None):
+        """
+        Method to remove stored tiles
+        :param handle: SensorHandle - (optional) remove only tiles of this sensor, all tiles if None (default = None)
+        """
+        sensor_keys = [self._get_sensor_key(handle)] if handle is not None else os.listdir(self.store_dir)
+        for sensor_key in sensor_keys:
+            sensor_dir = os.path.join(self.store_dir, sensor_key)
+            if not os.path.isdir(sensor_dir):
+                continue
+
+            for file_name in os.listdir(sensor_dir):
+                if file_name.endswith(".npz"):
+                    os.remove(os.path.join(sensor_dir, file_name))
+            try:
+                os.rmdir(sensor_dir)
+            except OSError:
+                pass
@@ -0,0 +1,296 @@
+import abc
+import email.utils
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RetryPolicy:
+    """
+    Rules for retrying failed requests
+
+    Requests are retried on timeouts, connection errors and retry statuses (5xx and 429 by default)
+    with full jitter exponential backoff - random wait between 0 and backoff_factor * 2 ** attempt seconds,
+    but not more than max_backoff. If server sends Retry-After header, its value is waited instead.
+    """
+
+    # server errors and "too many requests"
+    RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+    def __init__(self, retries=3, backoff_factor=0.5, max_backoff=30, retry_statuses=None, max_retry_after=120):
+        """
+        :param retries: int - (optional) number of retries after first attempt, 0 disables retries (default = 3)
+        :param backoff_factor: int or float - (optional) first retry maximum wait in seconds (default = 0.5)
+        :param max_backoff: int or float - (optional) maximum wait between attempts in seconds (default = 30)
+        :param retry_statuses: iterable of ints - (optional) response statuses to retry,
+        RETRY_STATUSES used if None (default = None)
+        :param max_retry_after: int or float - (optional) maximum Retry-After wait in seconds, longer waits
+        are not done and response is returned (default = 120)
+        """
+        if retries is None or int(retries) < 0:
+            raise ValueError("Number of retries must be positive integer or 0!")
+
+        if backoff_factor < 0 or max_backoff < 0 or max_retry_after < 0:
+            raise ValueError("Backoff times must be positive numbers or 0!")
+
+        self.retries = int(retries)
+        self.backoff_factor = float(backoff_factor)
+        self.max_backoff = float(max_backoff)
+        self.retry_statuses = frozenset(retry_statuses) if retry_statuses is not None else self.RETRY_STATUSES
+        self.max_retry_after = float(max_retry_after)
+
+    def get_backoff(self, attempt):
+        """
+        Method to get random wait before retry
+        :param attempt: int - number of failed attempts before this retry, starting from 1
+        :return: float - wait in seconds
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def get_retry_after(response):
+        """
+        Method to get wait requested by server in Retry-After header
+        :param response: requests.Response - server response
+        :return: float - wait in seconds or None if there is no header or it is broken
+        """
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+
+        # header is number of seconds or HTTP date
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+
+        try:
+            retry_date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_date is None:
+            return None
+        return max(0.0, retry_date.timestamp() - time.time())
+
+
+class Transport(abc.ABC):
+    """
+    Base class of HTTP transport used by ISMNDataParser
+
+    Transport must implement get() which returns requests.Response like object - with status_code, headers,
+    content, iter_content() and close(), and which can be used in with statement.
+    """
+
+    def __init__(self, connect_timeout=5, read_timeout=20):
+        """
+        :param connect_timeout: int or float - (optional) timeout of connecting to server in seconds (default = 5)
+        :param read_timeout: int or float - (optional) timeout of waiting for response data in seconds (default = 20)
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    @property
+    def timeout(self):
+        """
+        Method to get requests timeout
+        :return: tuple - (connect timeout, read timeout) in seconds
+        """
+        return self.connect_timeout, self.read_timeout
+
+    @abc.abstractmethod
+    def get(self, url, headers=None, stream=False, on_attempt=None):
+        """
+        Method to make GET request
+        :param url: string - request url
+        :param headers: dict - (optional) request headers (default = None)
+        :param stream: bool - (optional) if True response body is not read until it is iterated (default = False)
+        :param on_attempt: callable - (optional) function without arguments called before every attempt
+        including retries, e.g. rate limiter acquire (default = None)
+        :return: requests.Response - server response
+        """
+
+    def resize_pool(self, pool_size):
+        """
+        Method to make connection pool at least pool_size connections big
+        :param pool_size: int - minimum number of connections in pool
+        """
+
+    def info(self):
+        """
+        Method to get requests statistics
+        :return: dict - statistics
+        """
+        return dict()
+
+    def close(self):
+        """
+        Method to close all connections
+        """
+
+
+class HTTPTransport(Transport):
+    """
+    Thread safe HTTP transport with kept alive connections pool, compressed responses and retries
+
+    Usage example:
+        transport = HTTPTransport(pool_size=16, connect_timeout=3, read_timeout=60,
+                                  retry_policy=RetryPolicy(retries=5, backoff_factor=1))
+        parser = ISMNDataParser(transport=transport)
+        print(parser.transport_info["retries"])
+    """
+
+    def __init__(self, pool_size=10, connect_timeout=5, read_timeout=20, retry_policy=None,
+                 compress=True, keep_alive=True):
+        """
+        :param pool_size: int - (optional) number of kept alive connections to server (default = 10)
+        :param connect_timeout: int or float - (optional) timeout of connecting to server in seconds (default = 5)
+        :param read_timeout: int or float - (optional) timeout of waiting for response data in seconds (default = 20)
+        :param retry_policy: RetryPolicy - (optional) retries rules, RetryPolicy() used if None,
+        RetryPolicy(retries=0) disables retries (default = None)
+        :param compress: bool - (optional) ask server for gzip compressed responses (default = True)
+        :param keep_alive: bool - (optional) keep connections open between requests (default = True)
+        """
+        super(HTTPTransport, self).__init__(connect_timeout, read_timeout)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.compress = compress
+        self.keep_alive = keep_alive
+
+        self.__session = requests.session()
+        self.__pool_size = 0
+        self.__pool_lock = threading.Lock()
+        self.resize_pool(pool_size)
+
+        self.__stats_lock = threading.Lock()
+        self.reset()
+
+    def __getstate__(self):
+        # session, lock and statistics are created again after unpickling
+        return {"pool_size": self.__pool_size, "connect_timeout": self.connect_timeout,
+                "read_timeout": self.read_timeout, "retry_policy": self.retry_policy,
+                "compress": self.compress, "keep_alive": self.keep_alive}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def pool_size(self):
+        """
+        Method to get connection pool size
+        :return: int - number of kept alive connections
+        """
+        return self.__pool_size
+
+    def resize_pool(self, pool_size):
+        """
+        Method to make connection pool at least pool_size connections big
+        :param pool_size: int - minimum number of connections in pool
+        """
+        with self.__pool_lock:
+            if pool_size <= self.__pool_size:
+                return
+
+            # new adapters replace old ones, requests already running on old adapters are not affected
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.__session.mount("https://", adapter)
+            self.__session.mount("http://", adapter)
+            self.__pool_size = pool_size
+
+    def _count(self, **counters):
+        """
+        Method to add values to statistics counters
+        :param counters: ints or floats - counter name -> value to add
+        """
+        with self.__stats_lock:
+            for name, value in counters.items():
+                self.__stats[name] += value
+
+    def _count_retry(self, reason, wait_time):
+        """
+        Method to count one retry
+        :param reason: int or string - response status or error class name
+        :param wait_time: float - wait before retry in seconds
+        """
+        with self.__stats_lock:
+            self.__stats["retries"] += 1
+            self.__stats["retry_wait"] += wait_time
+            self.__retry_reasons[reason] = self.__retry_reasons.get(reason, 0) + 1
+
+    def get(self, url, headers=None, stream=False, on_attempt=None):
+        """
+        Method to make GET request, failed requests are retried by retry policy
+        If all attempts failed, last response with error status is returned or last error is raised.
+        :param url: string - request url
+        :param headers: dict - (optional) request headers (default = None)
+        :param stream: bool - (optional) if True response body is not read until it is iterated (default = False)
+        :param on_attempt: callable - (optional) function without arguments called before every attempt
+        including retries, e.g. rate limiter acquire (default = None)
+        :return: requests.Response - server response
+        """
+        headers = dict(headers) if headers is not None else dict()
+        if self.compress:
+            headers.setdefault("Accept-Encoding", "gzip, deflate")
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+
+        self._count(requests=1)
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            attempt += 1
+            # retries are limited the same way as first attempt, so server asking to slow down gets fewer requests
+            if on_attempt is not None:
+                on_attempt()
+            self._count(attempts=1)
+            try:
+                response = self.__session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError) as error:
+                if attempt > policy.retries:
+                    self._count(failures=1)
+                    raise
+                wait_time = policy.get_backoff(attempt)
+                self._count_retry(type(error).__name__, wait_time)
+                time.sleep(wait_time)
+                continue
+
+            if response.status_code not in policy.retry_statuses:
+                return response
+
+            # server asked to wait - its wait is used instead of backoff if it is not too long
+            retry_after = policy.get_retry_after(response)
+            if attempt > policy.retries or retry_after is not None and retry_after > policy.max_retry_after:
+                self._count(failures=1)
+                return response
+
+            wait_time = retry_after if retry_after is not None else policy.get_backoff(attempt)
+            # response is closed, so its connection returns to pool
+            response.close()
+            self._count_retry(response.status_code, wait_time)
+            time.sleep(wait_time)
+
+    def info(self):
+        """
+        Method to get requests statistics
+        :return: dict - {"requests": int, "attempts": int, "retries": int, "failures": int, "retry_wait": float,
+        "retry_reasons": dict} - requests made, attempts including retries, retries, requests failed after
+        all attempts, total wait before retries in seconds and retries number by status or error name
+        """
+        with self.__stats_lock:
+            info = dict(self.__stats)
+            info["retry_reasons"] = dict(self.__retry_reasons)
+            return info
+
+    def reset(self):
+        """
+        Method to reset requests statistics
+        """
+        with self.__stats_lock:
+            self.__stats = {"requests": 0, "attempts": 0, "retries": 0, "failures": 0, "retry_wait": 0.0}
+            self.__retry_reasons = dict()
+
+    def close(self):
+        """
+        Method to close all connections
+        """
+        self.__session.close()
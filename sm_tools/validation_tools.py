@@ -19,9 +19,9 @@ def _arguments_validator(func):
                 raise ValueError("Parameters must be np.ndarray or list and contain at least one value!"
                                  "Check input data and try again.")
 
-            # and trying to convert argument to array
+            # and trying to convert argument to array, numpy arrays are used as is without copying
             try:
-                converted_arg = np.array(arg)
+                converted_arg = np.asarray(arg)
             except BaseException:
                 raise ValueError("Error while converting argument to nd.array!"
                                  "Parameters must be np.ndarray or list and contain at least one value!"